@@ -0,0 +1,127 @@
+"""
+    **article_serialization benchmark**
+        compares serializing a page of 1000 articles to json from hydrated ORM instances (joinedload of every
+        collection, to_dict and jsonable_encoder) against the projection read path (column selects, one IN query
+        per collection and json.dumps of plain dicts), reporting time and peak memory per page
+
+        seeds a local sqlite database, the service settings still have to be present in the environment
+        or in .env.development because the models load them on import
+
+            python -m benchmarks.article_serialization [total_articles] [database_path]
+"""
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import create_engine, func, select, insert
+from sqlalchemy.dialects.mysql import LONGTEXT
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+
+from src.connector.data_instance import Base
+from src.models.sql.news import News, NewsSentiment, RelatedTickers, ThumbnailImage, NewsThumbnail
+
+TICKERS = [f"T{i:04d}" for i in range(2000)]
+PAGE_SIZE = 1000
+SEED_BATCH = 10_000
+BODY = "Shares moved after the company reported quarterly results ahead of expectations. " * 50
+
+
+# noinspection PyUnusedLocal
+@compiles(LONGTEXT, 'sqlite')
+def compile_longtext(element, compiler, **kwargs) -> str:
+    return "TEXT"
+
+
+def seed(engine, total_articles: int) -> None:
+    tables = [News.__table__, NewsSentiment.__table__, RelatedTickers.__table__, ThumbnailImage.__table__,
+              NewsThumbnail.__table__]
+    Base.metadata.create_all(bind=engine, tables=tables)
+    with engine.begin() as connection:
+        if connection.execute(select(func.count()).select_from(News.__table__)).scalar() >= total_articles:
+            return
+
+    rng = random.Random(7)
+    start_time = 1_600_000_000
+    for offset in range(0, total_articles, SEED_BATCH):
+        news_rows, sentiment_rows, ticker_rows, thumbnail_rows, link_rows = [], [], [], [], []
+        for i in range(offset, min(offset + SEED_BATCH, total_articles)):
+            uuid = f"{i:012d}-benchmark"
+            news_rows.append(dict(uuid=uuid, title=f"article {i}", publisher="benchmark", link="https://example.com",
+                                  providerPublishTime=start_time + i * 30, created_at=start_time + i * 30,
+                                  type="STORY"))
+            tickers = sorted({rng.choice(TICKERS) for _ in range(3)})
+            sentiment_rows.append(dict(article_uuid=uuid, stock_codes=",".join(tickers), title=f"article {i}",
+                                       article=BODY, article_tldr="results ahead of expectations",
+                                       link="https://example.com"))
+            for ticker in tickers:
+                ticker_rows.append(dict(id=f"{uuid}-{ticker}", uuid=uuid, ticker=ticker, stock_id=ticker))
+            for width in (140, 640, 1280):
+                url = f"https://example.com/{i}/{width}.jpg"
+                thumbnail_rows.append(dict(thumbnail_id=ThumbnailImage.create_thumbnail_id(url=url), url=url,
+                                           width=width, height=width // 2, tag=f"{width}x{width // 2}"))
+                link_rows.append(dict(uuid=uuid, thumbnail_id=ThumbnailImage.create_thumbnail_id(url=url)))
+
+        with engine.begin() as connection:
+            connection.execute(insert(News.__table__), news_rows)
+            connection.execute(insert(NewsSentiment.__table__), sentiment_rows)
+            connection.execute(insert(RelatedTickers.__table__), ticker_rows)
+            connection.execute(insert(ThumbnailImage.__table__), thumbnail_rows)
+            connection.execute(insert(NewsThumbnail.__table__), link_rows)
+        print(f"seeded {offset + len(news_rows)} articles", flush=True)
+
+
+async def orm_page(session) -> bytes:
+    articles = await News.get_bounded(upper_bound=PAGE_SIZE, session=session)
+    payload = [article.to_dict() for article in articles]
+    # listing routes drop the body, it is still loaded by the joinedload
+    for article_dict in payload:
+        article_dict['sentiment'].pop('article', None)
+    return json.dumps(jsonable_encoder(payload)).encode('utf-8')
+
+
+async def projection_page(session) -> bytes:
+    summaries = News.fetch_summaries(session=session, page_size=PAGE_SIZE)
+    return json.dumps(summaries, separators=(',', ':')).encode('utf-8')
+
+
+def measure(name: str, serialize, session_factory, repeat: int = 10) -> None:
+    latencies = []
+    size = 0
+    for _ in range(repeat):
+        # a fresh session each time so the identity map does not serve the instances from memory
+        with session_factory() as session:
+            start = time.perf_counter()
+            size = len(asyncio.run(serialize(session)))
+            latencies.append(time.perf_counter() - start)
+
+    # memory is traced in a separate run, tracing slows allocation down and would skew the timings
+    with session_factory() as session:
+        tracemalloc.start()
+        asyncio.run(serialize(session))
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    latencies.sort()
+    print(f"{name:>10} : p50 {latencies[len(latencies) // 2] * 1000:9.3f} ms  peak memory {peak / 1024 / 1024:7.2f} MB"
+          f"  response {size / 1024:8.1f} KB  per {PAGE_SIZE} articles")
+
+
+def main():
+    total_articles = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    database_path = sys.argv[2] if len(sys.argv) > 2 else "benchmarks/article_serialization.db"
+    engine = create_engine(f"sqlite:///{os.path.abspath(database_path)}")
+    seed(engine=engine, total_articles=total_articles)
+
+    session_factory = sessionmaker(bind=engine)
+    measure("orm", orm_page, session_factory)
+    measure("projection", projection_page, session_factory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+    **telemetry_overhead benchmark**
+        measures what capture_telemetry adds to every call of a decorated coroutine, by timing the same
+        coroutine with and without the decorator, and fails when the overhead goes over the budget
+
+        the service settings still have to be present in the environment or in .env.development
+        because telemetry loads them on import
+
+            python -m benchmarks.telemetry_overhead [calls] [budget_microseconds]
+"""
+import asyncio
+import sys
+import time
+
+from src.telemetry import capture_telemetry
+
+ROUNDS = 5
+
+
+async def parse(value: int) -> int:
+    return value
+
+
+@capture_telemetry(name='benchmark_parse')
+async def decorated_parse(value: int) -> int:
+    return value
+
+
+async def run_calls(coroutine_function, calls: int) -> float:
+    start = time.perf_counter()
+    for value in range(calls):
+        await coroutine_function(value)
+    return time.perf_counter() - start
+
+
+async def measure(calls: int) -> float:
+    """best per call overhead in seconds over ROUNDS rounds"""
+    overheads: list[float] = []
+    for _ in range(ROUNDS):
+        plain = await run_calls(parse, calls)
+        decorated = await run_calls(decorated_parse, calls)
+        overheads.append((decorated - plain) / calls)
+    return min(overheads)
+
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    budget = float(sys.argv[2]) if len(sys.argv) > 2 else 5.0
+    overhead = asyncio.run(measure(calls=calls)) * 1_000_000
+    print(f"capture_telemetry overhead : {overhead:.3f} us per call (budget {budget:.3f} us)")
+    if overhead > budget:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
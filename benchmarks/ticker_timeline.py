@@ -0,0 +1,94 @@
+"""
+    **ticker_timeline benchmark**
+        compares the previous latest-news-per-ticker query (max(providerPublishTime) over news, an IN subquery of
+        every uuid, a join and a sort) against a page read from the ticker timeline
+
+        seeds a local sqlite database, the service settings still have to be present in the environment
+        or in .env.development because the models load them on import
+
+            python -m benchmarks.ticker_timeline [total_articles] [database_path]
+"""
+import os
+import random
+import sys
+import time
+
+from sqlalchemy import create_engine, func, select, insert
+from sqlalchemy.orm import sessionmaker
+
+from src.connector.data_instance import Base
+from src.models.sql.news import News, RelatedTickers, TickerTimeline
+
+TICKERS = [f"T{i:04d}" for i in range(2000)]
+HOT_TICKERS = TICKERS[:20]
+SEED_BATCH = 50_000
+
+
+def seed(engine, total_articles: int) -> None:
+    tables = [News.__table__, RelatedTickers.__table__, TickerTimeline.__table__]
+    Base.metadata.create_all(bind=engine, tables=tables)
+    with engine.begin() as connection:
+        if connection.execute(select(func.count()).select_from(News.__table__)).scalar() >= total_articles:
+            return
+
+    rng = random.Random(7)
+    start_time = 1_600_000_000
+    for offset in range(0, total_articles, SEED_BATCH):
+        news_rows, ticker_rows, timeline_rows = [], [], []
+        for i in range(offset, min(offset + SEED_BATCH, total_articles)):
+            uuid = f"{i:012d}-benchmark"
+            publish_time = start_time + i * 30 + rng.randint(0, 29)
+            news_rows.append(dict(uuid=uuid, title=f"article {i}", publisher="benchmark", link="https://example.com",
+                                  providerPublishTime=publish_time, created_at=publish_time, type="STORY"))
+            tickers = {rng.choice(HOT_TICKERS)} | {rng.choice(TICKERS) for _ in range(2)}
+            for ticker in tickers:
+                ticker_rows.append(dict(id=f"{uuid}-{ticker}", uuid=uuid, ticker=ticker, stock_id=ticker))
+                timeline_rows.append(dict(ticker=ticker, providerPublishTime=publish_time, uuid=uuid))
+
+        with engine.begin() as connection:
+            connection.execute(insert(News.__table__), news_rows)
+            connection.execute(insert(RelatedTickers.__table__), ticker_rows)
+            connection.execute(insert(TickerTimeline.__table__), timeline_rows)
+        print(f"seeded {offset + len(news_rows)} articles", flush=True)
+
+
+def previous_query(session, ticker: str, page_size: int) -> list[str]:
+    latest_publish_time = session.query(func.max(News.providerPublishTime)).scalar()
+    subquery = session.query(News.uuid).filter(News.providerPublishTime <= latest_publish_time).subquery()
+    return [uuid for uuid, in session.query(RelatedTickers.uuid)
+            .filter(RelatedTickers.ticker == ticker, RelatedTickers.uuid.in_(select(subquery.c.uuid)))
+            .join(News, News.uuid == RelatedTickers.uuid)
+            .order_by(-News.providerPublishTime).limit(page_size).all()]
+
+
+def timeline_query(session, ticker: str, page_size: int) -> list[str]:
+    return [uuid for uuid, in session.query(TickerTimeline.uuid).filter(TickerTimeline.ticker == ticker)
+            .order_by(TickerTimeline.providerPublishTime.desc(), TickerTimeline.uuid.desc())
+            .limit(page_size).all()]
+
+
+def measure(name: str, query, session, tickers: list[str], page_size: int = 10) -> None:
+    latencies = []
+    for ticker in tickers:
+        start = time.perf_counter()
+        query(session, ticker, page_size)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    print(f"{name:>10} : p50 {latencies[len(latencies) // 2] * 1000:9.3f} ms  "
+          f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:9.3f} ms  over {len(latencies)} queries")
+
+
+def main():
+    total_articles = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    database_path = sys.argv[2] if len(sys.argv) > 2 else "benchmarks/ticker_timeline.db"
+    engine = create_engine(f"sqlite:///{os.path.abspath(database_path)}")
+    seed(engine=engine, total_articles=total_articles)
+
+    tickers = [random.choice(HOT_TICKERS) for _ in range(50)]
+    with sessionmaker(bind=engine)() as session:
+        measure("previous", previous_query, session, tickers)
+        measure("timeline", timeline_query, session, tickers)
+
+
+if __name__ == "__main__":
+    main()
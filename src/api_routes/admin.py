@@ -1,4 +1,14 @@
-from fastapi import APIRouter, Request
+import asyncio
+
+from fastapi import APIRouter, Request, Query
+from fastapi.responses import JSONResponse, StreamingResponse, Response, PlainTextResponse
+
+from src.connector.export import export_criteria, export_stream, MEDIA_TYPES, FORMAT_NDJSON
+from src.exceptions import InputError
+from src.models.sql.news import create_start_end_timestamps
+from src.config import config_instance
+from src.telemetry.memory import memory_registry, allocation_snapshots, KEY_TYPES
+from src.telemetry.profiler import sampling_profiler, MAX_DURATION
 
 admin_router = APIRouter()
 
@@ -18,3 +28,178 @@ def admin(request: Request):
     :return:
     """
     pass
+
+
+@admin_router.api_route(path='/_admin/export', methods=['GET'], include_in_schema=True)
+async def export_articles(request: Request, start_date: str | None = None, end_date: str | None = None,
+                          ticker: str | None = None,
+                          export_format: str = Query(default=FORMAT_NDJSON, alias='format',
+                                                     regex='^(ndjson|parquet)$')):
+    """
+    **export_articles**
+        streams every article published between start_date and end_date (YYYY-MM-DD, both included),
+        optionally only those related to ticker, as NDJSON or Parquet, oldest first,
+        the response is gzip compressed when the client accepts gzip
+    :param request:
+    :param start_date:
+    :param end_date:
+    :param ticker:
+    :param export_format: ndjson or parquet
+    :return:
+    """
+    try:
+        start_time = create_start_end_timestamps(_date=start_date)[1] if start_date else None
+        end_time = create_start_end_timestamps(_date=end_date)[0] if end_date else None
+    except InputError as e:
+        return JSONResponse(status_code=400, content=dict(status=False, message=e.description))
+
+    gzip: bool = 'gzip' in request.headers.get('accept-encoding', '')
+    headers = {'Content-Disposition': f'attachment; filename="articles.{export_format}"'}
+    if gzip:
+        headers['Content-Encoding'] = 'gzip'
+
+    stream = export_stream(criteria=export_criteria(start_time=start_time, end_time=end_time, ticker=ticker),
+                           export_format=export_format, gzip=gzip)
+    return StreamingResponse(content=stream, media_type=MEDIA_TYPES[export_format], headers=headers)
+
+
+# noinspection PyUnusedLocal
+@admin_router.api_route(path='/_admin/profiler/start', methods=['POST'], include_in_schema=True)
+async def start_profiler(request: Request, duration: float = Query(default=30.0, gt=0, le=MAX_DURATION),
+                         interval_ms: float = Query(default=10.0, ge=1.0, le=1000.0), scrape_cycle: bool = False):
+    """
+    **start_profiler**
+        samples the stacks of every thread of the process, the event loop and the executor threads,
+        for duration seconds, or over the whole of the next scrape cycle when scrape_cycle is set
+    :param request:
+    :param duration: seconds
+    :param interval_ms: milliseconds between samples
+    :param scrape_cycle: profile the next scrape cycle instead
+    :return:
+    """
+    if sampling_profiler.running:
+        return JSONResponse(status_code=409, content=dict(status=False, message="The profiler is already running"))
+    if scrape_cycle:
+        sampling_profiler.arm_cycle(interval=interval_ms / 1000)
+        return dict(status=True, message="The next scrape cycle will be profiled")
+    profile = sampling_profiler.start(duration=duration, interval=interval_ms / 1000)
+    return dict(status=True, profile=profile.summary())
+
+
+# noinspection PyUnusedLocal
+@admin_router.api_route(path='/_admin/profiler/stop', methods=['POST'], include_in_schema=True)
+async def stop_profiler(request: Request):
+    """
+    **stop_profiler**
+        stops the running profile or disarms a scrape cycle profile, the profile is then read
+        from /_admin/profiler/profile
+    :param request:
+    :return:
+    """
+    profile = await asyncio.to_thread(sampling_profiler.stop)
+    if profile is None:
+        return JSONResponse(status_code=404, content=dict(status=False, message="No profile was recorded"))
+    return dict(status=True, profile=profile.summary())
+
+
+# noinspection PyUnusedLocal
+@admin_router.api_route(path='/_admin/profiler/profile', methods=['GET'], include_in_schema=True)
+async def profiler_profile(request: Request, profile_format: str = Query(default='collapsed', alias='format',
+                                                                         regex='^(collapsed|pstats)$')):
+    """
+    **profiler_profile**
+        the latest profile as collapsed stacks (flamegraph.pl, speedscope) or as a pstats file,
+        a profile which is still running returns the samples recorded so far
+    :param request:
+    :param profile_format: collapsed or pstats
+    :return:
+    """
+    profile = sampling_profiler.profile
+    if profile is None:
+        return JSONResponse(status_code=404, content=dict(status=False, message="No profile was recorded"))
+    if profile_format == 'pstats':
+        content = await asyncio.to_thread(profile.pstats)
+        return Response(content=content, media_type='application/octet-stream',
+                        headers={'Content-Disposition': 'attachment; filename="profile.pstats"'})
+    return PlainTextResponse(content=await asyncio.to_thread(profile.collapsed))
+
+
+# noinspection PyUnusedLocal
+@admin_router.api_route(path='/_admin/memory/structures', methods=['GET'], include_in_schema=True)
+async def memory_structures(request: Request):
+    """
+    **memory_structures**
+        estimated items and bytes held by the data sink buffers, the telemetry series and sketches
+        and the requests cache, with the peak resident size of the process
+    :param request:
+    :return:
+    """
+    return memory_registry.report()
+
+
+# noinspection PyUnusedLocal
+@admin_router.api_route(path='/_admin/memory/tracemalloc/start', methods=['POST'], include_in_schema=True)
+async def start_tracemalloc(request: Request, frames: int | None = Query(default=None, ge=1, le=64)):
+    """
+    **start_tracemalloc**
+        starts tracing allocations, every allocation is traced with frames stack frames,
+        tracing slows allocations down and takes memory of its own so it should be stopped once done
+    :param request:
+    :param frames:
+    :return:
+    """
+    allocation_snapshots.start(frames=frames or config_instance().MEMORY_SETTINGS.TRACEMALLOC_FRAMES)
+    return allocation_snapshots.status()
+
+
+# noinspection PyUnusedLocal
+@admin_router.api_route(path='/_admin/memory/tracemalloc/stop', methods=['POST'], include_in_schema=True)
+async def stop_tracemalloc(request: Request):
+    """
+    **stop_tracemalloc**
+        stops tracing allocations and drops the snapshots
+    :param request:
+    :return:
+    """
+    allocation_snapshots.stop()
+    return allocation_snapshots.status()
+
+
+# noinspection PyUnusedLocal
+@admin_router.api_route(path='/_admin/memory/snapshots', methods=['GET', 'POST'], include_in_schema=True)
+async def memory_snapshots(request: Request):
+    """
+    **memory_snapshots**
+        POST takes a tracemalloc snapshot, GET lists the snapshots kept
+    :param request:
+    :return:
+    """
+    if request.method == 'POST':
+        try:
+            snapshot_id = await asyncio.to_thread(allocation_snapshots.take)
+        except RuntimeError as e:
+            return JSONResponse(status_code=409, content=dict(status=False, message=str(e)))
+        return dict(snapshot_id=snapshot_id, **allocation_snapshots.status())
+    return allocation_snapshots.status()
+
+
+# noinspection PyUnusedLocal
+@admin_router.api_route(path='/_admin/memory/snapshots/diff', methods=['GET'], include_in_schema=True)
+async def memory_snapshots_diff(request: Request, first: int, second: int,
+                                key_type: str = Query(default='lineno', regex=f"^({'|'.join(KEY_TYPES)})$"),
+                                limit: int = Query(default=25, ge=1, le=500)):
+    """
+    **memory_snapshots_diff**
+        allocation sites which grew the most from the first snapshot to the second
+    :param request:
+    :param first: id of the earlier snapshot
+    :param second: id of the later snapshot
+    :param key_type: group allocations by lineno, filename or traceback
+    :param limit:
+    :return:
+    """
+    if first not in allocation_snapshots.snapshots or second not in allocation_snapshots.snapshots:
+        return JSONResponse(status_code=404, content=dict(status=False, message="Snapshot not found"))
+    allocations = await asyncio.to_thread(allocation_snapshots.compare, first_id=first, second_id=second,
+                                          key_type=key_type, limit=limit)
+    return dict(first=first, second=second, key_type=key_type, allocations=allocations)
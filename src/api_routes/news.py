@@ -0,0 +1,256 @@
+import asyncio
+import json
+from datetime import date
+from typing import Callable
+
+from fastapi import APIRouter, Request, Query
+from fastapi.responses import JSONResponse, Response
+
+from src.connector.data_instance import mysql_instance
+from src.connector.archive import news_archive
+from src.connector.search_index import search_index
+from src.connector.response_cache import response_cache, ticker_tag, publisher_tag, date_tag, TAG_LATEST
+from src.connector.ticker_rings import latest_articles
+from src.exceptions import InputError
+from src.models.sql.news import News, RelatedTickers, NewsBody, parse_date, create_start_end_timestamps
+from src.utils import encode_cursor, decode_cursor
+
+news_router = APIRouter()
+
+MAX_PAGE_SIZE = 100
+
+
+def create_page_response(payload: list[dict], page_size: int) -> bytes:
+    """
+        **create_page_response**
+            serializes a page of article summaries together with the cursor for the next page,
+            next_cursor is None on the last page
+    :param payload:
+    :param page_size:
+    :return:
+    """
+    next_cursor: str | None = None
+    if len(payload) == page_size:
+        last_article = payload[-1]
+        next_cursor = encode_cursor(publish_time=last_article['providerPublishTime'], uuid=last_article['uuid'])
+
+    content = dict(status=True, payload=payload, next_cursor=next_cursor, message="successfully fetched articles")
+    # summaries only hold json types, they are dumped directly without walking them through jsonable_encoder
+    return json.dumps(content, separators=(',', ':')).encode('utf-8')
+
+
+def read_page(fetch: Callable[..., list[dict]], page_size: int, **params) -> bytes:
+    """
+        **read_page**
+            runs fetch in its own session and serializes the page, called on a worker thread
+            so the query never blocks the event loop
+    :param fetch: a summaries query taking session, page_size and params
+    :param page_size:
+    :param params:
+    :return:
+    """
+    with mysql_instance.get_session() as session:
+        payload = fetch(session=session, page_size=page_size, **params)
+    return create_page_response(payload=payload, page_size=page_size)
+
+
+def read_summaries(uuid_list: list[str]) -> list[dict]:
+    with mysql_instance.get_session() as session:
+        return News.fetch_summaries_by_uuid_list(uuid_list=uuid_list, session=session)
+
+
+def read_article(uuid: str) -> tuple[dict | None, str | None]:
+    """summary and body of a single article, (None, None) when it does not exist"""
+    with mysql_instance.get_session() as session:
+        summaries = News.fetch_summaries_by_uuid_list(uuid_list=[uuid], session=session)
+        if not summaries:
+            return None, None
+        return summaries[0], NewsBody.get_text(uuid=uuid, session=session)
+
+
+def json_response(content: bytes) -> Response:
+    return Response(content=content, media_type='application/json')
+
+
+def input_error_response(error: InputError) -> JSONResponse:
+    return JSONResponse(status_code=400, content=dict(status=False, payload=[], next_cursor=None,
+                                                      message=error.description))
+
+
+# noinspection PyUnusedLocal
+@news_router.api_route(path='/api/v1/news/articles-by-ticker/{stock_code}', methods=['GET'], include_in_schema=True)
+async def articles_by_ticker(request: Request, stock_code: str, cursor: str | None = None,
+                             page_size: int = Query(default=News.article_page_size, ge=1, le=MAX_PAGE_SIZE)):
+    """
+    **articles_by_ticker**
+        most recent articles related to stock_code, pass next_cursor from a page to get the next one,
+        served from the in memory ticker rings when they hold the whole page
+    :param request:
+    :param stock_code:
+    :param cursor:
+    :param page_size:
+    :return:
+    """
+    try:
+        _cursor = decode_cursor(cursor) if cursor else None
+    except InputError as e:
+        return input_error_response(error=e)
+
+    ticker: str = stock_code.upper()
+    payload = latest_articles.get_page(ticker=ticker, cursor=_cursor, page_size=page_size)
+    if payload is not None:
+        return json_response(content=create_page_response(payload=payload, page_size=page_size))
+
+    async def load_page() -> bytes:
+        return await asyncio.to_thread(read_page, RelatedTickers.fetch_by_ticker, page_size=page_size, ticker=ticker,
+                                       cursor=_cursor)
+
+    key = response_cache.create_key('articles-by-ticker', ticker=ticker, cursor=_cursor, page_size=page_size)
+    return json_response(content=await response_cache.get_or_load(key=key, tags={ticker_tag(ticker)},
+                                                                   loader=load_page))
+
+
+# noinspection PyUnusedLocal
+@news_router.api_route(path='/api/v1/news/articles-by-publisher/{publisher}', methods=['GET'],
+                       include_in_schema=True)
+async def articles_by_publisher(request: Request, publisher: str, cursor: str | None = None,
+                                page_size: int = Query(default=News.article_page_size, ge=1, le=MAX_PAGE_SIZE)):
+    """
+    **articles_by_publisher**
+        most recent articles from publisher, pass next_cursor from a page to get the next one
+    :param request:
+    :param publisher:
+    :param cursor:
+    :param page_size:
+    :return:
+    """
+    try:
+        _cursor = decode_cursor(cursor) if cursor else None
+    except InputError as e:
+        return input_error_response(error=e)
+
+    async def load_page() -> bytes:
+        return await asyncio.to_thread(read_page, News.fetch_summaries_by_publisher, page_size=page_size,
+                                       publisher=publisher, cursor=_cursor)
+
+    key = response_cache.create_key('articles-by-publisher', publisher=publisher, cursor=_cursor,
+                                    page_size=page_size)
+    return json_response(content=await response_cache.get_or_load(key=key, tags={publisher_tag(publisher)},
+                                                                   loader=load_page))
+
+
+# noinspection PyUnusedLocal
+@news_router.api_route(path='/api/v1/news/articles-by-date/{date_published}', methods=['GET'],
+                       include_in_schema=True)
+async def articles_by_date(request: Request, date_published: str, cursor: str | None = None,
+                           page_size: int = Query(default=News.article_page_size, ge=1, le=MAX_PAGE_SIZE)):
+    """
+    **articles_by_date**
+        articles published on date_published (YYYY-MM-DD), pass next_cursor from a page to get the next one,
+        archived days are served from the parquet archive
+    :param request:
+    :param date_published:
+    :param cursor:
+    :param page_size:
+    :return:
+    """
+    try:
+        _cursor = decode_cursor(cursor) if cursor else None
+        day: date = parse_date(date_published)
+    except InputError as e:
+        return input_error_response(error=e)
+
+    async def load_page() -> bytes:
+        # days outside the hot window are read from the parquet archive
+        source = news_archive if news_archive.is_archived(day) else News
+        return await asyncio.to_thread(read_page, source.fetch_summaries_by_day_published, page_size=page_size,
+                                       date_published=day.isoformat(), cursor=_cursor)
+
+    key = response_cache.create_key('articles-by-date', day=day, cursor=_cursor, page_size=page_size)
+    return json_response(content=await response_cache.get_or_load(key=key, tags={date_tag(day)}, loader=load_page))
+
+
+# noinspection PyUnusedLocal
+@news_router.api_route(path='/api/v1/news/latest', methods=['GET'], include_in_schema=True)
+async def latest_news(request: Request, cursor: str | None = None,
+                      page_size: int = Query(default=News.article_page_size, ge=1, le=MAX_PAGE_SIZE)):
+    """
+    **latest_news**
+        most recent articles, pass next_cursor from a page to get the next one
+    :param request:
+    :param cursor:
+    :param page_size:
+    :return:
+    """
+    try:
+        _cursor = decode_cursor(cursor) if cursor else None
+    except InputError as e:
+        return input_error_response(error=e)
+
+    async def load_page() -> bytes:
+        return await asyncio.to_thread(read_page, News.fetch_summaries, page_size=page_size, cursor=_cursor)
+
+    key = response_cache.create_key('latest', cursor=_cursor, page_size=page_size)
+    return json_response(content=await response_cache.get_or_load(key=key, tags={TAG_LATEST}, loader=load_page))
+
+
+# noinspection PyUnusedLocal
+@news_router.api_route(path='/api/v1/news/search', methods=['GET'], include_in_schema=True)
+async def search_articles(request: Request, q: str, ticker: str | None = None, start_date: str | None = None,
+                          end_date: str | None = None, page: int = Query(default=1, ge=1),
+                          page_size: int = Query(default=News.article_page_size, ge=1, le=MAX_PAGE_SIZE)):
+    """
+    **search_articles**
+        articles whose title or body match q, best match first, every term in q has to match,
+        "quoted words" match as a phrase and a trailing * matches words starting with the term
+    :param request:
+    :param q: search terms
+    :param ticker: only articles related to ticker
+    :param start_date: only articles published on or after this date (YYYY-MM-DD)
+    :param end_date: only articles published on or before this date (YYYY-MM-DD)
+    :param page:
+    :param page_size:
+    :return:
+    """
+    try:
+        start_time = create_start_end_timestamps(_date=start_date)[1] if start_date else None
+        end_time = create_start_end_timestamps(_date=end_date)[0] if end_date else None
+        hits = await asyncio.to_thread(search_index.search, query=q, ticker=ticker, start_time=start_time,
+                                       end_time=end_time, limit=page_size, offset=(page - 1) * page_size)
+    except InputError as e:
+        return input_error_response(error=e)
+
+    summaries = await asyncio.to_thread(read_summaries, [hit.uuid for hit in hits])
+    by_uuid = {summary['uuid']: summary for summary in summaries}
+
+    payload = []
+    for hit in hits:
+        # articles archived or deleted after they were indexed are left out
+        if hit.uuid in by_uuid:
+            payload.append(dict(by_uuid[hit.uuid], snippet=hit.snippet))
+    content = dict(status=True, payload=payload, page=page, next_page=page + 1 if len(hits) == page_size else None,
+                   message="successfully searched articles")
+    return json_response(content=json.dumps(content, separators=(',', ':')).encode('utf-8'))
+
+
+# noinspection PyUnusedLocal
+@news_router.api_route(path='/api/v1/news/article/{uuid}', methods=['GET'], include_in_schema=True)
+async def article_detail(request: Request, uuid: str):
+    """
+    **article_detail**
+        a single article including its body in payload.body, the only route which reads the compressed
+        article bodies, the body is also set on payload.sentiment.article when the article has a sentiment entry
+    :param request:
+    :param uuid:
+    :return:
+    """
+    article, body = await asyncio.to_thread(read_article, uuid)
+    if article is None:
+        return JSONResponse(status_code=404, content=dict(status=False, payload={}, message="article not found"))
+
+    article['body'] = body
+    # kept for clients which read the body from the sentiment entry
+    if 'sentiment' in article:
+        article['sentiment']['article'] = body
+    content = dict(status=True, payload=article, message="successfully fetched article")
+    return json_response(content=json.dumps(content, separators=(',', ':')).encode('utf-8'))
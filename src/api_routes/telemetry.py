@@ -1,22 +1,17 @@
-from fastapi import APIRouter, Request
+import os
+
+from fastapi import APIRouter, Request, Query
+from fastapi.responses import Response, JSONResponse, StreamingResponse
 
 from src.telemetry import telemetry_stream
+from src.telemetry.loop_lag import loop_lag_monitor
+from src.telemetry.log_tail import LogTail, LogFilter, MAX_TAIL_LINES
+from src.telemetry.metrics import metrics_registry, CONTENT_TYPE
+from src.telemetry.tracing import tracer
 from src.utils.my_logger import AppLogger
 
 telemetry_router = APIRouter()
 
-# This allows to stream telemetry data
-data_stream = telemetry_stream.return_data_stream()
-
-
-def log_file_reader() -> str:
-    with open(AppLogger.logging_file) as file:
-        for line in file.readlines():
-            yield line
-
-
-logfile_generator = log_file_reader()
-
 
 # noinspection PyUnusedLocal
 @telemetry_router.api_route(path='/_admin/telemetry/stream', methods=['GET'], include_in_schema=True)
@@ -27,9 +22,8 @@ async def gather_telemetry(request: Request):
     :param request:
     :return:
     """
-    async for data in data_stream:
-        return data
-    return dict(message="Data Stream Empty")
+    data_points = [dict(minute=_time, **data) async for _time, data in telemetry_stream.return_data_stream()]
+    return data_points or dict(message="Data Stream Empty")
 
 
 @telemetry_router.api_route(path='/_admin/telemetry/stats', methods=['GET'], include_in_schema=True)
@@ -44,13 +38,77 @@ async def gather_telemetry(request: Request):
 
 
 @telemetry_router.api_route(path='/_admin/telemetry/stream-logs', methods=['GET'], include_in_schema=True)
-async def gather_telemetry(request: Request):
+async def stream_logs(request: Request, offset: int | None = Query(default=None, ge=0),
+                      tail: int = Query(default=100, ge=0, le=MAX_TAIL_LINES), follow: bool = True,
+                      level: str | None = None, logger: str | None = None):
     """
-    **gather_telemetry**
-       **find a way to monitor the api then send the data over this API
+    **stream_logs**
+        streams the service log as server sent events, starting at offset or at the last tail lines,
+        every event id is the byte offset after its line, a client reconnecting with Last-Event-ID
+        carries on from there, level keeps records at or above that level and logger keeps records
+        of loggers whose name starts with it
+    :param request:
+    :param offset: byte offset to start at
+    :param tail: lines to start with when there is no offset
+    :param follow: keep streaming lines as they are written
+    :param level:
+    :param logger:
+    :return:
+    """
+    last_event_id = request.headers.get('last-event-id')
+    if offset is None and last_event_id and last_event_id.isdigit():
+        offset = int(last_event_id)
+    try:
+        log_filter = LogFilter(level=level, logger_name=logger)
+    except ValueError as e:
+        return JSONResponse(status_code=400, content=dict(status=False, message=str(e)))
+    if not os.path.isfile(AppLogger.logging_file):
+        return JSONResponse(status_code=404, content=dict(status=False, message="Log file not found"))
+
+    async def events():
+        async for line in LogTail(filename=AppLogger.logging_file).follow(offset=offset, tail_lines=tail,
+                                                                           follow=follow, log_filter=log_filter):
+            yield f"id: {line.offset}\ndata: {line.text}\n\n"
+
+    return StreamingResponse(content=events(), media_type='text/event-stream',
+                             headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+# noinspection PyUnusedLocal
+@telemetry_router.api_route(path='/_admin/metrics', methods=['GET'], include_in_schema=True)
+async def metrics(request: Request):
+    """
+    **metrics**
+        counters, histograms and gauges of the scraper and storage in the OpenMetrics text format
+    :param request:
+    :return:
+    """
+    return Response(content=metrics_registry.render(), media_type=CONTENT_TYPE)
+
+
+# noinspection PyUnusedLocal
+@telemetry_router.api_route(path='/_admin/telemetry/traces', methods=['GET'], include_in_schema=True)
+async def slowest_traces(request: Request, limit: int = Query(default=20, ge=1, le=500)):
+    """
+    **slowest_traces**
+        the slowest ticker and storage traces of the latest scrape cycle with all of their spans
+    :param request:
+    :param limit:
+    :return:
+    """
+    return dict(cycle_started=tracer.cycle_started, total_traces=len(tracer.cycle_traces),
+                traces=tracer.slowest_traces(limit=limit))
+
+
+# noinspection PyUnusedLocal
+@telemetry_router.api_route(path='/_admin/telemetry/loop-lag', methods=['GET'], include_in_schema=True)
+async def event_loop_lag(request: Request, limit: int = Query(default=20, ge=1, le=500)):
+    """
+    **event_loop_lag**
+        event loop lag percentiles over the last 1, 5 and 60 minutes and the latest stalls,
+        each with the stack of the code which was blocking the loop
     :param request:
+    :param limit:
     :return:
     """
-    for log in logfile_generator:
-        return log
-    return {"message": "log file exhausted"}
+    return loop_lag_monitor.dict(limit=limit)
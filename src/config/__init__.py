@@ -43,6 +43,186 @@ class DatabaseSettings(BaseSettings):
         env_file_encoding = 'utf-8'
 
 
+class SpoolSettings(BaseSettings):
+    """
+        write ahead spool used to keep articles on the local drive until storage confirms them
+        FSYNC_MODE can be one of always, batch, interval or never
+    """
+    DIRECTORY: str = Field(default="spool")
+    SEGMENT_SIZE: int = Field(default=64 * 1024 * 1024)
+    FSYNC_MODE: str = Field(default="batch")
+    FSYNC_INTERVAL: float = Field(default=1.0)
+    REPLAY_BATCH_SIZE: int = Field(default=100)
+
+    class Config:
+        env_prefix = 'SPOOL_'
+        env_file = '.env.development'
+        env_file_encoding = 'utf-8'
+
+
+class BufferSettings(BaseSettings):
+    """
+        write behind buffer, articles are flushed to the database once FLUSH_SIZE are waiting
+        or FLUSH_INTERVAL seconds after the first one arrived, producers wait when MAX_PENDING are queued
+    """
+    FLUSH_SIZE: int = Field(default=20)
+    FLUSH_INTERVAL: float = Field(default=10.0)
+    MAX_PENDING: int = Field(default=200)
+
+    class Config:
+        env_prefix = 'BUFFER_'
+        env_file = '.env.development'
+        env_file_encoding = 'utf-8'
+
+
+class TickerRingSettings(BaseSettings):
+    """
+        in memory rings holding the latest RING_SIZE article summaries for each ticker,
+        seeded at startup from the SEED_ARTICLES most recent articles
+    """
+    RING_SIZE: int = Field(default=50)
+    SEED_ARTICLES: int = Field(default=2000)
+
+    class Config:
+        env_prefix = 'TICKER_RING_'
+        env_file = '.env.development'
+        env_file_encoding = 'utf-8'
+
+
+class ResponseCacheSettings(BaseSettings):
+    """
+        read route responses are cached for TTL seconds, least recently used entries are evicted
+        once the cache holds MAX_BYTES of responses
+    """
+    TTL: float = Field(default=300.0)
+    MAX_BYTES: int = Field(default=64 * 1024 * 1024)
+
+    class Config:
+        env_prefix = 'RESPONSE_CACHE_'
+        env_file = '.env.development'
+        env_file_encoding = 'utf-8'
+
+
+class SearchSettings(BaseSettings):
+    """
+        local sqlite full text search index over article titles and bodies
+    """
+    DATABASE: str = Field(default="search.db")
+    MAX_RESULTS: int = Field(default=1000)
+
+    class Config:
+        env_prefix = 'SEARCH_'
+        env_file = '.env.development'
+        env_file_encoding = 'utf-8'
+
+
+class ArchiveSettings(BaseSettings):
+    """
+        articles published more than RETENTION_DAYS days ago are moved out of the database
+        into date partitioned parquet files under DIRECTORY, a RETENTION_DAYS of 0 keeps every article
+    """
+    DIRECTORY: str = Field(default="archive")
+    RETENTION_DAYS: int = Field(default=365)
+    BATCH_SIZE: int = Field(default=1000)
+
+    class Config:
+        env_prefix = 'ARCHIVE_'
+        env_file = '.env.development'
+        env_file_encoding = 'utf-8'
+
+
+class SentimentSettings(BaseSettings):
+    """
+        sentiment worker, articles are scored BATCH_SIZE at a time on a worker thread, batches of at least
+        POOL_THRESHOLD texts, at most BATCH_SIZE, are split across WORKERS processes
+    """
+    BATCH_SIZE: int = Field(default=500)
+    WORKERS: int = Field(default=2)
+    POOL_THRESHOLD: int = Field(default=200)
+
+    class Config:
+        env_prefix = 'SENTIMENT_'
+        env_file = '.env.development'
+        env_file_encoding = 'utf-8'
+
+
+class SummarySettings(BaseSettings):
+    """
+        extractive tldr summaries computed across WORKERS processes as articles are stored,
+        every article gets TIME_BUDGET seconds
+    """
+    WORKERS: int = Field(default=2)
+    TIME_BUDGET: float = Field(default=0.5)
+
+    class Config:
+        env_prefix = 'SUMMARY_'
+        env_file = '.env.development'
+        env_file_encoding = 'utf-8'
+
+
+class TelemetrySettings(BaseSettings):
+    """
+        per minute telemetry of every method is kept for the last RETENTION_MINUTES minutes,
+        latency sketches with SKETCH_RELATIVE_ACCURACY for the last SKETCH_MINUTES minutes,
+        calls slower than SLOW_CALL_SECONDS are logged together with a SAMPLE_RATE fraction of the other calls
+    """
+    RETENTION_MINUTES: int = Field(default=24 * 60)
+    SKETCH_MINUTES: int = Field(default=60)
+    SKETCH_RELATIVE_ACCURACY: float = Field(default=0.01)
+    SAMPLE_RATE: float = Field(default=0.01)
+    SLOW_CALL_SECONDS: float = Field(default=10.0)
+
+    class Config:
+        env_prefix = 'TELEMETRY_'
+        env_file = '.env.development'
+        env_file_encoding = 'utf-8'
+
+
+class TracingSettings(BaseSettings):
+    """
+        finished scrape traces are appended to FILENAME as JSON lines, the file is rotated
+        once it reaches MAX_BYTES keeping BACKUP_COUNT older files
+    """
+    FILENAME: str = Field(default="logs/traces.jsonl")
+    MAX_BYTES: int = Field(default=16 * 1024 * 1024)
+    BACKUP_COUNT: int = Field(default=3)
+
+    class Config:
+        env_prefix = 'TRACING_'
+        env_file = '.env.development'
+        env_file_encoding = 'utf-8'
+
+
+class LoopLagSettings(BaseSettings):
+    """
+        the event loop is expected to wake a sleeping task every INTERVAL seconds, a wake up later than
+        THRESHOLD seconds is a stall, the stacks of the last MAX_STALLS stalls are kept
+    """
+    INTERVAL: float = Field(default=0.05)
+    THRESHOLD: float = Field(default=0.25)
+    MAX_STALLS: int = Field(default=50)
+
+    class Config:
+        env_prefix = 'LOOP_LAG_'
+        env_file = '.env.development'
+        env_file_encoding = 'utf-8'
+
+
+class MemorySettings(BaseSettings):
+    """
+        collections are sized from the first SAMPLE_SIZE items, the latest MAX_SNAPSHOTS tracemalloc snapshots
+        are kept, tracing records TRACEMALLOC_FRAMES frames per allocation unless the start route asks for more
+    """
+    SAMPLE_SIZE: int = Field(default=100)
+    MAX_SNAPSHOTS: int = Field(default=4)
+    TRACEMALLOC_FRAMES: int = Field(default=1)
+
+    class Config:
+        env_prefix = 'MEMORY_'
+        env_file = '.env.development'
+        env_file_encoding = 'utf-8'
+
+
 class SchedulerSettings(BaseModel):
     """
         keys are scheduled times, values are dicts
@@ -53,7 +233,15 @@ class SchedulerSettings(BaseModel):
 
 
 class Logging(BaseSettings):
+    """
+        records are queued for a background writer holding at most QUEUE_SIZE records, every call site may log
+        RATE_LIMIT records each RATE_INTERVAL seconds, messages are cut at MAX_FIELD_LENGTH characters
+    """
     filename: str = Field(default="financial_news.logs")
+    QUEUE_SIZE: int = Field(default=10_000)
+    RATE_LIMIT: int = Field(default=20)
+    RATE_INTERVAL: float = Field(default=60.0)
+    MAX_FIELD_LENGTH: int = Field(default=2000)
 
     class Config:
         env_file = '.env.development'
@@ -127,6 +315,18 @@ class ConfigInstance(BaseSettings):
     EOD_STOCK_API_KEY: str = Field(..., env='EOD_STOCK_API_KEY')
     DEVELOPMENT_SERVER_NAME: str = Field(..., env='DEVELOPMENT_SERVER_NAME')
     DATABASE_SETTINGS: DatabaseSettings = DatabaseSettings()
+    SPOOL_SETTINGS: SpoolSettings = SpoolSettings()
+    BUFFER_SETTINGS: BufferSettings = BufferSettings()
+    TICKER_RING_SETTINGS: TickerRingSettings = TickerRingSettings()
+    RESPONSE_CACHE_SETTINGS: ResponseCacheSettings = ResponseCacheSettings()
+    SEARCH_SETTINGS: SearchSettings = SearchSettings()
+    ARCHIVE_SETTINGS: ArchiveSettings = ArchiveSettings()
+    SENTIMENT_SETTINGS: SentimentSettings = SentimentSettings()
+    SUMMARY_SETTINGS: SummarySettings = SummarySettings()
+    TELEMETRY_SETTINGS: TelemetrySettings = TelemetrySettings()
+    TRACING_SETTINGS: TracingSettings = TracingSettings()
+    LOOP_LAG_SETTINGS: LoopLagSettings = LoopLagSettings()
+    MEMORY_SETTINGS: MemorySettings = MemorySettings()
     SERVICE_HEADERS: MServiceHeaders = MServiceHeaders()
     RSS_FEEDS: RSSFeedSettings = RSSFeedSettings()
     LOGGING: Logging = Logging()
@@ -0,0 +1,200 @@
+"""
+    **NewsArchive**
+        cold tier for old articles, articles published before the retention window are written to
+        date partitioned parquet files and then deleted from the database in bulk
+
+            <directory>/date=YYYY-MM-DD/part-<created>.parquet
+
+        every article is one row holding its summary, tickers, thumbnails and body, so a day is read
+        back without any joins, days outside the hot window are served by merging their partition
+        with whatever the database still holds for that day.
+"""
+import os
+import time
+from datetime import date, datetime, timedelta
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import delete
+
+from src.config import config_instance
+from src.connector.data_instance import mysql_instance
+from src.connector.search_index import search_index
+from src.connector.ticker_rings import latest_articles
+from src.models.sql.news import News, NewsBody, NewsSentiment, RelatedTickers, NewsThumbnail, TickerTimeline, \
+    create_start_end_timestamps
+from src.utils.my_logger import init_logger
+
+archive_logger = init_logger('archive-logger')
+
+ARTICLE_SCHEMA = pa.schema([
+    ('uuid', pa.string()),
+    ('title', pa.string()),
+    ('publisher', pa.string()),
+    ('link', pa.string()),
+    ('providerPublishTime', pa.int64()),
+    ('created_at', pa.int64()),
+    ('datetime_published', pa.string()),
+    ('type', pa.string()),
+    ('tickers', pa.list_(pa.string())),
+    ('thumbnail', pa.struct([('resolutions', pa.list_(pa.struct([
+        ('thumbnail_id', pa.string()), ('uuid', pa.string()), ('url', pa.string()),
+        ('width', pa.int64()), ('height', pa.int64()), ('tag', pa.string())])))])),
+    ('sentiment', pa.struct([
+        ('stock_codes', pa.string()), ('title', pa.string()), ('sentiment_title', pa.string()),
+        ('article_tldr', pa.string()), ('sentiment_article', pa.string()), ('link', pa.string())])),
+    ('body', pa.string()),
+])
+
+
+class NewsArchive:
+    """
+    **NewsArchive**
+        partitions are written to a temporary file and renamed into place before any row is deleted,
+        if the process stops between the two the next run writes the articles again and readers
+        drop the duplicates, deleted articles are also dropped from the search index and the ticker rings
+    """
+
+    def __init__(self, directory: str, retention_days: int, batch_size: int):
+        self.directory: str = directory
+        self.retention_days: int = retention_days
+        self.batch_size: int = batch_size
+
+    @property
+    def enabled(self) -> bool:
+        return self.retention_days > 0
+
+    def hot_window_start(self) -> date:
+        """first day held in the database, earlier days are archived"""
+        return date.today() - timedelta(days=self.retention_days)
+
+    def is_archived(self, day: date) -> bool:
+        return self.enabled and day < self.hot_window_start()
+
+    def run(self) -> int:
+        """runs archive_expired in a new session, returns total articles archived"""
+        if not self.enabled:
+            return 0
+        with mysql_instance.get_session() as session:
+            return self.archive_expired(session=session)
+
+    def archive_expired(self, session) -> int:
+        """
+            **archive_expired**
+                moves articles published before the hot window into the archive, oldest first,
+                one batch at a time
+        :param session:
+        :return: total articles archived
+        """
+        cutoff = int(datetime.combine(self.hot_window_start(), datetime.min.time()).timestamp())
+        total_archived = 0
+        while True:
+            uuid_list = [uuid for uuid, in session.query(News.uuid).filter(News.providerPublishTime < cutoff)
+                         .order_by(News.providerPublishTime, News.uuid).limit(self.batch_size)]
+            if not uuid_list:
+                break
+
+            self.write_articles(rows=self._load_rows(uuid_list=uuid_list, session=session))
+            self._delete_articles(uuid_list=uuid_list, session=session)
+            search_index.remove_documents(uuid_list=uuid_list)
+            latest_articles.remove(uuid_list=uuid_list)
+            total_archived += len(uuid_list)
+            archive_logger.info(f"Archived {total_archived} articles")
+
+        return total_archived
+
+    def write_articles(self, rows: list[dict]) -> None:
+        """writes article rows to the partitions of the days they were published on"""
+        partitions: dict[date, list[dict]] = {}
+        for row in rows:
+            partitions.setdefault(datetime.fromtimestamp(row['providerPublishTime']).date(), []).append(row)
+
+        for day, day_rows in partitions.items():
+            directory = self._partition_path(day)
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, f"part-{time.time_ns()}.parquet")
+            table = pa.Table.from_pylist(day_rows, schema=ARTICLE_SCHEMA)
+            pq.write_table(table, f"{path}.tmp", compression='zstd')
+            with open(f"{path}.tmp", 'rb') as file:
+                os.fsync(file.fileno())
+            os.replace(f"{path}.tmp", path)
+
+    def read_day(self, day: date) -> list[dict]:
+        """
+            **read_day**
+                summaries of the archived articles published on day, most recent first
+        :param day:
+        :return: summaries in the shape returned by News.fetch_summaries
+        """
+        directory = self._partition_path(day)
+        if not os.path.isdir(directory):
+            return []
+
+        columns = [column for column in ARTICLE_SCHEMA.names if column != 'body']
+        summaries: dict[str, dict] = {}
+        for name in sorted(os.listdir(directory)):
+            if not name.endswith('.parquet'):
+                continue
+            for row in pq.read_table(os.path.join(directory, name), columns=columns).to_pylist():
+                if row['sentiment'] is None:
+                    del row['sentiment']
+                summaries[row['uuid']] = row
+
+        return sorted(summaries.values(), key=lambda summary: (summary['providerPublishTime'], summary['uuid']),
+                      reverse=True)
+
+    def fetch_summaries_by_day_published(self, date_published: str, session,
+                                         cursor: tuple[int, str] | None = None,
+                                         page_size: int | None = None) -> list[dict]:
+        """
+            **fetch_summaries_by_day_published**
+                same as News.fetch_summaries_by_day_published for days outside the hot window,
+                the archived partition is merged with the articles of that day still in the database
+        :param date_published:
+        :param session:
+        :param cursor: (providerPublishTime, uuid) of the last article on the previous page
+        :param page_size:
+        :return:
+        """
+        page_size = page_size or News.article_page_size
+        end_of_day, start_of_day = create_start_end_timestamps(_date=date_published)
+        hot = News.fetch_summaries_by_day_published(date_published=date_published, session=session,
+                                                    cursor=cursor, page_size=page_size)
+        archived = [summary for summary in self.read_day(datetime.fromtimestamp(start_of_day).date())
+                    if cursor is None or (summary['providerPublishTime'], summary['uuid']) < cursor]
+
+        merged = {summary['uuid']: summary for summary in archived[:page_size]}
+        merged.update((summary['uuid'], summary) for summary in hot)
+        return sorted(merged.values(), key=lambda summary: (summary['providerPublishTime'], summary['uuid']),
+                      reverse=True)[:page_size]
+
+    def _partition_path(self, day: date) -> str:
+        return os.path.join(self.directory, f"date={day.isoformat()}")
+
+    @staticmethod
+    def _load_rows(uuid_list: list[str], session) -> list[dict]:
+        rows = News.attach_collections(summaries=[News.summary_from_row(row) for row in session.query(
+            *News.summary_columns()).filter(News.uuid.in_(uuid_list))], session=session)
+        bodies = {news_body.uuid: news_body.text
+                  for news_body in session.query(NewsBody).filter(NewsBody.uuid.in_(uuid_list))}
+        for row in rows:
+            row['body'] = bodies.get(row['uuid'])
+        return rows
+
+    @staticmethod
+    def _delete_articles(uuid_list: list[str], session) -> None:
+        """
+            deletes the articles and the rows referring to them in a single transaction,
+            thumbnail images are shared between articles and stay
+        """
+        for column in (NewsSentiment.article_uuid, NewsThumbnail.uuid, RelatedTickers.uuid, TickerTimeline.uuid,
+                       NewsBody.uuid, News.uuid):
+            session.execute(delete(column.class_).where(column.in_(uuid_list)).execution_options(
+                synchronize_session=False))
+        session.commit()
+
+
+_archive_settings = config_instance().ARCHIVE_SETTINGS
+news_archive: NewsArchive = NewsArchive(directory=_archive_settings.DIRECTORY,
+                                        retention_days=_archive_settings.RETENTION_DAYS,
+                                        batch_size=_archive_settings.BATCH_SIZE)
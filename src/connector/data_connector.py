@@ -1,32 +1,27 @@
 import asyncio
-import pickle
-from typing import Coroutine, TypeAlias
 
 import aiohttp
-import pymysql
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy.exc import OperationalError, InterfaceError
 
 from src.config import config_instance
-from src.connector.data_instance import mysql_instance
+from src.connector.data_instance import mysql_instance, insert_ignore, model_rows, sessionType
+from src.connector.search_index import search_index, SearchDocument
+from src.connector.response_cache import response_cache, ticker_tag, publisher_tag, date_tag, TAG_LATEST
+from src.connector.spool import ArticleSpool, SpoolPosition
+from src.connector.ticker_rings import latest_articles
 from src.models import NewsArticle
 from src.models import RssArticle
-from src.models.sql.news import News, Thumbnails, RelatedTickers, NewsSentiment
-from src.telemetry import capture_telemetry
-from src.utils import camel_to_snake, create_id
+from src.models.sql.news import News, ThumbnailImage, NewsThumbnail, RelatedTickers, NewsSentiment, TickerTimeline, \
+    NewsBody
+from src.tasks.summarizer import summarizer
+from src.telemetry.memory import memory_registry
+from src.telemetry.metrics import metrics_registry, articles_received, articles_deduplicated, articles_stored
+from src.telemetry.tracing import tracer, traced
+from src.utils import camel_to_snake
 from src.utils.my_logger import init_logger
 
-sendArticleType: TypeAlias = Coroutine[NewsArticle, None, NewsArticle | None]
-
-
-async def save_to_local_drive(article: NewsArticle):
-    """
-        **save_to_local_drive**
-            will save articles that failed to be sent to the API to local hard drive as temporary storage
-    :param article:
-    :return:
-    """
-    _ = pickle.dumps(article)
-    # TODO- learn how to save pickled classes to storage - or use a package that has the functionality
+# errors which mean storage is unavailable - articles remain in the spool and get replayed later
+StorageUnavailable = (OperationalError, InterfaceError)
 
 
 # noinspection PyBroadException
@@ -36,6 +31,14 @@ class DataConnector:
 
         The Data Connector Keeps the articles in memory after reaching a certain thresh hold the articles
         are sent to the backend via CRON API.
+
+        every incoming article is first written to the local spool, spooled articles are acknowledged once
+        the database has committed them, if storage is unavailable the articles stay on the local drive and
+        are replayed from the spool on the next send or on startup.
+
+        once started the connector runs as a write behind buffer, a background flusher sends articles to the
+        database while scraping continues, whenever FLUSH_SIZE articles are waiting or FLUSH_INTERVAL seconds
+        have passed, producers wait on incoming_articles when MAX_PENDING articles are queued.
     """
 
     # noinspection PyUnusedLocal
@@ -44,6 +47,20 @@ class DataConnector:
         self._to_storage_delay: int = 96
         self.lock: asyncio.Lock = asyncio.Lock()
         self.mem_buffer: list[NewsArticle | RssArticle] = []
+        self._buffer_positions: list[SpoolPosition] = []
+        spool_settings = config_instance().SPOOL_SETTINGS
+        self.spool: ArticleSpool = ArticleSpool(directory=spool_settings.DIRECTORY,
+                                                segment_size=spool_settings.SEGMENT_SIZE,
+                                                fsync_mode=spool_settings.FSYNC_MODE,
+                                                fsync_interval=spool_settings.FSYNC_INTERVAL)
+        self._replay_batch_size: int = spool_settings.REPLAY_BATCH_SIZE
+        self._spool_backlog: bool = False
+        buffer_settings = config_instance().BUFFER_SETTINGS
+        self._flush_size: int = buffer_settings.FLUSH_SIZE
+        self._flush_interval: float = buffer_settings.FLUSH_INTERVAL
+        self._queue: asyncio.Queue[tuple[NewsArticle, SpoolPosition]] = asyncio.Queue(
+            maxsize=buffer_settings.MAX_PENDING)
+        self._flusher: asyncio.Task | None = None
         self.create_article_endpoint: str = f'{config_instance().CRON_ENDPOINT}/api/v1/news/article'
         self.aio_session: aiohttp.ClientSession = aiohttp.ClientSession(headers=create_auth_headers())
         self._logger = init_logger(camel_to_snake(self.__class__.__name__))
@@ -55,203 +72,419 @@ class DataConnector:
         """
         self._to_storage_delay = delay
 
-    async def article_not_saved(self, article: dict) -> bool:
-        return isinstance(article, dict) and (article.get('uuid', "1234") not in self._articles_present)
+    def prepare_storage(self) -> None:
+        """
+            **prepare_storage**
+                creates missing tables and indexes, fills the ticker timeline and the search index if they
+                were just created and moves article bodies left in news_sentiment into compressed storage
+        :return:
+        """
+        mysql_instance.create_all_tables()
+        with mysql_instance.get_session() as session:
+            TickerTimeline.backfill(session=session)
+            ThumbnailImage.backfill(session=session)
+            RelatedTickers.backfill_ids(session=session)
+            total_moved = NewsBody.backfill(session=session)
+            search_index.backfill(session=session)
+        if total_moved:
+            self._logger.info(f"Moved {total_moved} article bodies into compressed storage")
+        self._logger.info(f"Storage tables and indexes ready")
+
+    async def start(self) -> None:
+        """
+            **start**
+                starts the background flusher, articles left in the spool are replayed first
+        :return:
+        """
+        if self._flusher is None or self._flusher.done():
+            await asyncio.to_thread(self.spool.open)
+            summarizer.start()
+            # only articles spooled before this point are replayed, later ones reach the flusher through the queue
+            self._flusher = asyncio.create_task(self._flush_loop(replay_until=self.spool.head))
 
-    async def incoming_articles(self, article_list: list[NewsArticle]):
+    async def stop(self) -> None:
         """
-        **incoming_articles**
-            :param article_list:
-            :return:
+            **stop**
+                flushes queued articles and stops the background flusher
+        :return:
         """
-        if not article_list:
+        if self._flusher is None:
             return
+        await self.flush()
+        self._flusher.cancel()
+        self._flusher = None
+        await asyncio.to_thread(self.spool.close)
+        summarizer.close()
 
-        for article in article_list:
-            if article and (article.uuid not in self._articles_present):
-                self.mem_buffer.append(article)
-                self._articles_present.add(article.uuid)
-
-        self._logger.info(f"Done prepping articles batch for sending to storage")
-        self._logger.info(f"Total Articles Prepped : {len(self.mem_buffer)}")
-
-    async def mem_store_to_storage(self):
+    async def flush(self) -> None:
         """
-            **mem_store_to_storage**
-                will store articles in memory when articles buffer is full will send the articles to the backend
-                via EOD Stock  CRON API
+            **flush**
+                waits until every queued article has been through a database flush
         :return:
         """
-        if self.mem_buffer:
-            initial_articles = len(self.mem_buffer)
-            self._logger.info(f"Will attempt sending {initial_articles} Articles to the Cron API")
-            # create_article_tasks: list[sendArticleType] = [self.send_article_to_storage(article=article)
-            #                                                for article in self.mem_buffer if article]
-            _ = await self.send_to_database()
-            self.mem_buffer = []
-            self._logger.info(f"Sent {initial_articles - len(self.mem_buffer)} Articles to storage backend")
-        else:
-            self._logger.info(f"There is no articles to send to the CRON API")
+        await self.start()
+        await self._queue.join()
 
-            # await asyncio.sleep(delay=self._to_storage_delay)
+    @property
+    def pending_articles(self) -> int:
+        """articles queued or buffered and not yet flushed"""
+        return self._queue.qsize() + len(self.mem_buffer)
 
-    @capture_telemetry(name='send-article-to-storage')
-    async def send_article_to_storage(self, article: NewsArticle) -> NewsArticle | None:
+    def buffer_depths(self) -> dict[tuple[tuple[str, str], ...], int]:
+        """articles waiting in each stage before the database, labelled for the metrics gauge"""
+        return {(('buffer', 'queue'),): self._queue.qsize(),
+                (('buffer', 'memory'),): len(self.mem_buffer)}
+
+    async def _flush_loop(self, replay_until: SpoolPosition) -> None:
         """
-            **send_article_to_storage**
-                send articles via http to cron jobs server
-        :param article:
+            **_flush_loop**
+                collects queued articles into the memory buffer and sends them to the database
+                once FLUSH_SIZE articles are buffered or FLUSH_INTERVAL seconds after the first one arrived
+        :param replay_until: spool head when the flusher started
         :return:
         """
-        async with aiohttp.ClientSession(headers=create_auth_headers()) as session:
+        try:
+            await self.replay_spool(until=replay_until)
+        except Exception as e:
+            # the spooled articles are replayed again by the next flush
+            self._spool_backlog = True
+            self._logger.error(f"Exception Occurred while replaying the spool : {str(e)}")
+        loop = asyncio.get_running_loop()
+        while True:
+            self._take_from_queue(await self._queue.get())
+            deadline = loop.time() + self._flush_interval
+            while len(self.mem_buffer) < self._flush_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    self._take_from_queue(await asyncio.wait_for(self._queue.get(), timeout=timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            buffered = len(self.mem_buffer)
             try:
-                response: aiohttp.ClientResponse = await session.post(url=self.create_article_endpoint,
-                                                                      data=article.dict())
-                # response.raise_for_status()
-                if response.headers.get('Content-Type') == 'application/json':
-                    response_data: dict[str, str | dict[str, str]] = await response.json()
+                await self.send_to_database(_batch_size=self._flush_size)
+            except Exception as e:
+                self._logger.error(f"Exception Occurred while flushing articles : {str(e)}")
+            finally:
+                for _ in range(buffered):
+                    self._queue.task_done()
 
-                    self._logger.info(f"Sent article : response : {response_data.get('payload')}")
-                    return None
+    def _take_from_queue(self, item: tuple[NewsArticle, SpoolPosition]) -> None:
+        article, position = item
+        self.mem_buffer.append(article)
+        self._buffer_positions.append(position)
 
-                self._logger.error(f"Error sending article to database : {await response.text()}")
-                return article
+    async def replay_spool(self, until: SpoolPosition) -> int:
+        """
+            **replay_spool**
+                sends articles left in the spool by a crash or a storage outage to the database in batches,
+                stops at the first batch storage could not commit, the rest stays in the spool
+        :param until: replay articles spooled up to this position
+        :return: total articles replayed
+        """
+        total_replayed: int = 0
+        for payloads, position in self.spool.replay(batch_size=self._replay_batch_size, until=until):
+            articles: list[NewsArticle] = [NewsArticle.parse_raw(payload) for payload in payloads]
+            self._articles_present.update(article.uuid for article in articles)
+            if not await self.store_batch(batch_articles=articles):
+                self._logger.info(f"Storage unavailable, {self.spool.pending_bytes} bytes remain in the spool")
+                break
 
-            except aiohttp.ClientError as e:
-                self._logger.info(await response.text())
-                self._logger.error(f"ClientError caught while sending article to database : {str(e)}")
-                # NOTE:  return this article so it gets sent again
+            await asyncio.to_thread(self.spool.acknowledge, position)
+            total_replayed += len(articles)
 
-                await save_to_local_drive(article=article)
-                return article
+        self._spool_backlog = self.spool.checkpoint < until
+        self._logger.info(f"Replayed {total_replayed} Articles from the spool")
+        return total_replayed
 
-            except Exception as e:
-                self._logger.error(f"Exception sending article to database : {str(e)}")
-                return article
+    async def article_not_saved(self, article: dict) -> bool:
+        return isinstance(article, dict) and (article.get('uuid', "1234") not in self._articles_present)
 
-    async def send_to_database(self, _batch_size: int = 20):
+    async def incoming_articles(self, article_list: list[NewsArticle]):
         """
-            **send_to_database**
-        :return:
+        **incoming_articles**
+            spools new articles and queues them for the background flusher,
+            waits for room in the queue when the database falls behind
+            :param article_list:
+            :return:
         """
+        if not article_list:
+            return
 
-        # process articles in groups of 20
-        batch_size: int = _batch_size if len(self.mem_buffer) > _batch_size else len(self.mem_buffer)
-        total_saved = 0
+        new_articles: list[NewsArticle] = []
+        for article in article_list:
+            if article and (article.uuid not in self._articles_present):
+                new_articles.append(article)
+                self._articles_present.add(article.uuid)
 
-        for i in range(0, len(self.mem_buffer), batch_size):
-            batch_articles: list[NewsArticle] = self.mem_buffer[i:i + batch_size]
+        received = sum(1 for article in article_list if article)
+        articles_received.inc(received)
+        articles_deduplicated.inc(received - len(new_articles))
+        if not new_articles:
+            return
 
-            news_instances = await asyncio.gather(*[self.create_news_instance(article)
-                                                    for article in batch_articles if article is not None])
-            sentiment_instances = await asyncio.gather(*[self.create_news_sentiment(article)
-                                                         for article in batch_articles if article is not None])
-            thumbnail_instances = await asyncio.gather(*[self.create_thumbnails_instance(article)
-                                                         for article in batch_articles if article is not None])
-            related_tickers_instances = await asyncio.gather(*[self.create_related_tickers(article)
-                                                               for article in batch_articles if article is not None])
-            total_saved += batch_size
+        await self.start()
+        positions = await asyncio.to_thread(self.spool.append_many, [article.json().encode('utf-8')
+                                                                     for article in new_articles])
+        for article, position in zip(new_articles, positions):
+            await self._queue.put((article, position))
 
-            await self.save_news_instances(news_instances)
+        self._logger.info(f"Done prepping articles batch for sending to storage")
+        self._logger.info(f"Total Articles Pending : {self.pending_articles}")
 
-            await self.save_news_sentiment(sentiment_instances)
+    async def send_to_database(self, _batch_size: int = 20) -> bool:
+        """
+            **send_to_database**
+                sends buffered articles to the database in batches, acknowledging each committed batch in the spool,
+                if the spool holds articles from an earlier failed send they are replayed from the spool instead
+        :return: True if every article was committed
+        """
+        buffer, positions = self.mem_buffer, self._buffer_positions
+        self.mem_buffer, self._buffer_positions = [], []
 
-            await self.save_thumbnails(thumbnail_instances)
+        if self._spool_backlog:
+            # earlier articles are waiting in the spool, the buffered articles are in the spool as well
+            self._logger.info(f"Spool holds {self.spool.pending_bytes} bytes of unsaved articles, replaying")
+            await self.replay_spool(until=positions[-1] if positions else self.spool.head)
+            return not self._spool_backlog
 
-            await self.save_related_tickers(related_tickers_instances)
+        # process articles in groups of 20
+        total_saved = 0
+        for i in range(0, len(buffer), _batch_size):
+            batch_articles: list[NewsArticle] = buffer[i:i + _batch_size]
+            try:
+                stored = await self.store_batch(batch_articles=batch_articles)
+            except Exception:
+                # acknowledging a later batch would drop these articles from the spool, replay them instead
+                self._spool_backlog = True
+                raise
+            if not stored:
+                self._logger.info(f"Storage unavailable, {len(buffer) - total_saved} Articles kept in the spool")
+                self._spool_backlog = True
+                return False
+
+            await asyncio.to_thread(self.spool.acknowledge, positions[i + len(batch_articles) - 1])
+            total_saved += len(batch_articles)
 
             self._logger.info(f"Batch Count : {i}")
 
             self._logger.info(f"Overall Articles Saved : {total_saved}")
 
-    async def save_related_tickers(self, related_tickers_instances: list[list[RelatedTickers]]):
+        return True
+
+    async def store_batch(self, batch_articles: list[NewsArticle]) -> bool:
         """
-            **save_thumbnail_instances**
-                will save thumbnails to database
-        :param related_tickers_instances:
-        :return: None
+            **store_batch**
+                creates database models for a batch of articles and saves them
+        :param batch_articles:
+        :return: False if storage was unavailable
         """
-        try:
-            with mysql_instance.get_session() as session:
-                for tickers_list in related_tickers_instances:
-                    if tickers_list is not None:
-                        for ticker in tickers_list:
-                                if isinstance(ticker, RelatedTickers):
-                                    session.add(ticker)
-                                    session.commit()
-                                else:
-                                    self._logger.info(f"Related Ticker not correct type")
-
-        except IntegrityError:
-            self._logger.info(f"Exception Occurred Data Integrity Error")
-        except Exception:
-            self._logger.info(f"Exception Occurred when adding Tickers")
-
-    async def save_thumbnails(self, thumbnail_instances: list[list[Thumbnails]]):
+        with tracer.trace('store_batch', articles=len(batch_articles)):
+            return await self._store_batch(batch_articles=batch_articles)
+
+    async def _store_batch(self, batch_articles: list[NewsArticle]) -> bool:
+        # the tldr is computed once here instead of keeping the first paragraph of the page
+        with tracer.span('summarize_articles'):
+            await summarizer.summarize_articles(articles=batch_articles)
+
+        news_instances = await asyncio.gather(*[self.create_news_instance(article)
+                                                for article in batch_articles if article is not None])
+        sentiment_instances = await asyncio.gather(*[self.create_news_sentiment(article)
+                                                     for article in batch_articles if article is not None])
+        thumbnail_instances = await asyncio.gather(*[self.create_thumbnails_instance(article)
+                                                     for article in batch_articles if article is not None])
+        related_tickers_instances = await asyncio.gather(*[self.create_related_tickers(article)
+                                                           for article in batch_articles if article is not None])
+        timeline_instances = await asyncio.gather(*[self.create_timeline_entries(article)
+                                                    for article in batch_articles if article is not None])
+        body_instances = await asyncio.gather(*[self.create_news_body(article)
+                                                for article in batch_articles if article is not None])
+
+        # database writes run on a worker thread so scraping carries on while the batch is stored
+        stored: bool = await asyncio.to_thread(self._save_batch, news_instances, sentiment_instances,
+                                               thumbnail_instances, related_tickers_instances, timeline_instances,
+                                               body_instances)
+        if stored:
+            articles_stored.inc(len(news_instances))
+            await self.index_stored_articles(batch_articles=batch_articles)
+            await self.index_for_search(batch_articles=batch_articles)
+            self.invalidate_cached_responses(batch_articles=batch_articles)
+        return stored
+
+    def invalidate_cached_responses(self, batch_articles: list[NewsArticle]) -> None:
         """
-            **save_thumbnails**
+            **invalidate_cached_responses**
+                removes cached read responses covering the tickers, publishers and days of stored articles
+        :param batch_articles:
+        :return:
+        """
+        tags: set[str] = {TAG_LATEST}
+        for article in batch_articles:
+            tags.update(ticker_tag(ticker) for ticker in article.relatedTickers or [])
+            # days are local time, the same as create_start_end_timestamps
+            tags.add(date_tag(article.publish_time.date()))
+            if article.publisher:
+                tags.add(publisher_tag(article.publisher))
+
+        removed = response_cache.invalidate(tags=tags)
+        self._logger.info(f"Invalidated {removed} cached responses")
+
+    async def index_stored_articles(self, batch_articles: list[NewsArticle]) -> None:
+        """
+            **index_stored_articles**
+                adds the summaries of stored articles to the in memory latest articles index
+        :param batch_articles:
+        :return:
+        """
+        try:
+            summaries = await asyncio.to_thread(self._load_summaries, [article.uuid for article in batch_articles])
+            latest_articles.add_summaries(summaries=summaries)
+        except Exception as e:
+            self._logger.info(f"Unable to index stored articles : {str(e)}")
 
-        :param thumbnail_instances:
+    @staticmethod
+    def _load_summaries(uuid_list: list[str]) -> list[dict]:
+        with mysql_instance.get_session() as session:
+            return News.fetch_summaries_by_uuid_list(uuid_list=uuid_list, session=session)
+
+    async def index_for_search(self, batch_articles: list[NewsArticle]) -> None:
+        """
+            **index_for_search**
+                adds the titles and bodies of stored articles to the full text search index
+        :param batch_articles:
         :return:
         """
         try:
+            documents = [SearchDocument.from_article(article) for article in batch_articles]
+            await asyncio.to_thread(search_index.add_documents, documents)
+        except Exception as e:
+            self._logger.info(f"Unable to index articles for search : {str(e)}")
 
-            with mysql_instance.get_session() as session:
-                for thumbnail_list in thumbnail_instances:
-                    if thumbnail_list is not None:
-                        for thumbnail in thumbnail_list:
-                                if isinstance(thumbnail, Thumbnails):
-                                    session.add(thumbnail)
-                                    session.commit()
-                                else:
-                                    self._logger.info(f"Thumbnail not correct type : {str(thumbnail)}")
+    def _save_batch(self, news_instances: list[News], sentiment_instances: list[NewsSentiment],
+                    thumbnail_instances: list[list[NewsThumbnail]],
+                    related_tickers_instances: list[list[RelatedTickers]],
+                    timeline_instances: list[list[TickerTimeline]], body_instances: list[NewsBody]) -> bool:
+        """
+            **_save_batch**
+                stores a batch in a single transaction, every table is written with one multi row INSERT IGNORE,
+                all ids are derived from the article so rows which are already stored, such as articles replayed
+                from the spool, are skipped instead of failing
+
+                if the database rejects a row the whole statement fails, the articles are then stored one
+                at a time so only the rejected article is dropped
+        :return: False if storage was unavailable
+        """
+        instances = (news_instances, sentiment_instances, body_instances, thumbnail_instances,
+                     related_tickers_instances, timeline_instances)
+        try:
+            self._store_instances(*instances)
+            return True
+        except StorageUnavailable as e:
+            self._logger.error(f"Storage unavailable : {str(e)}")
+            return False
+        except Exception as e:
+            self._logger.info(f"Unable to store batch, storing articles one at a time : {str(e)}")
 
-        except IntegrityError:
-            self._logger.info(f"Exception Occurred Data Integrity Error")
-        except Exception:
-            self._logger.info(f"Exception Occurred when Adding Thumbnails")
+        for article_instances in zip(*instances):
+            try:
+                self._store_instances(*[[instance] for instance in article_instances])
+            except StorageUnavailable as e:
+                self._logger.error(f"Storage unavailable : {str(e)}")
+                return False
+            except Exception as e:
+                self._logger.info(f"Exception Occurred When adding News Article : {str(e)}")
+        return True
+
+    def _store_instances(self, news_instances: list[News], sentiment_instances: list[NewsSentiment],
+                         body_instances: list[NewsBody], thumbnail_instances: list[list[NewsThumbnail]],
+                         related_tickers_instances: list[list[RelatedTickers]],
+                         timeline_instances: list[list[TickerTimeline]]) -> None:
+        with tracer.span('store_instances', articles=len(news_instances)), mysql_instance.get_session() as session:
+            self.save_news_instances(news_instances, session=session)
+            self.save_news_sentiment(sentiment_instances, session=session)
+            self.save_news_bodies(body_instances, session=session)
+            self.save_thumbnails(thumbnail_instances, session=session)
+            self.save_related_tickers(related_tickers_instances, session=session)
+            self.save_ticker_timeline(timeline_instances, session=session)
+            session.commit()
+
+    @staticmethod
+    def _insert_ignore(model, instances: list, session: sessionType) -> None:
+        rows = model_rows([instance for instance in instances if isinstance(instance, model)])
+        if rows:
+            session.execute(insert_ignore(model), rows)
+
+    @traced('save_ticker_timeline')
+    def save_ticker_timeline(self, timeline_instances: list[list[TickerTimeline]], session: sessionType) -> None:
+        """
+            **save_ticker_timeline**
+                adds the articles to the timeline of each of their tickers
+        :param timeline_instances:
+        :param session:
+        :return:
+        """
+        self._insert_ignore(TickerTimeline, [entry for entries in timeline_instances for entry in entries or []],
+                            session=session)
 
-    async def save_news_sentiment(self, sentiment_instances: list[NewsSentiment]):
+    @traced('save_related_tickers')
+    def save_related_tickers(self, related_tickers_instances: list[list[RelatedTickers]],
+                             session: sessionType) -> None:
         """
-            **save_news_sentiment**
+            **save_related_tickers**
+        :param related_tickers_instances:
+        :param session:
+        :return:
+        """
+        self._insert_ignore(RelatedTickers,
+                            [ticker for tickers in related_tickers_instances for ticker in tickers or []],
+                            session=session)
 
+    @traced('save_thumbnails')
+    def save_thumbnails(self, thumbnail_instances: list[list[NewsThumbnail]], session: sessionType) -> None:
+        """
+            **save_thumbnails**
+                stores each thumbnail image once and links it to its article
+        :param thumbnail_instances:
+        :param session:
+        :return:
+        """
+        links = [link for links in thumbnail_instances for link in links or [] if isinstance(link, NewsThumbnail)]
+        # images shared by several articles of the batch are written once
+        self._insert_ignore(ThumbnailImage, list({link.thumbnail_id: link.image for link in links}.values()),
+                            session=session)
+        self._insert_ignore(NewsThumbnail, links, session=session)
+
+    @traced('save_news_sentiment')
+    def save_news_sentiment(self, sentiment_instances: list[NewsSentiment], session: sessionType) -> None:
+        """
+            **save_news_sentiment**
         :param sentiment_instances:
+        :param session:
         :return:
         """
-        try:
+        self._insert_ignore(NewsSentiment, sentiment_instances, session=session)
 
-            with mysql_instance.get_session() as session:
-                for news_sentiment in sentiment_instances:
-                        if isinstance(news_sentiment, NewsSentiment):
-                            session.add(news_sentiment)
-                            session.commit()
-                        else:
-                            self._logger.info(f"news Sentiment not correct type : {str(news_sentiment)}")
-        except IntegrityError:
-            self._logger.info(f"Exception Occurred Data Integrity Error")
-        except Exception as e:
-            self._logger.info(f"Exception Occurred When adding News Sentiment : {str(e)}")
+    @traced('save_news_bodies')
+    def save_news_bodies(self, body_instances: list[NewsBody], session: sessionType) -> None:
+        """
+            **save_news_bodies**
+        :param body_instances:
+        :param session:
+        :return:
+        """
+        self._insert_ignore(NewsBody, body_instances, session=session)
 
-    async def save_news_instances(self, news_instances: list[News]):
+    @traced('save_news_instances')
+    def save_news_instances(self, news_instances: list[News], session: sessionType) -> None:
         """
             **save_news_instances**
-
         :param news_instances:
+        :param session:
         :return:
         """
-        try:
-            with mysql_instance.get_session() as session:
-                for article in news_instances:
-
-                        if isinstance(article, News):
-                            session.add(article)
-                            session.commit()
-                        else:
-                            self._logger.info(f" News not correct Type: {str(article)}")
-        except (IntegrityError, pymysql.err.IntegrityError):
-            self._logger.info(f"Exception Occurred Data Integrity Error")
-        except Exception as e:
-            self._logger.info(f"Exception Occurred When adding News Article : {str(e)}")
+        self._insert_ignore(News, news_instances, session=session)
 
     async def create_news_instance(self, article: NewsArticle) -> News | None:
         """
@@ -280,23 +513,36 @@ class DataConnector:
         try:
             if article.summary or article.body:
                 return NewsSentiment(article_uuid=article.uuid, stock_codes=",".join(article.relatedTickers),
-                                     title=article.title, link=article.link, article=article.body,
-                                     article_tldr=article.summary)
+                                     title=article.title, link=article.link, article_tldr=article.summary)
             return None
         except Exception as e:
             self._logger.info(f"Unable to create instance Sentiment Model : {str(e)}")
             return None
 
-    async def create_thumbnails_instance(self, article: NewsArticle) -> list[Thumbnails] | None:
+    async def create_news_body(self, article: NewsArticle) -> NewsBody | None:
         """
-        **create_thumbnails_instance**
+        **create_news_body**
+            compressed body of the article, None when the article has no body
         :param article:
         :return:
         """
+        try:
+            return NewsBody(uuid=article.uuid, text=article.body) if article.body else None
+        except Exception as e:
+            self._logger.info(f"Unable to create instance News Body Model : {str(e)}")
+            return None
+
+    async def create_thumbnails_instance(self, article: NewsArticle) -> list[NewsThumbnail] | None:
+        """
+        **create_thumbnails_instance**
+        :param article:
+        :return: links from the article to each of its thumbnail images
+        """
         try:
             if isinstance(article.thumbnail, list):
-                thumb_nails = [Thumbnails(thumbnail_id=create_id(), uuid=article.uuid, url=thumb.url,
-                                          width=thumb.width, height=thumb.height, tag=thumb.tag)
+                thumb_nails = [NewsThumbnail(uuid=article.uuid, image=ThumbnailImage(url=thumb.url, width=thumb.width,
+                                                                                     height=thumb.height,
+                                                                                     tag=thumb.tag))
                                for thumb in article.thumbnail]
 
                 self._logger.info(f"Thumbnails : {thumb_nails}")
@@ -321,6 +567,22 @@ class DataConnector:
             self._logger.info(f"Unable to create Related Tickers Model : {str(e)}")
             return None
 
+    async def create_timeline_entries(self, article: NewsArticle) -> list[TickerTimeline] | None:
+        """
+        **create_timeline_entries**
+        :param article:
+        :return:
+        """
+        try:
+            if isinstance(article.relatedTickers, list):
+                return [TickerTimeline(ticker=ticker, providerPublishTime=article.providerPublishTime,
+                                       uuid=article.uuid) for ticker in set(article.relatedTickers)]
+
+            return None
+        except Exception as e:
+            self._logger.info(f"Unable to create Ticker Timeline Model : {str(e)}")
+            return None
+
 
 def create_auth_headers():
     return {
@@ -333,3 +595,11 @@ def create_auth_headers():
 
 
 data_sink: DataConnector = DataConnector()
+memory_registry.collection('data_sink.mem_buffer', lambda: data_sink.mem_buffer)
+memory_registry.collection('data_sink.articles_present', lambda: data_sink._articles_present)
+# asyncio.Queue keeps its items in a deque
+memory_registry.collection('data_sink.queue', lambda: data_sink._queue._queue)
+metrics_registry.gauge('news_buffer_articles', "Articles waiting in the data sink buffers",
+                       callback=data_sink.buffer_depths)
+metrics_registry.gauge('news_spool_pending_bytes', "Bytes of spooled articles not yet acknowledged by storage",
+                       callback=lambda: {(): data_sink.spool.pending_bytes})
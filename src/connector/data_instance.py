@@ -1,8 +1,9 @@
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, insert
 from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import sessionmaker, Session, declarative_base
 from src.config import config_instance
+from src.telemetry.metrics import metrics_registry
 from src.utils import camel_to_snake
 from src.utils.my_logger import init_logger
 
@@ -10,6 +11,22 @@ Base = declarative_base()
 sessionType = Session
 
 
+def insert_ignore(table):
+    """
+        insert statement which skips rows whose primary or unique key already exists instead of failing,
+        used for rows that are identified by their content and written again on re-ingest
+    :param table: model or table
+    :return:
+    """
+    return insert(table).prefix_with('IGNORE', dialect='mysql').prefix_with('OR IGNORE', dialect='sqlite')
+
+
+def model_rows(instances: list) -> list[dict]:
+    """column values of model instances, as passed to a multi row insert"""
+    return [{attribute.key: getattr(instance, attribute.key) for attribute in inspect(instance).mapper.column_attrs}
+            for instance in instances]
+
+
 class MYSQLDatabase:
     """Base class for database connection.
     """
@@ -48,8 +65,29 @@ class MYSQLDatabase:
                 session.add(instance)
             session.commit()
 
+    def pool_stats(self) -> dict[tuple[tuple[str, str], ...], int]:
+        """connections of the engine pool by state, labelled for the metrics gauge"""
+        pool = self.engine.pool
+        return {(('state', state),): getattr(pool, state)()
+                for state in ('size', 'checkedin', 'checkedout', 'overflow') if hasattr(pool, state)}
+
     def create_all_tables(self):
         Base.metadata.create_all(bind=self.engine)
+        self.create_missing_indexes()
+
+    def create_missing_indexes(self):
+        """
+            create_all only creates indexes together with their table,
+            this adds indexes declared on models after their tables were created
+        :return:
+        """
+        inspector = inspect(self.engine)
+        for table in Base.metadata.sorted_tables:
+            if inspector.has_table(table.name):
+                for index in table.indexes:
+                    index.create(bind=self.engine, checkfirst=True)
 
 
 mysql_instance = MYSQLDatabase()
+metrics_registry.gauge('news_db_pool_connections', "Database pool connections by state",
+                       callback=mysql_instance.pool_stats)
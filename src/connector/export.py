@@ -0,0 +1,120 @@
+"""
+    **export**
+        streams every article in a date or ticker range as NDJSON or Parquet without holding the range in memory,
+        news rows are read through a server side cursor in chunks of EXPORT_CHUNK_SIZE and the tickers,
+        thumbnails and sentiment of each chunk are loaded with batched IN queries on a second session
+"""
+import json
+import zlib
+from typing import Iterator
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import select
+
+from src.connector.archive import ARTICLE_SCHEMA
+from src.connector.data_instance import mysql_instance
+from src.models.sql.news import News, TickerTimeline
+
+EXPORT_CHUNK_SIZE = 1000
+EXPORT_SCHEMA = ARTICLE_SCHEMA.remove(ARTICLE_SCHEMA.get_field_index('body'))
+
+FORMAT_NDJSON = 'ndjson'
+FORMAT_PARQUET = 'parquet'
+MEDIA_TYPES = {FORMAT_NDJSON: 'application/x-ndjson', FORMAT_PARQUET: 'application/vnd.apache.parquet'}
+
+
+def export_criteria(start_time: int | None, end_time: int | None, ticker: str | None) -> tuple:
+    criteria = []
+    if start_time is not None:
+        criteria.append(News.providerPublishTime >= start_time)
+    if end_time is not None:
+        criteria.append(News.providerPublishTime <= end_time)
+    if ticker:
+        criteria.append(News.uuid.in_(select(TickerTimeline.uuid).where(TickerTimeline.ticker == ticker.upper())))
+    return tuple(criteria)
+
+
+def article_chunks(criteria: tuple, chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[list[dict]]:
+    """
+        **article_chunks**
+            article summaries matching criteria, oldest first, chunk_size at a time
+    :param criteria: filter expressions on News
+    :param chunk_size:
+    :return:
+    """
+    statement = (select(*News.summary_columns()).where(*criteria)
+                 .order_by(News.providerPublishTime, News.uuid)
+                 .execution_options(stream_results=True, yield_per=chunk_size))
+
+    # the streaming cursor keeps its connection busy, collections are loaded on a second session
+    with mysql_instance.get_session() as stream_session, mysql_instance.get_session() as session:
+        for rows in stream_session.execute(statement).partitions():
+            yield News.attach_collections(summaries=[News.summary_from_row(row) for row in rows], session=session)
+
+
+def ndjson_stream(chunks: Iterator[list[dict]]) -> Iterator[bytes]:
+    for summaries in chunks:
+        yield b''.join(json.dumps(summary, separators=(',', ':')).encode('utf-8') + b'\n' for summary in summaries)
+
+
+class _ChunkSink:
+    """write only file object collecting what the parquet writer has written since the last drain"""
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+        self._position: int = 0
+        self.closed: bool = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def parquet_stream(chunks: Iterator[list[dict]]) -> Iterator[bytes]:
+    """every chunk is written as a row group and sent as soon as it is encoded"""
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(pa.PythonFile(sink, mode='w'), EXPORT_SCHEMA, compression='zstd')
+    for summaries in chunks:
+        writer.write_table(pa.Table.from_pylist(summaries, schema=EXPORT_SCHEMA))
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+
+def gzip_stream(stream: Iterator[bytes]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    for data in stream:
+        compressed = compressor.compress(data)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def export_stream(criteria: tuple, export_format: str, gzip: bool) -> Iterator[bytes]:
+    """
+        **export_stream**
+    :param criteria: filter expressions on News
+    :param export_format: ndjson or parquet
+    :param gzip: compress the stream with gzip
+    :return: response body chunks
+    """
+    chunks = article_chunks(criteria=criteria)
+    stream = parquet_stream(chunks) if export_format == FORMAT_PARQUET else ndjson_stream(chunks)
+    return gzip_stream(stream) if gzip else stream
@@ -0,0 +1,169 @@
+"""
+    **ResponseCache**
+        caches serialized read route responses, entries are keyed by the normalized query,
+        expire after a ttl, are evicted least recently used first once the cache holds max_bytes,
+        and carry tags (ticker, publisher, date) so DataConnector can invalidate them when it stores articles.
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import Awaitable, Callable, NamedTuple
+
+from src.config import config_instance
+
+TAG_LATEST = 'latest'
+
+
+def ticker_tag(ticker: str) -> str:
+    return f"ticker:{ticker.upper()}"
+
+
+def publisher_tag(publisher: str) -> str:
+    return f"publisher:{publisher}"
+
+
+def date_tag(date_published: date) -> str:
+    return f"date:{date_published.isoformat()}"
+
+
+class LoadCancelled(Exception):
+    """set on a shared load whose request was cancelled, the requests waiting on it load the key again"""
+
+
+class CacheEntry(NamedTuple):
+    value: bytes
+    expires_at: float
+    tags: frozenset[str]
+
+
+class ResponseCache:
+    """
+    **ResponseCache**
+        concurrent misses for the same key share a single load
+    """
+
+    def __init__(self, ttl: float, max_bytes: int):
+        self.ttl: float = ttl
+        self.max_bytes: int = max_bytes
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._tags: dict[str, set[str]] = {}
+        self._loading: dict[str, asyncio.Future] = {}
+        self._generation: int = 0
+        self.total_bytes: int = 0
+        self.hits: int = 0
+        self.misses: int = 0
+        self.coalesced: int = 0
+
+    @staticmethod
+    def create_key(route: str, **params) -> str:
+        """normalized cache key, parameters are sorted so their order does not matter"""
+        return f"{route}?" + "&".join(f"{name}={value}" for name, value in sorted(params.items()))
+
+    async def get_or_load(self, key: str, tags: set[str], loader: Callable[[], Awaitable[bytes]]) -> bytes:
+        """
+            **get_or_load**
+                returns the cached response for key, or loads it - a miss while the same key is already
+                loading waits for that load instead of running its own query
+        :param key: normalized query key
+        :param tags: tags used to invalidate the entry
+        :param loader: coroutine function returning the serialized response
+        :return:
+        """
+        while True:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry.expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry.value
+                self._remove(key)
+
+            loading = self._loading.get(key)
+            if loading is None:
+                break
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(loading)
+            except LoadCancelled:
+                # the request running the load was cancelled, not this one - load the key again
+                continue
+
+        self.misses += 1
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._loading[key] = future
+        generation = self._generation
+        try:
+            value = await loader()
+        except asyncio.CancelledError:
+            future.set_exception(LoadCancelled())
+            future.exception()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # retrieve the exception so failures without waiters are not reported as never retrieved
+            future.exception()
+            raise
+        finally:
+            del self._loading[key]
+
+        future.set_result(value)
+        # an invalidation while loading means the value may already be stale
+        if generation == self._generation:
+            self._store(key=key, value=value, tags=frozenset(tags))
+        return value
+
+    def invalidate(self, tags: set[str]) -> int:
+        """
+            **invalidate**
+                removes every entry carrying one of tags
+        :param tags:
+        :return: total entries removed
+        """
+        self._generation += 1
+        keys = set()
+        for tag in tags:
+            keys.update(self._tags.get(tag, ()))
+        for key in keys:
+            self._remove(key)
+        return len(keys)
+
+    def clear(self) -> None:
+        self._generation += 1
+        self._entries.clear()
+        self._tags.clear()
+        self.total_bytes = 0
+
+    @property
+    def total_entries(self) -> int:
+        return len(self._entries)
+
+    def _store(self, key: str, value: bytes, tags: frozenset[str]) -> None:
+        if len(value) > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+
+        self._entries[key] = CacheEntry(value=value, expires_at=time.monotonic() + self.ttl, tags=tags)
+        self.total_bytes += len(value)
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add(key)
+
+        while self.total_bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self.total_bytes -= len(entry.value)
+        for tag in entry.tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+
+_cache_settings = config_instance().RESPONSE_CACHE_SETTINGS
+response_cache: ResponseCache = ResponseCache(ttl=_cache_settings.TTL, max_bytes=_cache_settings.MAX_BYTES)
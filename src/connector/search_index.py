@@ -0,0 +1,234 @@
+"""
+    **ArticleSearchIndex**
+        full text search over article titles and bodies, kept in a local sqlite database using an FTS5
+        inverted index, fed by DataConnector as articles are stored.
+
+        queries are a list of terms which must all match, "quoted words" match as a phrase and
+        a trailing * matches every word starting with the term, results are ranked with bm25 with
+        title matches weighted above body matches.
+"""
+import re
+import sqlite3
+import threading
+from typing import NamedTuple
+
+from src.config import config_instance
+from src.exceptions import InputError
+from src.models import NewsArticle
+from src.models.sql.news import News, NewsBody, RelatedTickers
+from src.utils.my_logger import init_logger
+
+search_logger = init_logger('search-index-logger')
+
+QUERY_PATTERN = re.compile(r'"([^"]*)"|(\S+)')
+WORD_PATTERN = re.compile(r'\w+')
+TITLE_WEIGHT = 10.0
+BODY_WEIGHT = 1.0
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS articles (id INTEGER PRIMARY KEY, uuid TEXT UNIQUE NOT NULL, publish_time INTEGER)",
+    "CREATE INDEX IF NOT EXISTS ix_articles_publish_time ON articles (publish_time)",
+    "CREATE TABLE IF NOT EXISTS article_tickers (ticker TEXT NOT NULL, article_id INTEGER NOT NULL, "
+    "PRIMARY KEY (ticker, article_id)) WITHOUT ROWID",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(title, body, tokenize='porter unicode61', "
+    "prefix='2 3')",
+)
+
+
+class SearchDocument(NamedTuple):
+    uuid: str
+    title: str
+    body: str
+    publish_time: int | None
+    tickers: list[str]
+
+    @classmethod
+    def from_article(cls, article: NewsArticle) -> 'SearchDocument':
+        return cls(uuid=article.uuid, title=article.title or "", body=article.body or "",
+                   publish_time=article.providerPublishTime, tickers=article.relatedTickers or [])
+
+
+class SearchHit(NamedTuple):
+    uuid: str
+    rank: float
+    snippet: str
+
+
+def to_match_query(query: str) -> str:
+    """
+        **to_match_query**
+            converts a user query to an FTS5 match expression, every word is quoted so
+            FTS5 operators and punctuation in the query cannot break the expression
+    :param query:
+    :return: match expression
+    """
+    terms: list[str] = []
+    for phrase, term in QUERY_PATTERN.findall(query):
+        words = WORD_PATTERN.findall(phrase or term)
+        if not words:
+            continue
+        if phrase:
+            terms.append('"' + ' '.join(words) + '"')
+        else:
+            terms.extend(f'"{word}"' for word in words)
+            if term.endswith('*'):
+                terms[-1] += '*'
+
+    if not terms:
+        raise InputError(description="Search query has no words to search for")
+    return ' '.join(terms)
+
+
+class ArticleSearchIndex:
+    """
+    **ArticleSearchIndex**
+        the sqlite connection is shared between threads, every statement runs under the lock
+    """
+
+    def __init__(self, database: str, max_results: int):
+        self.database: str = database
+        self.max_results: int = max_results
+        self._connection: sqlite3.Connection | None = None
+        self._lock: threading.Lock = threading.Lock()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if self._connection is None:
+            connection = sqlite3.connect(self.database, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            for statement in SCHEMA:
+                connection.execute(statement)
+            connection.commit()
+            self._connection = connection
+        return self._connection
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    @property
+    def total_documents(self) -> int:
+        with self._lock:
+            return self.connection.execute("SELECT count(*) FROM articles").fetchone()[0]
+
+    def add_documents(self, documents: list[SearchDocument]) -> int:
+        """
+            **add_documents**
+                indexes documents, articles already in the index are skipped
+        :param documents:
+        :return: total documents added
+        """
+        total_added = 0
+        with self._lock:
+            connection = self.connection
+            with connection:
+                for document in documents:
+                    cursor = connection.execute("INSERT OR IGNORE INTO articles (uuid, publish_time) VALUES (?, ?)",
+                                                (document.uuid, document.publish_time))
+                    if not cursor.rowcount:
+                        continue
+                    article_id = cursor.lastrowid
+                    connection.execute("INSERT INTO articles_fts (rowid, title, body) VALUES (?, ?, ?)",
+                                       (article_id, document.title, document.body))
+                    connection.executemany("INSERT OR IGNORE INTO article_tickers (ticker, article_id) VALUES (?, ?)",
+                                           [(ticker.upper(), article_id) for ticker in document.tickers])
+                    total_added += 1
+        return total_added
+
+    def remove_documents(self, uuid_list: list[str]) -> int:
+        """
+            **remove_documents**
+                removes articles from the index, articles not in the index are skipped
+        :param uuid_list:
+        :return: total documents removed
+        """
+        with self._lock:
+            connection = self.connection
+            with connection:
+                article_ids = [(article_id,) for uuid in uuid_list for article_id, in connection.execute(
+                    "SELECT id FROM articles WHERE uuid = ?", (uuid,))]
+                connection.executemany("DELETE FROM articles_fts WHERE rowid = ?", article_ids)
+                connection.executemany("DELETE FROM article_tickers WHERE article_id = ?", article_ids)
+                connection.executemany("DELETE FROM articles WHERE id = ?", article_ids)
+        return len(article_ids)
+
+    def search(self, query: str, ticker: str | None = None, start_time: int | None = None,
+               end_time: int | None = None, limit: int = 10, offset: int = 0) -> list[SearchHit]:
+        """
+            **search**
+                ranked matches for query, best match first
+        :param query: terms, "phrases" and prefix* terms, all of which must match
+        :param ticker: only articles related to ticker
+        :param start_time: only articles published at or after this timestamp
+        :param end_time: only articles published at or before this timestamp
+        :param limit:
+        :param offset:
+        :return: hits with a highlighted snippet of the matching text
+        """
+        if offset + limit > self.max_results:
+            raise InputError(description=f"Search results are limited to the first {self.max_results} matches")
+
+        statement = [f"SELECT a.uuid, bm25(articles_fts, {TITLE_WEIGHT}, {BODY_WEIGHT}) AS rank, "
+                     "snippet(articles_fts, -1, '<b>', '</b>', '...', 16) FROM articles_fts "
+                     "JOIN articles a ON a.id = articles_fts.rowid WHERE articles_fts MATCH ?"]
+        parameters: list = [to_match_query(query)]
+        if ticker:
+            statement.append("AND a.id IN (SELECT article_id FROM article_tickers WHERE ticker = ?)")
+            parameters.append(ticker.upper())
+        if start_time is not None:
+            statement.append("AND a.publish_time >= ?")
+            parameters.append(start_time)
+        if end_time is not None:
+            statement.append("AND a.publish_time <= ?")
+            parameters.append(end_time)
+        statement.append("ORDER BY rank LIMIT ? OFFSET ?")
+        parameters.extend([limit, offset])
+
+        with self._lock:
+            rows = self.connection.execute(" ".join(statement), parameters).fetchall()
+        return [SearchHit(uuid=uuid, rank=rank, snippet=snippet) for uuid, rank, snippet in rows]
+
+    def backfill(self, session, batch_size: int = 500) -> int:
+        """
+            **backfill**
+                indexes the articles already in the database when the search index is empty,
+                articles are read in primary key order one batch at a time
+        :param session:
+        :param batch_size:
+        :return: total documents added
+        """
+        if self.total_documents:
+            return 0
+
+        total_added = 0
+        last_uuid = ""
+        while True:
+            rows = session.query(News.uuid, News.title, News.providerPublishTime).filter(
+                News.uuid > last_uuid).order_by(News.uuid).limit(batch_size).all()
+            if not rows:
+                break
+            last_uuid = rows[-1].uuid
+            uuid_list = [row.uuid for row in rows]
+
+            bodies = {news_body.uuid: news_body.text
+                      for news_body in session.query(NewsBody).filter(NewsBody.uuid.in_(uuid_list))}
+            tickers: dict[str, list[str]] = {}
+            for uuid, ticker in session.query(RelatedTickers.uuid, RelatedTickers.ticker).filter(
+                    RelatedTickers.uuid.in_(uuid_list)):
+                tickers.setdefault(uuid, []).append(ticker)
+
+            total_added += self.add_documents([
+                SearchDocument(uuid=row.uuid, title=row.title or "", body=bodies.get(row.uuid, ""),
+                               publish_time=row.providerPublishTime, tickers=tickers.get(row.uuid, []))
+                for row in rows])
+
+        search_logger.info(f"Indexed {total_added} existing articles for search")
+        return total_added
+
+
+_search_settings = config_instance().SEARCH_SETTINGS
+search_index: ArticleSearchIndex = ArticleSearchIndex(database=_search_settings.DATABASE,
+                                                      max_results=_search_settings.MAX_RESULTS)
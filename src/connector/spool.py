@@ -0,0 +1,280 @@
+"""
+    **ArticleSpool**
+        append only write ahead spool used to keep scraped articles on the local drive until
+        the database confirms they have been committed.
+
+        records are stored in segment files as
+
+            [length: 4 bytes][crc32: 4 bytes][payload: length bytes]
+
+        a checkpoint file holds the position of the last acknowledged record, segments behind the
+        checkpoint are deleted, a torn or corrupted record at the tail of the spool ends replay.
+"""
+import os
+import struct
+import threading
+import time
+import zlib
+from typing import Iterator, NamedTuple
+
+from src.utils.my_logger import init_logger
+
+RECORD_HEADER = struct.Struct('>II')
+SEGMENT_SUFFIX = '.spool'
+CHECKPOINT_FILE = 'checkpoint'
+
+FSYNC_ALWAYS = 'always'
+FSYNC_BATCH = 'batch'
+FSYNC_INTERVAL = 'interval'
+FSYNC_NEVER = 'never'
+
+spool_logger = init_logger('spool-logger')
+
+
+class SpoolPosition(NamedTuple):
+    """position directly after a record in the spool"""
+    segment: int
+    offset: int
+
+
+class ArticleSpool:
+    """
+    **ArticleSpool**
+        durable, length prefixed and checksummed on disk spool for articles
+
+        fsync_mode:
+            always   - fsync after every record
+            batch    - one fsync per call to append_many (group commit)
+            interval - fsync at most once every fsync_interval seconds
+            never    - leave flushing to the operating system
+    """
+
+    def __init__(self, directory: str, segment_size: int = 64 * 1024 * 1024, fsync_mode: str = FSYNC_BATCH,
+                 fsync_interval: float = 1.0):
+        if fsync_mode not in (FSYNC_ALWAYS, FSYNC_BATCH, FSYNC_INTERVAL, FSYNC_NEVER):
+            raise ValueError(f"Unknown fsync mode : {fsync_mode}")
+
+        self.directory: str = directory
+        self.segment_size: int = segment_size
+        self.fsync_mode: str = fsync_mode
+        self.fsync_interval: float = fsync_interval
+        self._lock: threading.Lock = threading.Lock()
+        self._file = None
+        self._segment: int = 0
+        self._offset: int = 0
+        self._last_sync: float = 0.0
+        self._checkpoint: SpoolPosition = SpoolPosition(segment=0, offset=0)
+
+    def open(self) -> None:
+        """
+            creates the spool directory, loads the checkpoint and opens the last segment for appending
+            any torn record left at the end of the last segment by a crash is truncated away
+        :return:
+        """
+        with self._lock:
+            if self._file is not None:
+                return
+
+            os.makedirs(self.directory, exist_ok=True)
+            self._checkpoint = self._read_checkpoint()
+            segments = self._segments()
+            self._segment = segments[-1] if segments else max(self._checkpoint.segment, 1)
+            path = self._segment_path(self._segment)
+            self._offset = self._valid_length(path)
+            self._file = open(path, 'ab')
+            if self._file.tell() != self._offset:
+                spool_logger.info(f"Truncating torn spool record in segment : {self._segment}")
+                self._file.truncate(self._offset)
+                self._file.seek(self._offset)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._sync(force=True)
+                self._file.close()
+                self._file = None
+
+    @property
+    def head(self) -> SpoolPosition:
+        """position directly after the last record written"""
+        return SpoolPosition(segment=self._segment, offset=self._offset)
+
+    @property
+    def checkpoint(self) -> SpoolPosition:
+        """position directly after the last record acknowledged"""
+        return self._checkpoint
+
+    @property
+    def has_pending(self) -> bool:
+        return self._checkpoint < self.head
+
+    @property
+    def pending_bytes(self) -> int:
+        """size on disk of the records which have not been acknowledged yet"""
+        total = 0
+        for segment in self._segments():
+            if segment < self._checkpoint.segment:
+                continue
+            size = self._offset if segment == self._segment else os.path.getsize(self._segment_path(segment))
+            total += size - (self._checkpoint.offset if segment == self._checkpoint.segment else 0)
+        return total
+
+    def append(self, payload: bytes) -> SpoolPosition:
+        return self.append_many([payload])[-1]
+
+    def append_many(self, payloads: list[bytes]) -> list[SpoolPosition]:
+        """
+            **append_many**
+                appends records to the spool and returns the position after each record,
+                with fsync_mode batch all the records share a single fsync
+        :param payloads:
+        :return:
+        """
+        positions: list[SpoolPosition] = []
+        with self._lock:
+            if self._file is None:
+                raise RuntimeError("spool is not open")
+
+            for payload in payloads:
+                if self._offset and self._offset + RECORD_HEADER.size + len(payload) > self.segment_size:
+                    self._roll_segment()
+
+                self._file.write(RECORD_HEADER.pack(len(payload), zlib.crc32(payload)))
+                self._file.write(payload)
+                self._offset += RECORD_HEADER.size + len(payload)
+                positions.append(SpoolPosition(segment=self._segment, offset=self._offset))
+                if self.fsync_mode == FSYNC_ALWAYS:
+                    self._sync(force=True)
+
+            if self.fsync_mode == FSYNC_BATCH:
+                self._sync(force=True)
+            elif self.fsync_mode == FSYNC_INTERVAL:
+                self._sync(force=False)
+            else:
+                self._file.flush()
+
+        return positions
+
+    def acknowledge(self, position: SpoolPosition) -> None:
+        """
+            **acknowledge**
+                marks every record up to position as committed to storage, then deletes
+                segments which hold only acknowledged records
+        :param position:
+        :return:
+        """
+        with self._lock:
+            if position <= self._checkpoint:
+                return
+
+            if position == self.head and self._offset:
+                # everything has been committed - start a fresh segment so the old one can go
+                self._roll_segment()
+                position = self.head
+
+            self._write_checkpoint(position)
+            self._checkpoint = position
+            for segment in self._segments():
+                if segment < position.segment:
+                    os.remove(self._segment_path(segment))
+
+    def replay(self, batch_size: int = 100,
+               until: SpoolPosition | None = None) -> Iterator[tuple[list[bytes], SpoolPosition]]:
+        """
+            **replay**
+                reads unacknowledged records from the checkpoint onwards, in batches,
+                only one batch is held in memory at a time
+        :param batch_size:
+        :param until: stop at this position instead of the head of the spool
+        :return: batches of payloads and the position after the last payload of the batch
+        """
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+            start = self._checkpoint
+            head = min(self.head, until) if until is not None else self.head
+
+        if head <= start:
+            return
+
+        batch: list[bytes] = []
+        position = start
+        for segment in self._segments():
+            if segment < start.segment or segment > head.segment:
+                continue
+
+            offset = start.offset if segment == start.segment else 0
+            end = head.offset if segment == head.segment else None
+            with open(self._segment_path(segment), 'rb') as file:
+                file.seek(offset)
+                for payload, offset in self._read_records(file, offset, end):
+                    batch.append(payload)
+                    position = SpoolPosition(segment=segment, offset=offset)
+                    if len(batch) >= batch_size:
+                        yield batch, position
+                        batch = []
+
+        if batch:
+            yield batch, position
+
+    def _sync(self, force: bool) -> None:
+        self._file.flush()
+        now = time.monotonic()
+        if force or now - self._last_sync >= self.fsync_interval:
+            os.fsync(self._file.fileno())
+            self._last_sync = now
+
+    def _roll_segment(self) -> None:
+        self._sync(force=self.fsync_mode != FSYNC_NEVER)
+        self._file.close()
+        self._segment += 1
+        self._offset = 0
+        self._file = open(self._segment_path(self._segment), 'ab')
+
+    def _segment_path(self, segment: int) -> str:
+        return os.path.join(self.directory, f"{segment:012d}{SEGMENT_SUFFIX}")
+
+    def _segments(self) -> list[int]:
+        return sorted(int(name[:-len(SEGMENT_SUFFIX)]) for name in os.listdir(self.directory)
+                      if name.endswith(SEGMENT_SUFFIX))
+
+    def _read_checkpoint(self) -> SpoolPosition:
+        try:
+            with open(os.path.join(self.directory, CHECKPOINT_FILE)) as file:
+                segment, offset = file.read().split()
+                return SpoolPosition(segment=int(segment), offset=int(offset))
+        except (FileNotFoundError, ValueError):
+            return SpoolPosition(segment=0, offset=0)
+
+    def _write_checkpoint(self, position: SpoolPosition) -> None:
+        path = os.path.join(self.directory, CHECKPOINT_FILE)
+        with open(f"{path}.tmp", 'w') as file:
+            file.write(f"{position.segment} {position.offset}")
+            file.flush()
+            if self.fsync_mode != FSYNC_NEVER:
+                os.fsync(file.fileno())
+        os.replace(f"{path}.tmp", path)
+
+    def _valid_length(self, path: str) -> int:
+        """returns the length of the segment up to the end of its last intact record"""
+        if not os.path.exists(path):
+            return 0
+        with open(path, 'rb') as file:
+            length = 0
+            for _, length in self._read_records(file, 0, None):
+                pass
+            return length
+
+    @staticmethod
+    def _read_records(file, offset: int, end: int | None) -> Iterator[tuple[bytes, int]]:
+        while end is None or offset < end:
+            header = file.read(RECORD_HEADER.size)
+            if len(header) < RECORD_HEADER.size:
+                return
+            length, checksum = RECORD_HEADER.unpack(header)
+            payload = file.read(length)
+            if len(payload) < length or zlib.crc32(payload) != checksum:
+                spool_logger.error(f"Corrupted spool record found in : {file.name} at offset : {offset}")
+                return
+            offset += RECORD_HEADER.size + length
+            yield payload, offset
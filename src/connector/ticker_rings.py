@@ -0,0 +1,180 @@
+"""
+    **LatestArticlesIndex**
+        in process index holding, for each ticker, a bounded ring of the most recent article summaries
+        so the latest articles of popular tickers are served without touching the database.
+
+        every ring has a floor, the ring holds every article of its ticker with a sort key at or above the floor,
+        so a page can be served from memory whenever it lies entirely above the floor.
+"""
+import asyncio
+import threading
+
+from src.config import config_instance
+from src.connector.data_instance import mysql_instance
+from src.models.sql.news import News
+from src.utils.my_logger import init_logger
+
+# (providerPublishTime, uuid) - articles are sorted by this key, most recent first
+SortKey = tuple[int, str]
+# floor of a ring which holds the whole history of its ticker
+HISTORY_START: SortKey = (0, "")
+
+rings_logger = init_logger('ticker-rings-logger')
+
+
+class TickerRing:
+    """
+    **TickerRing**
+        latest article summaries of a single ticker sorted by most recent first
+    """
+    __slots__ = ('entries', 'floor', 'capacity')
+
+    def __init__(self, capacity: int, floor: SortKey):
+        self.entries: list[tuple[SortKey, dict]] = []
+        self.floor: SortKey = floor
+        self.capacity: int = capacity
+
+    def add(self, key: SortKey, summary: dict) -> None:
+        """adds the summary, or replaces the one already held for the same article"""
+        if key < self.floor:
+            return
+        for index, (entry_key, _) in enumerate(self.entries):
+            if entry_key == key:
+                self.entries[index] = (key, summary)
+                return
+
+        self.entries.append((key, summary))
+        self.entries.sort(key=lambda entry: entry[0], reverse=True)
+        if len(self.entries) > self.capacity:
+            del self.entries[self.capacity:]
+            # older articles of this ticker are no longer held, the ring is complete from its last entry upwards
+            self.floor = self.entries[-1][0]
+
+    def remove(self, uuids: set[str]) -> None:
+        """drops the summaries of deleted articles, the ring stays complete down to its floor"""
+        self.entries = [(key, summary) for key, summary in self.entries if key[1] not in uuids]
+
+    def page(self, cursor: SortKey | None, page_size: int) -> list[dict] | None:
+        """
+            returns the page after cursor or None when the ring cannot prove it holds the whole page
+        """
+        if cursor is not None and cursor <= self.floor:
+            return None
+
+        summaries = [summary for key, summary in self.entries if cursor is None or key < cursor]
+        if len(summaries) >= page_size:
+            return summaries[:page_size]
+
+        # fewer articles than a page is only the full answer if the ring holds the whole history
+        return summaries if self.floor == HISTORY_START else None
+
+
+class LatestArticlesIndex:
+    """
+    **LatestArticlesIndex**
+        filled by DataConnector as articles are stored and seeded from the database at startup,
+        read by the articles-by-ticker route which falls back to RelatedTickers.fetch_by_ticker
+    """
+
+    def __init__(self):
+        settings = config_instance().TICKER_RING_SETTINGS
+        self.ring_size: int = settings.RING_SIZE
+        self.seed_articles: int = settings.SEED_ARTICLES
+        self._rings: dict[str, TickerRing] = {}
+        # rings created later are complete above the oldest article seen when seeding
+        self._floor: SortKey | None = None
+        self._lock: threading.Lock = threading.Lock()
+        self.hits: int = 0
+        self.misses: int = 0
+
+    @property
+    def ready(self) -> bool:
+        return self._floor is not None
+
+    async def seed(self) -> None:
+        """
+            **seed**
+                fills the rings from the most recent articles in the database
+        :return:
+        """
+        summaries: list[dict] = await asyncio.to_thread(self.load_latest)
+        with self._lock:
+            if len(summaries) < self.seed_articles:
+                self._floor = HISTORY_START
+            else:
+                self._floor = (summaries[-1]['providerPublishTime'], summaries[-1]['uuid'])
+            for ring in self._rings.values():
+                ring.floor = max(ring.floor, self._floor)
+
+        self.add_summaries(summaries=summaries)
+        rings_logger.info(f"Seeded {len(self._rings)} ticker rings from {len(summaries)} articles")
+
+    def load_latest(self) -> list[dict]:
+        """the seed_articles most recent summaries, read on a worker thread"""
+        with mysql_instance.get_session() as session:
+            return News.fetch_summaries(session=session, page_size=self.seed_articles)
+
+    def add_summaries(self, summaries: list[dict]) -> None:
+        """
+            **add_summaries**
+                adds stored article summaries to the ring of each of their tickers
+        :param summaries:
+        :return:
+        """
+        if not self.ready:
+            return
+
+        with self._lock:
+            for summary in summaries:
+                key: SortKey = (summary['providerPublishTime'], summary['uuid'])
+                for ticker in summary.get('tickers', []):
+                    ring = self._rings.get(ticker)
+                    if ring is None:
+                        ring = self._rings[ticker] = TickerRing(capacity=self.ring_size, floor=self._floor)
+                    ring.add(key=key, summary=summary)
+
+    def remove(self, uuid_list: list[str]) -> None:
+        """
+            **remove**
+                drops articles which are no longer in the database from every ring
+        :param uuid_list:
+        :return:
+        """
+        uuids = set(uuid_list)
+        with self._lock:
+            for ring in self._rings.values():
+                ring.remove(uuids=uuids)
+
+    def get_page(self, ticker: str, cursor: SortKey | None, page_size: int) -> list[dict] | None:
+        """
+            **get_page**
+                returns the page of article summaries after cursor,
+                or None if the ring for ticker does not hold the whole page
+        :param ticker:
+        :param cursor:
+        :param page_size:
+        :return:
+        """
+        if not self.ready:
+            return None
+
+        with self._lock:
+            ring = self._rings.get(ticker)
+            if ring is None:
+                # no article for this ticker since the floor, only a complete history proves there are none
+                page = [] if self._floor == HISTORY_START else None
+            else:
+                page = ring.page(cursor=cursor, page_size=page_size)
+
+        if page is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return page
+
+    @property
+    def total_tickers(self) -> int:
+        return len(self._rings)
+
+
+latest_articles: LatestArticlesIndex = LatestArticlesIndex()
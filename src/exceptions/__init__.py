@@ -1,6 +1,7 @@
 class ErrorParsingFeeds(Exception):
     def __init__(self, *args, **kwargs):
         super().__init__(args, kwargs)
+        self.description = kwargs.get('description', self.description)
 
     code = 400
     description = "General Parser Error while parsing feeds"
@@ -9,6 +10,7 @@ class ErrorParsingFeeds(Exception):
 class ErrorParsingHTMLDocument(Exception):
     def __init__(self, *args, **kwargs):
         super().__init__(args, kwargs)
+        self.description = kwargs.get('description', self.description)
 
     code = 400
     description = "General Parser Error While parsing HTML document"
@@ -17,6 +19,7 @@ class ErrorParsingHTMLDocument(Exception):
 class RequestError(Exception):
     def __init__(self, *args, **kwargs):
         super().__init__(args, kwargs)
+        self.description = kwargs.get('description', self.description)
 
     code = 400
     description = "Error Making Request"
@@ -25,6 +28,7 @@ class RequestError(Exception):
 class InputError(Exception):
     def __init__(self, *args, **kwargs):
         super().__init__(args, kwargs)
+        self.description = kwargs.get('description', self.description)
 
     code = 500
     description = "Bad Input Error"
@@ -4,13 +4,20 @@ from typing import Coroutine, TypeAlias
 from fastapi import FastAPI
 
 from src.api_routes.admin import admin_router
+from src.api_routes.news import news_router
 from src.api_routes.telemetry import telemetry_router
 from src.config import scheduler_settings, create_schedules, config_instance
+from src.connector.archive import news_archive
 from src.connector.data_connector import data_sink
+from src.connector.response_cache import response_cache
+from src.connector.ticker_rings import latest_articles
 from src.models import NewsArticle, RssArticle
 from src.tasks import get_meme_tickers
 from src.tasks.news_scraper import scrape_news_yahoo, alternate_news_sources
-from src.telemetry import Telemetry
+from src.tasks.sentiment import sentiment_worker
+from src.telemetry.loop_lag import loop_lag_monitor
+from src.telemetry.profiler import sampling_profiler
+from src.telemetry.tracing import tracer
 from src.utils.my_logger import init_logger
 
 main_logger = init_logger('Main Logger')
@@ -37,16 +44,13 @@ app = FastAPI(
     openapi_url=settings.OPENAPI_URL,
     redoc_url=settings.REDOC_URL
 )
-scraperType: TypeAlias = Coroutine[list[str], None, list[dict[str, NewsArticle | RssArticle]]]
+scraperType: TypeAlias = Coroutine[list[str], None, int | list[dict[str, NewsArticle | RssArticle]]]
 
 tasks_lookup = {
     'scrape_news_yahoo': scrape_news_yahoo,
     'alternate_news_sources': alternate_news_sources,
 }
 
-telemetry: list[Telemetry] = []
-
-
 async def scheduled_task() -> None:
     """
         **scheduled_task**
@@ -62,19 +66,37 @@ async def scheduled_task() -> None:
 
         for schedule_time, task_details in list(scheduler_settings.schedule_times.items()):
 
-            # Select and Run task
+            # Select and Run task - articles are sent to storage by the data sink while scraping continues
+            tracer.start_cycle()
+            sampling_profiler.cycle_started()
+            try:
+                total_articles: int = await scrape_news_yahoo(tickers_list)
+                main_logger.info(f'SCRAPED: {total_articles} Articles')
+            except Exception as e:
+                main_logger.info(str(e))
+
+            # wait for the data sink to store the articles of this cycle
+            await data_sink.flush()
+            await asyncio.to_thread(sampling_profiler.cycle_finished)
             try:
-                articles: list[NewsArticle] = await scrape_news_yahoo(tickers_list)
-                main_logger.info(f'RETURNING: {len(articles)} Articles to storage')
+                await tracer.export()
             except Exception as e:
                 main_logger.info(str(e))
-                articles = []
 
-            if articles:
-                # prepare articles and store them into a buffer for sending to backend
-                await data_sink.incoming_articles(article_list=articles)
-                # send article to storage via database connection
-                await data_sink.send_to_database()
+            # score the sentiment of the articles stored in this cycle
+            try:
+                await sentiment_worker.run()
+            except Exception as e:
+                main_logger.info(str(e))
+
+            # move articles older than the retention window into the parquet archive
+            try:
+                total_archived: int = await asyncio.to_thread(news_archive.run)
+                if total_archived:
+                    main_logger.info(f'ARCHIVED: {total_archived} Articles')
+                    response_cache.clear()
+            except Exception as e:
+                main_logger.info(str(e))
 
             # Mark task as completed by setting task_ran to True and then store back into scheduler
             task_details.task_ran = True
@@ -94,12 +116,37 @@ async def scheduled_task() -> None:
 
 @app.on_event("startup")
 async def startup_event():
+    # measures how long code running on the loop keeps it from waking other tasks
+    loop_lag_monitor.start()
+    # creates missing tables and the indexes the read routes rely on
+    await asyncio.to_thread(data_sink.prepare_storage)
+    # latest articles per ticker are kept in memory for the read routes
+    await latest_articles.seed()
+    # sentiment scoring pool, created before the first scrape cycle
+    sentiment_worker.start()
+    # background flusher, replays articles left in the spool then stores articles as they are scraped
+    await data_sink.start()
     asyncio.create_task(scheduled_task())
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    await loop_lag_monitor.stop()
+    await data_sink.stop()
+    sentiment_worker.close()
+    await tracer.export()
+    tracer.close()
+
+
 ########################################################################################################################
 # ###############################  ADMIN ROUTERS  ######################################################################
 ########################################################################################################################
 
 app.include_router(admin_router)
 app.include_router(telemetry_router)
+
+########################################################################################################################
+# ###############################  NEWS ROUTERS  #######################################################################
+########################################################################################################################
+
+app.include_router(news_router)
@@ -1,20 +1,24 @@
-from datetime import datetime, time
+from datetime import datetime, time, date
 
 from dateutil.parser import parse, ParserError
-from sqlalchemy import Column, String, Integer, inspect, ForeignKey, func
-from sqlalchemy.dialects.mysql import LONGTEXT
+from sqlalchemy import Column, String, Integer, inspect, ForeignKey, Index, and_, or_, insert, LargeBinary, update, \
+    table, column, delete, func
+from sqlalchemy.dialects.mysql import LONGTEXT, LONGBLOB
 from sqlalchemy.exc import DataError, OperationalError, IntegrityError, PendingRollbackError
 from sqlalchemy import select
-from sqlalchemy.orm import relationship, joinedload
+from sqlalchemy.orm import relationship, joinedload, deferred
 from sqlalchemy.orm.exc import DetachedInstanceError
 
-from src.connector.data_instance import Base, sessionType, mysql_instance
+from src.connector.data_instance import Base, sessionType, mysql_instance, insert_ignore
 from src.exceptions import InputError
-from src.utils import create_id
+from src.utils import content_id
+from src.utils.compression import compress_text, decompress_text
 
 
 # from src.databases.models.ndb_datastore.news import RelatedTickers, Thumbnails
 
+RELATED_ID_LENGTH = len(content_id(''))
+
 
 class NewsSentiment(Base):
     """
@@ -24,13 +28,15 @@ class NewsSentiment(Base):
         sentiment_title: Sentiment analysis of the title
         sentiment_article: sentiment analysis of the actual article
         link: the actual url of the article in question
+
+        article bodies are stored compressed in NewsBody, article is only read to move older bodies there
     """
     __tablename__ = 'news_sentiment'
     article_uuid: str = Column(String(64), ForeignKey('news.uuid'), index=True, primary_key=True)
     stock_codes: str = Column(String(255))
     title: str = Column(String(255))
     sentiment_title: str = Column(String(255), default=None)  # sentiment analysis for just the article Title
-    article: str = Column(LONGTEXT, default=None)
+    article: str = deferred(Column(LONGTEXT, default=None))
     article_tldr: str = Column(String(255), default=None)
     sentiment_article: str = Column(String(255), default=None)  # sentiment analysis for the actual article
     link: str = Column(String(255))
@@ -57,14 +63,13 @@ class NewsSentiment(Base):
             'stock_codes': self.stock_codes,
             'title': self.title,
             'sentiment_title': self.sentiment_title,
-            'article': self.article,
             'article_tldr': self.article_tldr,
             'sentiment_article': self.sentiment_article,
             'link': self.link,
         }  # return {c.key: getattr(self, c.key) for c in inspect(self).attrs.items()}
 
     def __str__(self) -> str:
-        return f"<NewsSentiment=  Stock Code: {self.stock_codes}, Article: {self.article}, " \
+        return f"<NewsSentiment=  Stock Code: {self.stock_codes}, Title: {self.title}, " \
                f"Title Sentiment: {self.sentiment_title}, Article Sentiment: {self.sentiment_article} >"
 
     def __bool__(self) -> bool:
@@ -95,13 +100,17 @@ class NewsSentiment(Base):
             pass
 
 
-# noinspection DuplicatedCode
-def create_start_end_timestamps(_date: str) -> tuple[int, int]:
+def parse_date(_date: str) -> date:
     try:
-        date = parse(_date).date()
-    except ParserError:
+        return parse(_date).date()
+    except (ParserError, OverflowError):
         raise InputError(description="Invalid date format, expected 'YYYY-MM-DD'")
 
+
+# noinspection DuplicatedCode
+def create_start_end_timestamps(_date: str) -> tuple[int, int]:
+    date = parse_date(_date)
+
     start_of_day = datetime.combine(date, time.min)
     end_of_day = datetime.combine(date, time.max)
     start_of_day = int(start_of_day.timestamp())
@@ -153,33 +162,36 @@ class _News:
         return bool(session.query(cls).filter(cls.uuid == uuid).delete())
 
 
-class Thumbnails(Base, _News):
+class ThumbnailImage(Base):
     """
-        **Thumbnails**
+        **ThumbnailImage**
+            a thumbnail stored once per url, the id is the hash of the url so the same image scraped
+            for many articles or scraped again is a single row
     """
-    __tablename__ = 'thumbnail'
-    thumbnail_id = Column(String(16), primary_key=True)
-    uuid: str = Column(String(255), ForeignKey("news.uuid", ondelete="CASCADE"), index=True)
-    url: str = Column(String(255), index=True)
+    __tablename__ = 'thumbnail_image'
+    thumbnail_id: str = Column(String(32), primary_key=True)
+    url: str = Column(String(255))
     width: int = Column(Integer)
     height: int = Column(Integer)
-    tag: str = Column(String(255), index=True)
+    tag: str = Column(String(255))
 
-    def __init__(self, uuid: str, url: str, width: int, height: int, tag: str,  thumbnail_id: str = None):
-        self.thumbnail_id = thumbnail_id if thumbnail_id else create_id()
-        self.uuid = uuid
+    def __init__(self, url: str, width: int, height: int, tag: str):
+        self.thumbnail_id = self.create_thumbnail_id(url=url)
         self.url = url
         self.width = width
         self.height = height
         self.tag = tag
 
+    @staticmethod
+    def create_thumbnail_id(url: str) -> str:
+        return content_id(url)
+
     def to_dict(self) -> dict:
         """
             returns a dictionary of the thumbnail
         """
         return {
             'thumbnail_id': self.thumbnail_id,
-            'uuid': self.uuid,
             'url': self.url,
             'width': self.width,
             'height': self.height,
@@ -189,14 +201,208 @@ class Thumbnails(Base, _News):
         """
         :return:
         """
-        return f"<Thumbnail UUID: {self.uuid}, URL: {self.url}, width: {self.width}, height: {self.height}>"
+        return f"<ThumbnailImage URL: {self.url}, width: {self.width}, height: {self.height}>"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+    def __bool__(self) -> bool:
+        return not not self.url
+
+    @classmethod
+    def backfill(cls, session: sessionType, batch_size: int = 1000) -> int:
+        """
+        **backfill**
+            copies thumbnails from the previous per article thumbnail table into thumbnail_image and
+            news_thumbnail, once, when the previous table exists and nothing has been linked yet
+        :param session:
+        :param batch_size:
+        :return: total links created
+        """
+        if not inspect(session.get_bind()).has_table(LEGACY_THUMBNAIL_TABLE.name) or \
+                session.query(NewsThumbnail.uuid).first() is not None:
+            return 0
+
+        total_linked = 0
+        last_id = ""
+        legacy = LEGACY_THUMBNAIL_TABLE.c
+        while True:
+            rows = session.execute(select(legacy.thumbnail_id, legacy.uuid, legacy.url, legacy.width, legacy.height,
+                                          legacy.tag).where(legacy.thumbnail_id > last_id)
+                                   .order_by(legacy.thumbnail_id).limit(batch_size)).all()
+            if not rows:
+                return total_linked
+            last_id = rows[-1].thumbnail_id
+
+            rows = [row for row in rows if row.url and row.uuid]
+            if rows:
+                session.execute(insert_ignore(cls), [dict(thumbnail_id=cls.create_thumbnail_id(url=row.url),
+                                                          url=row.url, width=row.width, height=row.height,
+                                                          tag=row.tag) for row in rows])
+                session.execute(insert_ignore(NewsThumbnail), [dict(uuid=row.uuid,
+                                                                    thumbnail_id=cls.create_thumbnail_id(url=row.url))
+                                                               for row in rows])
+            session.commit()
+            total_linked += len(rows)
+
+
+class NewsThumbnail(Base):
+    """
+        **NewsThumbnail**
+            links an article to the thumbnails of its resolutions
+    """
+    __tablename__ = 'news_thumbnail'
+    uuid: str = Column(String(255), ForeignKey("news.uuid", ondelete="CASCADE"), primary_key=True)
+    thumbnail_id: str = Column(String(32), ForeignKey("thumbnail_image.thumbnail_id"), primary_key=True)
+    image: ThumbnailImage = relationship('ThumbnailImage', uselist=False)
+
+    def __init__(self, uuid: str, image: ThumbnailImage):
+        self.uuid = uuid
+        self.thumbnail_id = image.thumbnail_id
+        self.image = image
+
+    def __str__(self) -> str:
+        return f"<NewsThumbnail UUID: {self.uuid}, thumbnail: {self.thumbnail_id}>"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+
+# thumbnails were stored once per article and resolution, only read to move them into thumbnail_image
+LEGACY_THUMBNAIL_TABLE = table('thumbnail', column('thumbnail_id'), column('uuid'), column('url'), column('width'),
+                               column('height'), column('tag'))
+
+
+class NewsBody(Base, _News):
+    """
+    **NewsBody**
+        compressed article body, kept out of news_sentiment so listing queries never read it,
+        bodies are only loaded by the article detail route
+    """
+    __tablename__ = 'news_body'
+    uuid: str = Column(String(255), ForeignKey("news.uuid", ondelete="CASCADE"), primary_key=True)
+    codec: str = Column(String(8))
+    size: int = Column(Integer)  # length of the uncompressed body in bytes
+    body: bytes = Column(LargeBinary().with_variant(LONGBLOB, 'mysql'))
+
+    def __init__(self, uuid: str, text: str):
+        self.uuid = uuid
+        self.codec, self.body = compress_text(text)
+        self.size = len(text.encode('utf-8'))
+
+    @property
+    def text(self) -> str:
+        return decompress_text(codec=self.codec, data=self.body)
+
+    def __str__(self) -> str:
+        return f"<NewsBody UUID: {self.uuid}, codec: {self.codec}, size: {self.size}, stored: {len(self.body)}>"
 
     def __repr__(self) -> str:
-        return f"<Thumbnail UUID: {self.uuid},  URL: {self.url}, width: {self.width}, height: {self.height}>"
+        return self.__str__()
 
     def __bool__(self) -> bool:
         return not not self.uuid
 
+    @classmethod
+    def get_text(cls, uuid: str, session: sessionType) -> str | None:
+        """returns the uncompressed body of the article or None if it has none"""
+        news_body = session.query(cls).filter(cls.uuid == uuid).first()
+        return news_body.text if news_body is not None else None
+
+    @classmethod
+    def backfill(cls, session: sessionType, batch_size: int = 500) -> int:
+        """
+        **backfill**
+            moves bodies still stored in news_sentiment.article into news_body, one batch at a time
+        :param session:
+        :param batch_size:
+        :return: total bodies moved
+        """
+        total_moved = 0
+        while True:
+            rows = session.query(NewsSentiment.article_uuid, NewsSentiment.article).filter(
+                NewsSentiment.article.isnot(None)).limit(batch_size).all()
+            if not rows:
+                return total_moved
+
+            uuid_list = [uuid for uuid, _ in rows]
+            present = {uuid for uuid, in session.query(cls.uuid).filter(cls.uuid.in_(uuid_list))}
+            session.add_all([cls(uuid=uuid, text=article) for uuid, article in rows if uuid not in present])
+            session.execute(update(NewsSentiment).where(NewsSentiment.article_uuid.in_(uuid_list)).values(
+                article=None).execution_options(synchronize_session=False))
+            session.commit()
+            total_moved += len(rows)
+
+
+# noinspection DuplicatedCode
+class TickerTimeline(Base, _News):
+    """
+    **TickerTimeline**
+        denormalized (ticker, providerPublishTime, uuid) timeline of the articles related to each ticker,
+        the primary key is the sort order so the latest articles for a ticker are a single index range scan
+    """
+    __tablename__ = 'ticker_timeline'
+    ticker: str = Column(String(16), primary_key=True)
+    providerPublishTime: int = Column(Integer, primary_key=True, autoincrement=False)
+    uuid: str = Column(String(255), ForeignKey("news.uuid", ondelete="CASCADE"), primary_key=True)
+
+    # noinspection PyPep8Naming
+    def __init__(self, ticker: str, providerPublishTime: int, uuid: str):
+        self.ticker = ticker
+        self.providerPublishTime = providerPublishTime
+        self.uuid = uuid
+
+    def __str__(self) -> str:
+        return f"<TickerTimeline ticker: {self.ticker}, time: {self.providerPublishTime}, uuid: {self.uuid}>"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+    def __bool__(self) -> bool:
+        return not not self.uuid
+
+    @classmethod
+    def fetch_latest(cls, ticker: str, session: sessionType, cursor: tuple[int, str] | None = None,
+                     page_size: int | None = None) -> list[str]:
+        """
+        **fetch_latest**
+            uuids of the most recent articles related to ticker, read from the timeline index only
+        :param ticker:
+        :param session:
+        :param cursor: (providerPublishTime, uuid) of the last article on the previous page
+        :param page_size:
+        :return: list of uuids sorted by most recent
+        """
+        query = session.query(cls.uuid).filter(cls.ticker == ticker)
+        if cursor is not None:
+            publish_time, uuid = cursor
+            query = query.filter(or_(cls.providerPublishTime < publish_time,
+                                     and_(cls.providerPublishTime == publish_time, cls.uuid < uuid)))
+
+        query = query.order_by(cls.providerPublishTime.desc(), cls.uuid.desc()).limit(
+            page_size or cls.article_page_size)
+        return [uuid for uuid, in query.all()]
+
+    @classmethod
+    def backfill(cls, session: sessionType) -> None:
+        """
+        **backfill**
+            fills an empty timeline from related_tickers and news, used once when the timeline is introduced
+        :param session:
+        :return:
+        """
+        if session.query(cls.uuid).first() is not None:
+            return
+
+        timeline_rows = (
+            select(RelatedTickers.ticker, News.providerPublishTime, News.uuid)
+            .join(News, News.uuid == RelatedTickers.uuid)
+            .where(News.providerPublishTime.isnot(None))
+            .distinct()
+        )
+        session.execute(insert(cls).from_select(['ticker', 'providerPublishTime', 'uuid'], timeline_rows))
+        session.commit()
+
 
 # noinspection DuplicatedCode
 class RelatedTickers(Base, _News):
@@ -205,16 +411,46 @@ class RelatedTickers(Base, _News):
         Ticker Symbol related to the Current Financial News
     """
     __tablename__ = 'related_tickers'
+    __table_args__ = (Index('ix_related_tickers_ticker_uuid', 'ticker', 'uuid'),)
+    # derived from (uuid, ticker), the primary key keeps an article from being linked to a ticker twice
     id: str = Column(String(255), primary_key=True)
     uuid: str = Column(String(255), ForeignKey("news.uuid", ondelete="CASCADE"), index=True)
     ticker: str = Column(String(16), index=True)
     stock_id: str = Column(String(16), index=True)
 
     def __init__(self, uuid: str, ticker: str, stock_id: str = None):
-        self.id = create_id()
+        self.id = self.create_related_id(uuid=uuid, ticker=ticker)
         self.uuid = uuid
         self.ticker = ticker
-        self.stock_id = create_id() if stock_id is None else stock_id
+        self.stock_id = ticker if stock_id is None else stock_id
+
+    @staticmethod
+    def create_related_id(uuid: str, ticker: str) -> str:
+        return content_id(uuid, ticker)
+
+    @classmethod
+    def backfill_ids(cls, session: sessionType, batch_size: int = 1000) -> int:
+        """
+        **backfill_ids**
+            replaces random ids created before ids were derived from (uuid, ticker) and their random stock ids,
+            duplicate links of the same article and ticker collapse into one row
+        :param session:
+        :param batch_size:
+        :return: total rows replaced
+        """
+        total_replaced = 0
+        while True:
+            rows = session.query(cls.id, cls.uuid, cls.ticker).filter(
+                func.length(cls.id) != RELATED_ID_LENGTH).limit(batch_size).all()
+            if not rows:
+                return total_replaced
+
+            session.execute(delete(cls).where(cls.id.in_([row.id for row in rows])))
+            session.execute(insert_ignore(cls), [dict(id=cls.create_related_id(uuid=row.uuid, ticker=row.ticker),
+                                                      uuid=row.uuid, ticker=row.ticker, stock_id=row.ticker)
+                                                 for row in rows])
+            session.commit()
+            total_replaced += len(rows)
 
     def to_dict(self) -> dict:
         """
@@ -238,13 +474,20 @@ class RelatedTickers(Base, _News):
         return not not self.uuid
 
     @classmethod
-    async def fetch_by_ticker(cls, ticker: str, session: sessionType):
-        latest_publish_time = session.query(func.max(News.providerPublishTime)).scalar()
-        subquery = session.query(News.uuid).filter(News.providerPublishTime <= latest_publish_time).subquery()
-        subquery_select = select(subquery.c.uuid)
-
-        return session.query(cls).filter(cls.ticker == ticker, cls.uuid.in_(subquery_select)).join(News).order_by(
-            -News.providerPublishTime).limit(cls.article_page_size).all()
+    def fetch_by_ticker(cls, ticker: str, session: sessionType, cursor: tuple[int, str] | None = None,
+                        page_size: int | None = None) -> list[dict]:
+        """
+        **fetch_by_ticker**
+            summaries of the news articles related to ticker sorted by most recent, one page at a time,
+            the page is located on the ticker timeline and then loaded by primary key
+        :param ticker:
+        :param session:
+        :param cursor: (providerPublishTime, uuid) of the last article on the previous page
+        :param page_size:
+        :return: list of summaries
+        """
+        uuid_list = TickerTimeline.fetch_latest(ticker=ticker, session=session, cursor=cursor, page_size=page_size)
+        return News.fetch_summaries_by_uuid_list(uuid_list=uuid_list, session=session)
 
 
 # noinspection DuplicatedCode
@@ -254,6 +497,8 @@ class News(Base, _News):
             News
     """
     __tablename__ = 'news'
+    __table_args__ = (Index('ix_news_publish_time_uuid', 'providerPublishTime', 'uuid'),
+                      Index('ix_news_publisher_publish_time_uuid', 'publisher', 'providerPublishTime', 'uuid'))
     uuid: str = Column(String(255), primary_key=True)
     title: str = Column(String(255), index=True)
     publisher: str = Column(String(126), index=True)
@@ -265,8 +510,8 @@ class News(Base, _News):
                                             backref='news')
     tickers: list[RelatedTickers] = relationship('RelatedTickers', uselist=True, foreign_keys=[RelatedTickers.uuid],
                                                  backref='news')
-    thumbnails: list[Thumbnails] = relationship('Thumbnails', uselist=True, foreign_keys=[Thumbnails.uuid],
-                                                backref='news')
+    thumbnails: list[ThumbnailImage] = relationship('ThumbnailImage', secondary='news_thumbnail', uselist=True,
+                                                    viewonly=True)
 
     # noinspection PyPep8Naming
     def __init__(self, uuid: str, title: str, publisher: str, link: str, providerPublishTime: int, _type: str):
@@ -318,7 +563,8 @@ class News(Base, _News):
 
         try:
             if self.thumbnails is not None:
-                article_dict.update({'thumbnail': dict(resolutions=[thumb.to_dict() for thumb in self.thumbnails])})
+                article_dict.update({'thumbnail': dict(resolutions=[dict(thumb.to_dict(), uuid=self.uuid)
+                                                                    for thumb in self.thumbnails])})
         except DetachedInstanceError:
             pass
 
@@ -350,58 +596,183 @@ class News(Base, _News):
             joinedload(cls.thumbnails)).filter(cls.uuid.in_(uuid_list)).all() if isinstance(uuid_list, list) else []
 
     @classmethod
-    async def fetch_by_day_published(cls, date_published: str, session: sessionType):
+    def summary_columns(cls) -> tuple:
+        return cls.uuid, cls.title, cls.publisher, cls.link, cls.providerPublishTime, cls.created_at, cls.type
+
+    @classmethod
+    def fetch_summaries(cls, session: sessionType, criteria: tuple = (), cursor: tuple[int, str] | None = None,
+                        page_size: int | None = None) -> list[dict]:
+        """
+        **fetch_summaries**
+            a page of article summaries matching criteria sorted by most recent, read as plain rows instead of
+            ORM instances - only the listed columns are selected and the collections are loaded with one
+            IN query each, so rows are not multiplied by the joins and the article body is never read
+        :param session:
+        :param criteria: filter expressions on News
+        :param cursor: (providerPublishTime, uuid) of the last article on the previous page
+        :param page_size:
+        :return: list of json ready summaries, the same shape as to_dict without the article body
+        """
+        query = session.query(*cls.summary_columns()).filter(*criteria)
+        if cursor is not None:
+            publish_time, uuid = cursor
+            query = query.filter(or_(cls.providerPublishTime < publish_time,
+                                     and_(cls.providerPublishTime == publish_time, cls.uuid < uuid)))
+
+        rows = query.order_by(cls.providerPublishTime.desc(), cls.uuid.desc()).limit(
+            page_size or cls.article_page_size).all()
+        return cls.attach_collections(summaries=[cls.summary_from_row(row) for row in rows], session=session)
+
+    @classmethod
+    def fetch_summaries_by_uuid_list(cls, uuid_list: list[str], session: sessionType) -> list[dict]:
+        """returns the summaries of the articles in uuid_list sorted by most recent"""
+        if not uuid_list:
+            return []
+        rows = session.query(*cls.summary_columns()).filter(cls.uuid.in_(uuid_list)).all()
+        rows.sort(key=lambda row: (row.providerPublishTime, row.uuid), reverse=True)
+        return cls.attach_collections(summaries=[cls.summary_from_row(row) for row in rows], session=session)
+
+    @staticmethod
+    def summary_from_row(row) -> dict:
+        return {
+            'uuid': row.uuid,
+            'title': row.title,
+            'publisher': row.publisher,
+            'link': row.link,
+            'providerPublishTime': row.providerPublishTime,
+            'created_at': row.created_at,
+            'datetime_published': datetime.fromtimestamp(row.providerPublishTime).isoformat()
+            if row.providerPublishTime is not None else None,
+            'type': row.type
+        }
+
+    @staticmethod
+    def attach_collections(summaries: list[dict], session: sessionType) -> list[dict]:
+        """
+        **attach_collections**
+            adds sentiment, tickers and thumbnails to the summaries using one batched IN query per collection
+        :param summaries:
+        :param session:
+        :return: summaries
+        """
+        if not summaries:
+            return summaries
+
+        by_uuid: dict[str, dict] = {}
+        for summary in summaries:
+            summary['tickers'] = []
+            summary['thumbnail'] = dict(resolutions=[])
+            by_uuid[summary['uuid']] = summary
+        uuid_list = list(by_uuid)
+
+        sentiment_rows = session.query(NewsSentiment.article_uuid, NewsSentiment.stock_codes, NewsSentiment.title,
+                                       NewsSentiment.sentiment_title, NewsSentiment.article_tldr,
+                                       NewsSentiment.sentiment_article, NewsSentiment.link).filter(
+            NewsSentiment.article_uuid.in_(uuid_list))
+        for row in sentiment_rows:
+            by_uuid[row.article_uuid]['sentiment'] = {
+                'stock_codes': row.stock_codes,
+                'title': row.title,
+                'sentiment_title': row.sentiment_title,
+                'article_tldr': row.article_tldr,
+                'sentiment_article': row.sentiment_article,
+                'link': row.link}
+
+        for uuid, ticker in session.query(RelatedTickers.uuid, RelatedTickers.ticker).filter(
+                RelatedTickers.uuid.in_(uuid_list)):
+            by_uuid[uuid]['tickers'].append(ticker)
+
+        thumbnail_rows = session.query(ThumbnailImage.thumbnail_id, NewsThumbnail.uuid, ThumbnailImage.url,
+                                       ThumbnailImage.width, ThumbnailImage.height, ThumbnailImage.tag).join(
+            NewsThumbnail, NewsThumbnail.thumbnail_id == ThumbnailImage.thumbnail_id).filter(
+            NewsThumbnail.uuid.in_(uuid_list))
+        for row in thumbnail_rows:
+            by_uuid[row.uuid]['thumbnail']['resolutions'].append(dict(row._mapping))
+
+        return summaries
+
+    @classmethod
+    def keyset_page(cls, query, cursor: tuple[int, str] | None, page_size: int | None):
+        """
+        **keyset_page**
+            sorts query by most recent and limits it to the page after cursor, the (providerPublishTime, uuid)
+            sort key is indexed so every page costs the same as the first one
+        :param query:
+        :param cursor: (providerPublishTime, uuid) of the last article on the previous page
+        :param page_size:
+        :return: query
+        """
+        if cursor is not None:
+            publish_time, uuid = cursor
+            query = query.filter(or_(cls.providerPublishTime < publish_time,
+                                     and_(cls.providerPublishTime == publish_time, cls.uuid < uuid)))
+
+        return (
+            query
+            .options(joinedload(cls.sentiment), joinedload(cls.tickers), joinedload(cls.thumbnails))
+            .order_by(cls.providerPublishTime.desc(), cls.uuid.desc())
+            .limit(page_size or cls.article_page_size)
+        )
+
+    @classmethod
+    async def fetch_by_day_published(cls, date_published: str, session: sessionType,
+                                     cursor: tuple[int, str] | None = None, page_size: int | None = None):
         """
             **fetch_by_day_published**
                 Fetch by day published -- returns a list of News
             :param session:
             :param date_published:
+            :param cursor: (providerPublishTime, uuid) of the last article on the previous page
+            :param page_size:
             :return:
         """
         end_of_day, start_of_day = create_start_end_timestamps(_date=date_published)
-        query = session.query(cls).options(joinedload(cls.sentiment), joinedload(cls.tickers),
-                                           joinedload(cls.thumbnails))
-        query = query.filter(cls.providerPublishTime >= start_of_day, cls.providerPublishTime <= end_of_day).limit(
-            cls.article_page_size)
-        return query.all()
+        query = session.query(cls).filter(cls.providerPublishTime >= start_of_day,
+                                          cls.providerPublishTime <= end_of_day)
+        return cls.keyset_page(query=query, cursor=cursor, page_size=page_size).all()
 
     @classmethod
-    async def fetch_by_publisher(cls, publisher: str, session: sessionType):
+    async def fetch_by_publisher(cls, publisher: str, session: sessionType, cursor: tuple[int, str] | None = None,
+                                 page_size: int | None = None):
         """
         fetch by publisher -- returns a publisher , session.
         :param publisher:
         :param session:
+        :param cursor: (providerPublishTime, uuid) of the last article on the previous page
+        :param page_size:
         :return: list[Self]
         """
-        return (
-            session.query(cls)
-            .options(joinedload(cls.sentiment))
-            .options(joinedload(cls.tickers))
-            .options(joinedload(cls.thumbnails))
-            .order_by(-cls.providerPublishTime)
-            .filter(cls.publisher == publisher)
-            .limit(cls.article_page_size)
-            .all()
-        )
+        query = session.query(cls).filter(cls.publisher == publisher)
+        return cls.keyset_page(query=query, cursor=cursor, page_size=page_size).all()
 
     @classmethod
-    async def get_bounded(cls, upper_bound: int, session: sessionType):
+    async def get_bounded(cls, upper_bound: int, session: sessionType, cursor: tuple[int, str] | None = None):
         """
         **get_bounded**
             sorted by most recent - will return News Tickers Sentiment and Thumbnails
         :param session:
         :param upper_bound:
+        :param cursor: (providerPublishTime, uuid) of the last article on the previous page
         :return:
         """
-        return (
-            session.query(cls)
-            .order_by(-cls.providerPublishTime)
-            .options(joinedload(cls.sentiment))
-            .options(joinedload(cls.tickers))
-            .options(joinedload(cls.thumbnails))
-            .limit(upper_bound)
-            .all()
-        )
+        return cls.keyset_page(query=session.query(cls), cursor=cursor, page_size=upper_bound).all()
+
+    @classmethod
+    def fetch_summaries_by_day_published(cls, date_published: str, session: sessionType,
+                                         cursor: tuple[int, str] | None = None,
+                                         page_size: int | None = None) -> list[dict]:
+        """same as fetch_by_day_published, returns summaries"""
+        end_of_day, start_of_day = create_start_end_timestamps(_date=date_published)
+        criteria = (cls.providerPublishTime >= start_of_day, cls.providerPublishTime <= end_of_day)
+        return cls.fetch_summaries(session=session, criteria=criteria, cursor=cursor, page_size=page_size)
+
+    @classmethod
+    def fetch_summaries_by_publisher(cls, publisher: str, session: sessionType,
+                                     cursor: tuple[int, str] | None = None,
+                                     page_size: int | None = None) -> list[dict]:
+        """same as fetch_by_publisher, returns summaries"""
+        return cls.fetch_summaries(session=session, criteria=(cls.publisher == publisher,), cursor=cursor,
+                                   page_size=page_size)
 
     @classmethod
     async def get_present_uuid_list(cls, session: sessionType) -> list[str]:
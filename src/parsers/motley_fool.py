@@ -1,6 +1,9 @@
 from bs4 import BeautifulSoup
 
+from src.telemetry.tracing import traced
 
+
+@traced('parse_motley_article')
 def parse_motley_article(html):
     soup = BeautifulSoup(html, 'html.parser')
 
@@ -3,6 +3,7 @@ Helper functions to obtain ticker symbols
     utils for searching through articles
 """
 import asyncio
+import os
 from datetime import datetime, timedelta, time
 
 import aiohttp
@@ -16,6 +17,8 @@ from src.exceptions import RequestError
 from src.models import Exchange, Stock, RssArticle
 from src.tasks.utils import switch_headers
 from src.telemetry import capture_telemetry
+from src.telemetry.memory import memory_registry
+from src.telemetry.tracing import traced
 from src.utils.my_logger import init_logger
 
 tasks_logger = init_logger('tasks-logger')
@@ -34,6 +37,16 @@ request_session = CachedSession('finance_news.cache', use_cache_dir=False,
                                 )
 
 
+def cache_size() -> dict[str, int]:
+    """responses in the requests cache, the sqlite backend keeps them on disk rather than in memory"""
+    db_path = getattr(request_session.cache.responses, 'db_path', None)
+    disk_bytes = os.path.getsize(db_path) if db_path and os.path.exists(db_path) else 0
+    return dict(items=len(request_session.cache.responses), disk_bytes=disk_bytes)
+
+
+memory_registry.register('requests_cache', cache_size)
+
+
 async def get_exchange_tickers(exchange_code: str) -> list[Stock]:
     """
     **get_exchange_tickers**
@@ -124,6 +137,7 @@ async def do_soup(html) -> tuple[str, str]:
 
 
 @capture_telemetry(name='download_article')
+@traced('download_article')
 async def download_article(link: str, timeout: int, headers: dict[str, str]) -> str | None:
     """
     **download_article**
@@ -226,7 +240,7 @@ async def sub_query_tickers(count: int = 300, offset: int = 0) -> tuple[set[str]
         name = cells[1].text.strip()
         tickers[symbol] = name
 
-    tasks_logger.info(tickers)
+    tasks_logger.info(f"Trending tickers found : {len(tickers)}")
     _present_tickers = set(tickers.keys())
     return _present_tickers, tickers
 
@@ -13,28 +13,55 @@ from src.tasks import download_article
 from src.tasks.rss_feeds import parse_feeds
 from src.tasks.utils import switch_headers, cloud_flare_proxy
 from src.telemetry import capture_telemetry
+from src.telemetry.tracing import tracer, traced
 from src.utils.my_logger import init_logger
 
 news_scrapper_logger = init_logger('news-scrapper-logger')
 
 
-async def scrape_news_yahoo(tickers: list[str], _chunk_size: int = 10) -> list[NewsArticle | RssArticle]:
+async def scrape_news_yahoo(tickers: list[str], _chunk_size: int = 10) -> int:
+    """
+        **scrape_news_yahoo**
+            scrapes articles for every ticker, each ticker's articles are handed to the data sink
+            as soon as they are parsed so they get stored while the rest of the tickers are scraped
+    :param tickers:
+    :param _chunk_size:
+    :return: total articles scraped
+    """
     try:
-        articles_tickers = []
+        total_articles = 0
         chunk_size = _chunk_size if len(tickers) > _chunk_size else len(tickers)
 
         for i in range(0, len(tickers), chunk_size):
             chunk = tickers[i:i + chunk_size]
-            tasks = [ticker_articles(ticker=ticker) for ticker in chunk]
+            tasks = [store_ticker_articles(ticker=ticker) for ticker in chunk]
             results = await asyncio.gather(*tasks)
-            articles_tickers.extend([articles for articles in results if isinstance(articles, list)])
+            total_articles += sum(results)
 
-        return list(itertools.chain(*articles_tickers))
+        return total_articles
     except Exception as e:
         news_scrapper_logger.info(f"Exception raised: {str(e)}")
-        return []
+        return 0
+
+
+async def store_ticker_articles(ticker: str) -> int:
+    """
+        **store_ticker_articles**
+            scrapes articles for a single ticker and sends them to the data sink,
+            waits when the data sink has too many articles waiting for the database
+    :param ticker:
+    :return: total articles scraped for the ticker
+    """
+    with tracer.trace('ticker', ticker=ticker):
+        articles = await ticker_articles(ticker=ticker)
+        if not isinstance(articles, list):
+            return 0
+
+        await data_sink.incoming_articles(article_list=articles)
+        return len(articles)
 
 
+@traced('ticker_articles')
 async def ticker_articles(ticker: str) -> list[NewsArticle | RssArticle]:
     """
         **ticker_articles**
@@ -69,7 +96,7 @@ async def ticker_articles(ticker: str) -> list[NewsArticle | RssArticle]:
             # NOTE: sometimes there is a strange list error here, don't know why honestly
 
             _article: NewsArticle | None = NewsArticle(**article)
-            news_scrapper_logger.info(f"Original Article Scrapped : {_article}")
+            news_scrapper_logger.info(f"Original Article Scrapped : {_article.uuid} {_article.title}")
             # news_scrapper_logger.info(f"Thumbnails : {_article.thumbnail}")
         except ValidationError as e:
             news_scrapper_logger.info(f'Error Creating NewsArticle: {str(e)}')
@@ -87,7 +114,7 @@ async def ticker_articles(ticker: str) -> list[NewsArticle | RssArticle]:
                     _article.body = body
 
                 articles.append(_article)
-                news_scrapper_logger.info(f"Added Article: {_article}")
+                news_scrapper_logger.info(f"Added Article: {_article.uuid} body {len(_article.body or '')} chars")
             except Exception as e:
                 news_scrapper_logger.info(f'error parsing article: {str(e)}')
 
@@ -136,6 +163,7 @@ async def alternate_news_sources(*args, **kwargs) -> list[NewsArticle | RssArtic
     return articles_list
 
 
+@traced('parse_article')
 async def parse_article(article: NewsArticle | None) -> tuple[str | None, str | None, str | None]:
     """**parse_article**
     will parse articles from yfinance
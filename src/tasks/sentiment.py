@@ -0,0 +1,195 @@
+"""
+    **SentimentWorker**
+        background worker scoring the titles and bodies of stored articles against a finance lexicon
+        and writing the scores into news_sentiment.sentiment_title and news_sentiment.sentiment_article
+
+        every text of a batch is tokenized into one flat array of vocabulary ids, lexicon weights are looked up
+        for the whole batch at once and summed per text with numpy, scoring never runs on the event loop,
+        batches are scored on a worker thread or, from pool_threshold texts on, split across a process pool
+"""
+import asyncio
+import json
+import multiprocessing
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from src.config import config_instance
+from src.connector.data_instance import mysql_instance
+from src.connector.response_cache import response_cache
+from src.connector.ticker_rings import latest_articles
+from src.models.sql.news import News, NewsBody, NewsSentiment
+from src.utils.my_logger import init_logger
+
+sentiment_logger = init_logger('sentiment-logger')
+
+WORD_PATTERN = re.compile(r"[a-z]+(?:'[a-z]+)?")
+# scores within this distance of zero are neutral
+NEUTRAL_BAND = 0.05
+
+POSITIVE_WORDS = frozenset("""
+    achieve achieved advance advanced advances beat beats benefit benefited boost boosted breakthrough bullish
+    climb climbed climbs confident exceed exceeded exceeds expand expanded expansion favorable gain gained gains
+    grew grow growing growth high higher highs improve improved improvement improves innovative jump jumped
+    leading opportunity optimistic outperform outperformed outperforms positive profit profitable profits rally
+    rallied rebound rebounded record recover recovered recovery rise rises rising robust rose soar soared soars solid
+    strong stronger strength succeed success successful surge surged surpass surpassed upbeat upgrade upgraded
+    upside win winning
+""".split())
+
+NEGATIVE_WORDS = frozenset("""
+    bankrupt bankruptcy bearish concern concerns crash crashed crisis cut cuts decline declined declines default
+    deficit delay delayed downgrade downgraded downside drop dropped drops fall fallen falling falls fear fears
+    fell fine fined fraud halt halted investigation lawsuit layoff layoffs lose losing loss losses low lower
+    lows miss missed misses negative plunge plunged plunges probe recall recession risk risks selloff shortfall
+    sink slide slowdown slump slumped tumble tumbled underperform volatile volatility warn warned warning warns
+    weak weaker weakness worse worst
+""".split())
+
+VOCABULARY: dict[str, int] = {word: index for index, word in enumerate(sorted(POSITIVE_WORDS | NEGATIVE_WORDS))}
+WEIGHTS = np.array([1.0 if word in POSITIVE_WORDS else -1.0 for word in sorted(VOCABULARY, key=VOCABULARY.get)])
+
+
+def score_texts(texts: list[str | None]) -> list[float | None]:
+    """
+        **score_texts**
+            scores every text between -1 (negative) and 1 (positive), texts which are None score None
+    :param texts:
+    :return:
+    """
+    token_ids: list[int] = []
+    text_index: list[int] = []
+    for index, text in enumerate(texts):
+        if not text:
+            continue
+        for word in WORD_PATTERN.findall(text.lower()):
+            token_id = VOCABULARY.get(word)
+            if token_id is not None:
+                token_ids.append(token_id)
+                text_index.append(index)
+
+    ids = np.asarray(token_ids, dtype=np.int64)
+    owners = np.asarray(text_index, dtype=np.int64)
+    weights = WEIGHTS[ids]
+    polarity = np.bincount(owners, weights=weights, minlength=len(texts))
+    matches = np.bincount(owners, minlength=len(texts))
+    scores = polarity / np.maximum(matches, 1)
+    return [None if text is None else float(score) for text, score in zip(texts, scores)]
+
+
+def to_sentiment(score: float | None) -> str | None:
+    if score is None:
+        return None
+    label = 'neutral' if abs(score) < NEUTRAL_BAND else 'positive' if score > 0 else 'negative'
+    return json.dumps(dict(label=label, score=round(score, 4)), separators=(',', ':'))
+
+
+class SentimentWorker:
+    """
+    **SentimentWorker**
+        run scores every article without a title sentiment, batch_size articles at a time,
+        batches of at least pool_threshold articles are scored across the process pool, the threshold
+        is capped at batch_size so that full batches always reach the pool
+
+        the pool is created by start, workers are spawned rather than forked because the service is
+        already running the logging, watchdog and profiler threads when the pool starts
+    """
+
+    def __init__(self, batch_size: int, workers: int, pool_threshold: int):
+        self.batch_size: int = batch_size
+        self.workers: int = workers
+        self.pool_threshold: int = min(pool_threshold, batch_size)
+        self._pool: ProcessPoolExecutor | None = None
+        self.total_scored: int = 0
+        self.articles_per_second: float = 0.0
+
+    def start(self) -> None:
+        """creates the process pool, batches are scored on a worker thread when there is no pool"""
+        if self._pool is None and self.workers > 1:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'))
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    async def run(self) -> int:
+        """
+            **run**
+                scores every unscored article
+        :return: total articles scored
+        """
+        total_scored = 0
+        started = time.perf_counter()
+        last_uuid = ""
+        while True:
+            batch = await asyncio.to_thread(self.load_batch, last_uuid)
+            if not batch:
+                break
+            last_uuid = batch[-1][0]
+
+            title_scores = await self.score([title for _, title, _ in batch])
+            article_scores = await self.score([body for _, _, body in batch])
+            mappings = [dict(article_uuid=uuid, sentiment_title=to_sentiment(title_score),
+                             sentiment_article=to_sentiment(article_score))
+                        for (uuid, _, _), title_score, article_score in zip(batch, title_scores, article_scores)]
+            await asyncio.to_thread(self.save_batch, mappings)
+            await self.refresh_latest_articles(uuid_list=[uuid for uuid, _, _ in batch])
+            total_scored += len(batch)
+
+        if total_scored:
+            elapsed = time.perf_counter() - started
+            self.total_scored += total_scored
+            self.articles_per_second = total_scored / elapsed if elapsed else 0.0
+            sentiment_logger.info(f"Scored {total_scored} articles at {self.articles_per_second:.1f} articles/s")
+            response_cache.clear()
+        return total_scored
+
+    async def score(self, texts: list[str | None]) -> list[float | None]:
+        if len(texts) < self.pool_threshold or self._pool is None:
+            return await asyncio.to_thread(score_texts, texts)
+
+        loop = asyncio.get_running_loop()
+        chunk_size = -(-len(texts) // self.workers)
+        chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+        results = await asyncio.gather(*[loop.run_in_executor(self._pool, score_texts, chunk) for chunk in chunks])
+        return [score for chunk_scores in results for score in chunk_scores]
+
+    def load_batch(self, last_uuid: str) -> list[tuple[str, str | None, str | None]]:
+        """
+            the next batch of unscored articles after last_uuid in primary key order
+        :param last_uuid:
+        :return: list of (uuid, title, body)
+        """
+        with mysql_instance.get_session() as session:
+            rows = session.query(NewsSentiment.article_uuid, NewsSentiment.title).filter(
+                NewsSentiment.sentiment_title.is_(None), NewsSentiment.article_uuid > last_uuid).order_by(
+                NewsSentiment.article_uuid).limit(self.batch_size).all()
+            bodies = {news_body.uuid: news_body.text for news_body in session.query(NewsBody).filter(
+                NewsBody.uuid.in_([uuid for uuid, _ in rows]))} if rows else {}
+        return [(uuid, title or "", bodies.get(uuid)) for uuid, title in rows]
+
+    @staticmethod
+    def save_batch(mappings: list[dict]) -> None:
+        """writes the scores of a batch with one bulk update"""
+        with mysql_instance.get_session() as session:
+            session.bulk_update_mappings(NewsSentiment, mappings)
+            session.commit()
+
+    async def refresh_latest_articles(self, uuid_list: list[str]) -> None:
+        """replaces the summaries held by the ticker rings with the scored ones"""
+        summaries = await asyncio.to_thread(self.load_summaries, uuid_list)
+        latest_articles.add_summaries(summaries=summaries)
+
+    @staticmethod
+    def load_summaries(uuid_list: list[str]) -> list[dict]:
+        with mysql_instance.get_session() as session:
+            return News.fetch_summaries_by_uuid_list(uuid_list=uuid_list, session=session)
+
+
+_sentiment_settings = config_instance().SENTIMENT_SETTINGS
+sentiment_worker: SentimentWorker = SentimentWorker(batch_size=_sentiment_settings.BATCH_SIZE,
+                                                    workers=_sentiment_settings.WORKERS,
+                                                    pool_threshold=_sentiment_settings.POOL_THRESHOLD)
@@ -0,0 +1,172 @@
+"""
+    **TextRankSummarizer**
+        extractive summaries for article_tldr, computed once when DataConnector stores a batch of articles
+
+        article bodies are split into sentences, every sentence becomes a row of a hashed TF-IDF matrix,
+        sentences are ranked with TextRank (PageRank over the cosine similarity graph of the sentences)
+        and the best ranked sentences that fit in the tldr column are returned in their original order.
+"""
+import asyncio
+import multiprocessing
+import re
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from src.config import config_instance
+from src.models import NewsArticle
+from src.utils.my_logger import init_logger
+
+summarizer_logger = init_logger('summarizer-logger')
+
+SENTENCE_PATTERN = re.compile(r'(?<=[.!?])["\')\]]?\s+(?=["\'(\[]?[A-Z0-9])')
+WORD_PATTERN = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+HASH_FEATURES = 2 ** 12
+MIN_SENTENCE_WORDS = 6
+MAX_SENTENCES = 200
+DAMPING = 0.85
+TOLERANCE = 1e-4
+MAX_ITERATIONS = 100
+# article_tldr is a String(255)
+MAX_SUMMARY_LENGTH = 255
+
+
+def split_sentences(text: str) -> list[str]:
+    """sentences long enough to carry content, in order, without repeats - bylines and banners are dropped"""
+    sentences: list[str] = []
+    seen: set[str] = set()
+    for paragraph in text.split('\n'):
+        for sentence in SENTENCE_PATTERN.split(paragraph.strip()):
+            sentence = ' '.join(sentence.split())
+            if len(WORD_PATTERN.findall(sentence.lower())) >= MIN_SENTENCE_WORDS and sentence not in seen:
+                seen.add(sentence)
+                sentences.append(sentence)
+    return sentences[:MAX_SENTENCES]
+
+
+def sentence_matrix(sentences: list[str]) -> np.ndarray:
+    """L2 normalized TF-IDF rows, words are hashed into HASH_FEATURES columns instead of keeping a vocabulary"""
+    matrix = np.zeros((len(sentences), HASH_FEATURES), dtype=np.float32)
+    for row, sentence in enumerate(sentences):
+        columns = [zlib.crc32(word.encode('utf-8')) % HASH_FEATURES for word in WORD_PATTERN.findall(sentence.lower())]
+        np.add.at(matrix[row], columns, 1.0)
+
+    document_frequency = np.count_nonzero(matrix, axis=0)
+    matrix *= np.log((1 + len(sentences)) / (1 + document_frequency)) + 1.0
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+def rank_sentences(matrix: np.ndarray, deadline: float) -> np.ndarray | None:
+    """TextRank scores of the sentences, None if the deadline passes before the ranks converge"""
+    similarity = matrix @ matrix.T
+    np.fill_diagonal(similarity, 0.0)
+    out_weight = similarity.sum(axis=1, keepdims=True)
+    transition = np.divide(similarity, out_weight, out=np.zeros_like(similarity), where=out_weight > 0)
+
+    total = len(matrix)
+    scores = np.full(total, 1.0 / total, dtype=np.float32)
+    for _ in range(MAX_ITERATIONS):
+        updated = (1 - DAMPING) / total + DAMPING * (transition.T @ scores)
+        if np.abs(updated - scores).sum() < TOLERANCE:
+            return updated
+        scores = updated
+        if time.perf_counter() > deadline:
+            return None
+    return scores
+
+
+def summarize(text: str | None, time_budget: float) -> str | None:
+    """
+        **summarize**
+            extractive summary of text, falls back to the leading sentences when ranking does not finish
+            within time_budget seconds
+    :param text:
+    :param time_budget: seconds
+    :return: summary no longer than MAX_SUMMARY_LENGTH or None if text has no usable sentences
+    """
+    deadline = time.perf_counter() + time_budget
+    sentences = split_sentences(text or "")
+    if not sentences:
+        return None
+
+    order = list(range(len(sentences)))
+    if len(sentences) > 2:
+        scores = rank_sentences(sentence_matrix(sentences), deadline=deadline)
+        if scores is not None:
+            order = [int(index) for index in np.argsort(-scores, kind='stable')]
+
+    chosen: list[int] = []
+    length = 0
+    for index in order:
+        if length + len(sentences[index]) + 1 <= MAX_SUMMARY_LENGTH:
+            chosen.append(index)
+            length += len(sentences[index]) + 1
+    if not chosen:
+        return sentences[order[0]][:MAX_SUMMARY_LENGTH - 3].rsplit(' ', 1)[0] + '...'
+    return ' '.join(sentences[index] for index in sorted(chosen))
+
+
+def summarize_batch(texts: list[str | None], time_budget: float) -> list[str | None]:
+    return [summarize(text, time_budget=time_budget) for text in texts]
+
+
+class TextRankSummarizer:
+    """
+    **TextRankSummarizer**
+        summaries are computed in a process pool so ranking never blocks the event loop,
+        every article gets time_budget seconds, a batch which overruns keeps the scraped summaries
+
+        the pool is created by start when the data sink starts, workers are spawned rather than forked
+        because the logging, watchdog and profiler threads are already running by then
+    """
+
+    def __init__(self, workers: int, time_budget: float):
+        self.workers: int = workers
+        self.time_budget: float = time_budget
+        self._pool: ProcessPoolExecutor | None = None
+
+    def start(self) -> None:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'))
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    async def summarize_articles(self, articles: list[NewsArticle]) -> None:
+        """
+            **summarize_articles**
+                replaces the summary of every article with a body by its extractive summary,
+                articles keep their scraped summaries until the pool is started
+        :param articles:
+        :return:
+        """
+        articles = [article for article in articles if article is not None and article.body]
+        if not articles or self._pool is None:
+            return
+
+        loop = asyncio.get_running_loop()
+        chunk_size = -(-len(articles) // self.workers)
+        chunks = [articles[i:i + chunk_size] for i in range(0, len(articles), chunk_size)]
+        futures = [loop.run_in_executor(self._pool, summarize_batch, [article.body for article in chunk],
+                                        self.time_budget) for chunk in chunks]
+
+        for chunk, future in zip(chunks, futures):
+            try:
+                # ranking stops itself at the budget, the timeout only guards against a stuck worker
+                summaries = await asyncio.wait_for(future, timeout=self.time_budget * len(chunk) + 5.0)
+            except Exception as e:
+                summarizer_logger.info(f"Unable to summarize {len(chunk)} articles : {str(e)}")
+                continue
+            for article, summary in zip(chunk, summaries):
+                if summary:
+                    article.summary = summary
+
+
+_summary_settings = config_instance().SUMMARY_SETTINGS
+summarizer: TextRankSummarizer = TextRankSummarizer(workers=_summary_settings.WORKERS,
+                                                    time_budget=_summary_settings.TIME_BUDGET)
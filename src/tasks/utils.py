@@ -6,6 +6,8 @@ import aiohttp
 from src.exceptions import RequestError
 from src.config import config_instance
 from src.telemetry import capture_telemetry
+from src.telemetry.metrics import proxy_requests
+from src.telemetry.tracing import traced
 from src.utils import user_agents
 
 
@@ -52,6 +54,7 @@ class CloudflareProxy:
         return f"{self.api_endpoint}/zones/{self.zone_id}/workers/scripts/{self.worker_name}/fetch"
 
     # @capture_telemetry(name='make_request_with_cloudflare')
+    @traced('make_request_with_cloudflare')
     async def make_request_with_cloudflare(self, url: str, method: str):
         """
             **make_request_with_cloudflare**
@@ -60,10 +63,11 @@ class CloudflareProxy:
         :param method:
         :return:
         """
+        route = 'proxy' if self.error_count < self.error_thresh_hold else 'direct'
         try:
             headers: dict[str, str] = await switch_headers()
             headers.update({'X-SECURITY-TOKEN': config_instance().CLOUDFLARE_SETTINGS.SECURITY_TOKEN})
-            if self.error_count < self.error_thresh_hold:
+            if route == 'proxy':
                 request_url = f"{self.worker_url}?url={url}&method={method}"
             else:
                 request_url = url
@@ -75,12 +79,16 @@ class CloudflareProxy:
                     if response.headers.get('Content-Type') == 'application/json':
                         data = await response.json()
                         print(data)
-                        return data
-                    return await response.text()
+                    else:
+                        data = await response.text()
+                    proxy_requests.inc(route=route, outcome='success')
+                    return data
         except (aiohttp.ClientError, asyncio.TimeoutError):
             self.error_count += 1
+            proxy_requests.inc(route=route, outcome='failure')
             return None
         except Exception as e:
+            proxy_requests.inc(route=route, outcome='failure')
             raise RequestError()
 
 
@@ -1,126 +1,131 @@
+import random
 import time
 from functools import wraps
-from pydantic import BaseModel, Field
+from typing import NamedTuple
 
+from src.config import config_instance
 from src.exceptions import ErrorParsingFeeds, ErrorParsingHTMLDocument, RequestError
+from src.telemetry.buckets import MinuteSeries
+from src.telemetry.memory import memory_registry
+from src.telemetry.metrics import method_errors, method_latency, CounterChild, HistogramChild
+from src.telemetry.sketch import LatencySketches
 from src.utils.my_logger import init_logger
 
 telemetry_logger = init_logger('telemetry_logger')
 
 
-class TimeMetrics(BaseModel):
-    """
-        **TimeMetrics**
-        this model is used to send time metrics
-    """
-    method_name: str = Field()
-    latency: float = Field(default=0)
-
-    class Config:
-        title = "Financial News Parser Time Metrics Data"
-
-    def update_latency(self, name: str, latency: float):
-        self.method_name = name
-        self.latency = latency
-
-    def __str__(self):
-        return f"Method: {self.method_name} , Latency: {self.latency:.3f}"
-
-
-class ErrorMetrics(BaseModel):
-    method_name: str = Field()
-    error_type: str = Field()
-
-
-class Telemetry(BaseModel):
-    """
-    **Telemetry**
-        this model is used to send telemetry data
-        to the admin about this microservice
-    """
-    timing_data: list[TimeMetrics] = Field(default_factory=lambda: list())
-    errors: list[ErrorMetrics] = Field(default_factory=lambda: list())
+# returned by a decorated method in place of the result when it raises one of the parser or request errors
+DEFAULT_RESULTS = {
+    "parse_article": lambda: (None, None, None, []),
+    "get_meme_tickers": lambda: {},
+    "do_soup": lambda: (None, None),
+    "parse_google_feeds": lambda: list(),
+    "make_request_with_cloudflare": lambda: None
+}
 
-    class Config:
-        title = "Financial News Parser Telemetry Data"
 
-    async def add_error_metric(self, error_metric: ErrorMetrics):
-        telemetry_logger.info(error_metric)
-        self.errors.append(error_metric)
-
-    async def add_timing_data(self, timing_data: TimeMetrics):
-        telemetry_logger.info(timing_data)
-        self.timing_data.append(timing_data)
-
-    @property
-    def error_count(self) -> int:
-        return len(self.errors)
-
-    @property
-    def timing_count(self) -> int:
-        return len(self.timing_data)
-
-    @property
-    def events_count(self) -> int:
-        return self.error_count + self.timing_count
-
-    def return_data_point(self) -> dict:
-        """
-        Returns the telemetry data as a dictionary
-        """
-        return dict(
-            timing_data=[timing.dict() for timing in self.timing_data],
-            timing_count=self.timing_count,
-            errors=[_error.dict() for _error in self.errors],
-            error_count=self.error_count)
+class MethodRecorders(NamedTuple):
+    series: MinuteSeries
+    sketches: LatencySketches
+    errors: CounterChild
+    latency: HistogramChild
 
 
 class TelemetryStream:
     """
-    Telemetry stream that captures telemetry data for a specified time_elapsed
+    **TelemetryStream**
+        per minute telemetry of every decorated method, kept for the last retention_minutes minutes
+        in a MinuteSeries for each method name, latency percentiles come from the DDSketch of every minute
+        in the last sketch_minutes minutes
+
+        recording a call only updates counters, errors and calls slower than slow_call_seconds are logged,
+        other calls are logged for a sample_rate fraction of calls
     """
 
-    def __init__(self):
-        self.elapsed_time_minutes: int = 0
+    def __init__(self, retention_minutes: int, sketch_minutes: int, relative_accuracy: float,
+                 sample_rate: float, slow_call_seconds: float):
+        self.retention_minutes: int = retention_minutes
+        self.sketch_minutes: int = sketch_minutes
+        self.relative_accuracy: float = relative_accuracy
+        self.sample_rate: float = sample_rate
+        self.slow_call_seconds: float = slow_call_seconds
         self.method_names: set[str] = set()
-        self.telemetry_data: dict[int, Telemetry] = {}
-
-    async def capture_error(self, method_name: str, error_type: str):
+        self.series: dict[str, MinuteSeries] = {}
+        self.sketches: dict[str, LatencySketches] = {}
+        self._recorders: dict[str, MethodRecorders] = {}
+
+    def recorders(self, method_name: str) -> MethodRecorders:
+        recorders = self._recorders.get(method_name)
+        if recorders is None:
+            recorders = self._recorders[method_name] = MethodRecorders(
+                series=self.series.setdefault(method_name, MinuteSeries(capacity=self.retention_minutes)),
+                sketches=self.sketches.setdefault(method_name, LatencySketches(
+                    capacity=self.sketch_minutes, relative_accuracy=self.relative_accuracy)),
+                errors=method_errors.labels(method=method_name),
+                latency=method_latency.labels(method=method_name))
+            self.method_names.add(method_name)
+        return recorders
+
+    def record_error(self, method_name: str, error_type: str) -> None:
         """
         Handler to capture error telemetry
         """
+        telemetry_logger.error(f"Method: {method_name} , Error: {error_type}")
+        recorders = self.recorders(method_name)
+        recorders.series.record_error(minute=int(time.time() // 60))
+        recorders.errors.inc()
+
+    def record_call(self, method_name: str, latency: float) -> None:
+        current_minute: int = int(time.time() // 60)
+        recorders = self.recorders(method_name)
+        recorders.series.record_latency(current_minute, latency)
+        recorders.sketches.add(current_minute, latency)
+        recorders.latency.observe(latency)
+        if latency >= self.slow_call_seconds:
+            telemetry_logger.warning(f"Slow call - Method: {method_name} , Latency: {latency:.3f}")
+        elif self.sample_rate and random.random() < self.sample_rate:
+            telemetry_logger.info(f"Method: {method_name} , Latency: {latency:.3f}")
+
+    def data_points(self) -> dict[int, dict[str, int | list[dict[str, str | int | float | None]]]]:
+        """
+        **data_points**
+            telemetry of every minute in the retention window, keyed by minute since the epoch
+        :return:
+        """
         current_minute: int = int(time.time() / 60)
-        error_metric = ErrorMetrics(method_name=method_name, error_type=error_type)
-        if self.telemetry_data.get(current_minute, False):
-            await self.telemetry_data[current_minute].add_error_metric(error_metric=error_metric)
-        else:
-            telemetry = Telemetry()
-            await telemetry.add_error_metric(error_metric=error_metric)
-            self.telemetry_data.update({current_minute: telemetry})
-
-    async def capture_time_metrics(self, name, current_minute, start_time):
-        time_metrics: TimeMetrics = TimeMetrics(method_name=name, latency=(time.monotonic() - start_time))
-        if self.telemetry_data.get(current_minute, False):
-            await self.telemetry_data[current_minute].add_timing_data(timing_data=time_metrics)
-        else:
-            telemetry: Telemetry = Telemetry()
-            await telemetry.add_timing_data(timing_data=time_metrics)
-            self.telemetry_data.update(current_minute=telemetry)
-            self.elapsed_time_minutes += 1
-
-    async def return_data_stream(self) -> tuple[time, dict[str, int | list[dict[str, str | int]]]]:
-        for _time, data in self.telemetry_data.items():
-            yield _time, data.return_data_point()
+        timing_data: dict[int, list[dict]] = {}
+        for method_name, series in self.series.items():
+            for slot in series.slots(current_minute=current_minute):
+                timing_data.setdefault(series.minutes[slot], []).append(
+                    dict(method_name=method_name, **series.data_point(slot)))
+
+        return {minute: dict(timing_data=methods,
+                             timing_count=sum(method['calls'] for method in methods),
+                             error_count=sum(method['errors'] for method in methods))
+                for minute, methods in sorted(timing_data.items())}
+
+    async def return_data_stream(self) -> tuple[int, dict[str, int | list[dict[str, str | int | float | None]]]]:
+        for _time, data in self.data_points().items():
+            yield _time, data
 
     @property
     def highest_errors_per_minute(self) -> int:
-        return max([telemetry.error_count for telemetry in self.telemetry_data.values()])
+        return max([data['error_count'] for data in self.data_points().values()], default=0)
 
     @property
     def lowest_errors_per_minute(self) -> int:
-        return min([telemetry.error_count for telemetry in self.telemetry_data.values()])
+        return min([data['error_count'] for data in self.data_points().values()], default=0)
+
+    def _latency_per_method(self, statistic: str, aggregate) -> dict[str, float]:
+        current_minute: int = int(time.time() / 60)
+        method_latency = dict()
+        for method_name, series in self.series.items():
+            latencies = [getattr(series, statistic)[slot] for slot in series.slots(current_minute=current_minute)
+                         if series.calls[slot]]
+            if latencies:
+                method_latency[method_name] = aggregate(latencies)
+        return method_latency
 
-    # noinspection PyUnusedLocal
     @property
     def highest_latency_per_method(self) -> dict[str, float]:
         """
@@ -128,18 +133,8 @@ class TelemetryStream:
             returns method names with their highest latency numbers
         :return:
         """
+        return self._latency_per_method(statistic='latency_max', aggregate=max)
 
-        def get_latency(metric: Telemetry) -> float:
-            _metric_data: dict[str, dict[str, str | float]] = metric.return_data_point()
-            return _metric_data.get('timing_data', {}).get('latency')
-
-        method_max_latency = dict()
-        for method in list(self.method_names):
-            method_max_latency.update({f'{method}': max(*[lambda metric: get_latency(metric)
-                                                          for metric in self.telemetry_data.values()])})
-        return method_max_latency
-
-    # noinspection PyUnusedLocal
     @property
     def lowest_latency_per_method(self) -> dict[str, float]:
         """
@@ -147,17 +142,18 @@ class TelemetryStream:
             returns method names with their lowest latency numbers
         :return:
         """
+        return self._latency_per_method(statistic='latency_min', aggregate=min)
 
-        def get_latency(metric: Telemetry) -> float:
-            _metric_data: dict[str, dict[str, str | float]] = metric.return_data_point()
-            return _metric_data.get('timing_data', {}).get('latency')
-
-        method_max_latency = dict()
-        for method in list(self.method_names):
-            method_max_latency.update({
-                f'{method}': min(
-                    *[lambda metric: get_latency(metric=metric) for metric in self.telemetry_data.values()])})
-        return method_max_latency
+    @property
+    def latency_percentiles_per_method(self) -> dict[str, dict[str, dict[str, int | float | None]]]:
+        """
+        **latency_percentiles_per_method**
+            returns method names with their p50, p90, p99 and max latency over the last 1, 5 and 60 minutes
+        :return:
+        """
+        current_minute: int = int(time.time() / 60)
+        return {method_name: sketches.percentiles(current_minute=current_minute)
+                for method_name, sketches in self.sketches.items()}
 
     def dict(self) -> dict[str, str | float | dict[str, float]]:
         """
@@ -168,42 +164,33 @@ class TelemetryStream:
             highest_errors_per_minute=self.highest_errors_per_minute,
             lowest_errors_per_minute=self.lowest_errors_per_minute,
             highest_latency_per_method=self.highest_latency_per_method,
-            lowest_latency_per_method=self.lowest_latency_per_method)
+            lowest_latency_per_method=self.lowest_latency_per_method,
+            latency_percentiles_per_method=self.latency_percentiles_per_method)
 
 
 def capture_telemetry(name: str):
     def decorator(func):
-        async def create_result():
-            results_ = {
-                "parse_article": lambda: (None, None, None, []),
-                "get_meme_tickers": lambda: {},
-                "do_soup": lambda: (None, None),
-                "parse_google_feeds": lambda: list(),
-                "make_request_with_cloudflare": lambda: None
-            }
-            return results_.get(name, None)
-
         @wraps(func)
         async def wrapper(*args, **kwargs):
-            current_minute: int = int(time.time() / 60)
-            start_time: float = time.monotonic()
+            start_time: float = time.perf_counter()
             try:
-                result = await func(*args, **kwargs)
+                return await func(*args, **kwargs)
             except (ErrorParsingFeeds, ErrorParsingHTMLDocument, RequestError) as e:
-                telemetry_logger.error(str(e))
-                await telemetry_stream.capture_error(method_name=name, error_type=str(e))
-                result = await create_result()
+                telemetry_stream.record_error(method_name=name, error_type=str(e))
+                return DEFAULT_RESULTS.get(name, lambda: None)()
             finally:
-                await telemetry_stream.capture_time_metrics(name=name, current_minute=current_minute,
-                                                            start_time=start_time)
-                # This adds a method name into the set of method_names
-                telemetry_stream.method_names.add(name)
-
-            return result
+                telemetry_stream.record_call(method_name=name, latency=time.perf_counter() - start_time)
 
         return wrapper
 
     return decorator
 
 
-telemetry_stream: TelemetryStream = TelemetryStream()
+_telemetry_settings = config_instance().TELEMETRY_SETTINGS
+telemetry_stream: TelemetryStream = TelemetryStream(retention_minutes=_telemetry_settings.RETENTION_MINUTES,
+                                                    sketch_minutes=_telemetry_settings.SKETCH_MINUTES,
+                                                    relative_accuracy=_telemetry_settings.SKETCH_RELATIVE_ACCURACY,
+                                                    sample_rate=_telemetry_settings.SAMPLE_RATE,
+                                                    slow_call_seconds=_telemetry_settings.SLOW_CALL_SECONDS)
+memory_registry.collection('telemetry.series', lambda: telemetry_stream.series)
+memory_registry.collection('telemetry.sketches', lambda: telemetry_stream.sketches)
@@ -0,0 +1,58 @@
+"""
+    **MinuteSeries**
+        fixed capacity per minute counters of a single method, every statistic is an array of
+        capacity slots indexed by minute % capacity, a slot still holding an older minute is
+        cleared when its minute comes round again, so recording is O(1) and memory never grows
+"""
+from array import array
+
+INFINITY = float('inf')
+
+
+class MinuteSeries:
+    __slots__ = ('capacity', 'minutes', 'calls', 'errors', 'latency_total', 'latency_min', 'latency_max')
+
+    def __init__(self, capacity: int):
+        self.capacity: int = capacity
+        self.minutes: array = array('q', [-1]) * capacity
+        self.calls: array = array('q', [0]) * capacity
+        self.errors: array = array('q', [0]) * capacity
+        self.latency_total: array = array('d', [0.0]) * capacity
+        self.latency_min: array = array('d', [INFINITY]) * capacity
+        self.latency_max: array = array('d', [0.0]) * capacity
+
+    def _slot(self, minute: int) -> int:
+        slot = minute % self.capacity
+        if self.minutes[slot] != minute:
+            self.minutes[slot] = minute
+            self.calls[slot] = 0
+            self.errors[slot] = 0
+            self.latency_total[slot] = 0.0
+            self.latency_min[slot] = INFINITY
+            self.latency_max[slot] = 0.0
+        return slot
+
+    def record_latency(self, minute: int, latency: float) -> None:
+        slot = self._slot(minute)
+        self.calls[slot] += 1
+        self.latency_total[slot] += latency
+        if latency < self.latency_min[slot]:
+            self.latency_min[slot] = latency
+        if latency > self.latency_max[slot]:
+            self.latency_max[slot] = latency
+
+    def record_error(self, minute: int) -> None:
+        self.errors[self._slot(minute)] += 1
+
+    def slots(self, current_minute: int) -> list[int]:
+        """slots of the minutes still inside the window ending at current_minute, oldest first"""
+        first_minute = current_minute - self.capacity
+        return sorted((slot for slot, minute in enumerate(self.minutes) if first_minute < minute <= current_minute),
+                      key=self.minutes.__getitem__)
+
+    def data_point(self, slot: int) -> dict[str, str | int | float | None]:
+        calls = self.calls[slot]
+        return dict(calls=calls, errors=self.errors[slot],
+                    latency_avg=self.latency_total[slot] / calls if calls else None,
+                    latency_min=self.latency_min[slot] if calls else None,
+                    latency_max=self.latency_max[slot] if calls else None)
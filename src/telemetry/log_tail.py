@@ -0,0 +1,191 @@
+"""
+    **LogTail**
+        follows the service log file the way tail -F does, reading a chunk at a time on a worker thread,
+        starting either at a byte offset or at the last few lines of the file, a rotated or truncated log file
+        is detected from its inode and size and reopened from the start
+
+        every line is returned together with the byte offset after it, so a client which reconnects
+        with that offset carries on where it stopped
+"""
+import asyncio
+import json
+import logging
+import os
+from typing import AsyncIterator, NamedTuple
+
+CHUNK_SIZE = 64 * 1024
+# longer lines are cut, the rest of the line is skipped and the cut line is returned once its end is read
+MAX_LINE_LENGTH = 64 * 1024
+MAX_TAIL_LINES = 10_000
+
+
+class LogLine(NamedTuple):
+    offset: int
+    text: str
+
+
+class LogFilter:
+    """
+    **LogFilter**
+        keeps records at or above level from loggers whose name starts with logger_name,
+        lines which do not start a record, such as tracebacks, follow the decision for their record
+    """
+
+    def __init__(self, level: str | None = None, logger_name: str | None = None):
+        self.level: int = logging.getLevelName(level.upper()) if level else logging.NOTSET
+        if not isinstance(self.level, int):
+            raise ValueError(f"Unknown log level {level}")
+        self.logger_name: str | None = logger_name
+        self._keep_record: bool = True
+
+    @property
+    def active(self) -> bool:
+        return self.level > logging.NOTSET or bool(self.logger_name)
+
+    @staticmethod
+    def parse(text: str) -> tuple[str, int] | None:
+        """
+            (logger name, level) of a JSON line written by AppLogger or a line in the earlier
+            asctime - name - level - message format, None for lines which do not start a record
+        """
+        if text.startswith('{'):
+            try:
+                entry = json.loads(text)
+                name, level = entry['logger'], logging.getLevelName(entry['level'])
+            except (ValueError, KeyError, TypeError):
+                return None
+        else:
+            parts = text.split(' - ', 3)
+            if len(parts) < 4:
+                return None
+            name, level = parts[1], logging.getLevelName(parts[2])
+        return (name, level) if isinstance(level, int) else None
+
+    def keep(self, text: str) -> bool:
+        if not self.active:
+            return True
+        record = self.parse(text)
+        if record is not None:
+            name, level = record
+            self._keep_record = level >= self.level and (not self.logger_name or name.startswith(self.logger_name))
+        return self._keep_record
+
+
+class LogTail:
+    def __init__(self, filename: str, poll_interval: float = 0.5):
+        self.filename: str = filename
+        self.poll_interval: float = poll_interval
+        self._file = None
+        self._inode: int | None = None
+        self._position: int = 0
+        self._pending: bytes = b''
+        # first MAX_LINE_LENGTH bytes of an oversized line whose end has not been read yet
+        self._truncated: str | None = None
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _open(self, offset: int | None, tail_lines: int) -> None:
+        self._file = open(self.filename, 'rb')
+        self._inode = os.fstat(self._file.fileno()).st_ino
+        size = os.fstat(self._file.fileno()).st_size
+        if offset is not None:
+            self._position = min(max(offset, 0), size)
+        else:
+            self._position = self._tail_offset(size=size, tail_lines=min(tail_lines, MAX_TAIL_LINES))
+        self._file.seek(self._position)
+
+    def _tail_offset(self, size: int, tail_lines: int) -> int:
+        """offset of the start of the last tail_lines lines, read backwards one chunk at a time"""
+        if tail_lines <= 0:
+            return size
+        position = size
+        newlines = 0
+        while position > 0:
+            read_size = min(CHUNK_SIZE, position)
+            position -= read_size
+            self._file.seek(position)
+            chunk = self._file.read(read_size)
+            if position + read_size == size and chunk.endswith(b'\n'):
+                chunk = chunk[:-1]
+            index = len(chunk)
+            while True:
+                index = chunk.rfind(b'\n', 0, index)
+                if index < 0:
+                    break
+                newlines += 1
+                if newlines >= tail_lines:
+                    return position + index + 1
+        return 0
+
+    def _reopen_if_rotated(self) -> None:
+        try:
+            stat = os.stat(self.filename)
+        except FileNotFoundError:
+            return
+        if stat.st_ino != self._inode or stat.st_size < self._position:
+            self.close()
+            self._pending, self._truncated = b'', None
+            self._open(offset=0, tail_lines=0)
+
+    def _read_lines(self) -> list[LogLine] | None:
+        """complete lines in the next CHUNK_SIZE bytes, None at the end of the file"""
+        chunk = self._file.read(CHUNK_SIZE)
+        if not chunk:
+            self._reopen_if_rotated()
+            return None
+
+        lines: list[LogLine] = []
+        start = self._position - len(self._pending)
+        data = self._pending + chunk
+        self._position += len(chunk)
+        line_start = 0
+        while True:
+            end = data.find(b'\n', line_start)
+            if end < 0:
+                break
+            if self._truncated is not None:
+                # the offset after the newline, a client resuming from it starts at the next line
+                lines.append(LogLine(offset=start + end + 1, text=self._truncated))
+                self._truncated = None
+            else:
+                text = data[line_start:min(end, line_start + MAX_LINE_LENGTH)]
+                lines.append(LogLine(offset=start + end + 1, text=text.decode('utf-8', errors='replace').rstrip('\r')))
+            line_start = end + 1
+
+        self._pending = data[line_start:]
+        if len(self._pending) > MAX_LINE_LENGTH:
+            if self._truncated is None:
+                self._truncated = self._pending[:MAX_LINE_LENGTH].decode('utf-8', errors='replace')
+            self._pending = b''
+        return lines
+
+    async def follow(self, offset: int | None = None, tail_lines: int = 100, follow: bool = True,
+                     log_filter: LogFilter | None = None) -> AsyncIterator[LogLine]:
+        """
+            **follow**
+                lines of the log file from offset, or the last tail_lines lines when offset is None,
+                waits for new lines at the end of the file when follow is True
+        :param offset: byte offset to start at, the offset of a line returned earlier
+        :param tail_lines:
+        :param follow:
+        :param log_filter:
+        :return:
+        """
+        log_filter = log_filter or LogFilter()
+        await asyncio.to_thread(self._open, offset, tail_lines)
+        try:
+            while True:
+                lines = await asyncio.to_thread(self._read_lines)
+                if lines is None:
+                    if not follow:
+                        return
+                    await asyncio.sleep(self.poll_interval)
+                    continue
+                for line in lines:
+                    if log_filter.keep(line.text):
+                        yield line
+        finally:
+            self.close()
@@ -0,0 +1,135 @@
+"""
+    **LoopLagMonitor**
+        measures how late the event loop wakes a task sleeping for interval seconds, every measurement goes
+        into the loop lag histogram and the per minute latency sketches, a lag shows how long the loop was kept
+        busy by code which does not await, parsing, feed parsing, cached requests or database commits on the loop
+
+        a watchdog thread checks the heartbeat of the monitoring task every interval, once the loop is late by more
+        than threshold it takes the stack of the loop thread, which is the stack of the code blocking the loop,
+        the stall is recorded with its full lag when the loop wakes the monitoring task again
+"""
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+
+from src.config import config_instance
+from src.telemetry.metrics import loop_lag, loop_stalls
+from src.telemetry.sketch import LatencySketches
+from src.utils.my_logger import init_logger
+
+MAX_STACK_DEPTH = 64
+
+lag_logger = init_logger('loop_lag_logger')
+
+
+class Stall:
+    __slots__ = ('start_time', 'lag', 'task', 'stack')
+
+    def __init__(self, task: str | None, stack: list[str]):
+        self.start_time: float = time.time()
+        self.lag: float | None = None
+        self.task: str | None = task
+        self.stack: list[str] = stack
+
+    def to_dict(self) -> dict:
+        return dict(start_time=self.start_time, lag=self.lag, task=self.task, stack=self.stack)
+
+
+class LoopLagMonitor:
+    def __init__(self, interval: float, threshold: float, max_stalls: int, sketch_minutes: int,
+                 relative_accuracy: float):
+        self.interval: float = interval
+        self.threshold: float = threshold
+        self.stalls: deque[Stall] = deque(maxlen=max_stalls)
+        self.sketches: LatencySketches = LatencySketches(capacity=sketch_minutes,
+                                                         relative_accuracy=relative_accuracy)
+        self.max_lag: float = 0.0
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread_id: int | None = None
+        # perf_counter time the monitoring task is due to be woken
+        self._due: float | None = None
+        self._stall: Stall | None = None
+        self._task: asyncio.Task | None = None
+        self._watchdog: threading.Thread | None = None
+        self._stop: threading.Event = threading.Event()
+
+    def start(self) -> None:
+        """starts the monitoring task on the running loop and the watchdog thread"""
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._monitor(), name='loop-lag-monitor')
+        self._watchdog = threading.Thread(target=self._watch, name='loop-lag-watchdog', daemon=True)
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._watchdog is not None:
+            await asyncio.to_thread(self._watchdog.join)
+            self._watchdog = None
+
+    async def _monitor(self) -> None:
+        while True:
+            self._due = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            self.record(lag=max(time.perf_counter() - self._due, 0.0))
+
+    def record(self, lag: float) -> None:
+        loop_lag.observe(lag)
+        self.sketches.add(int(time.time() // 60), lag)
+        self.max_lag = max(self.max_lag, lag)
+        stall, self._stall = self._stall, None
+        if stall is not None:
+            stall.lag = lag
+            self.stalls.append(stall)
+            loop_stalls.inc()
+            blocked_at = stall.stack[-1] if stall.stack else None
+            lag_logger.warning(f"Event loop blocked for {lag:.3f}s - Task: {stall.task} , At: {blocked_at}")
+
+    def _watch(self) -> None:
+        captured_due: float | None = None
+        while not self._stop.wait(self.interval):
+            due = self._due
+            if due is None or due == captured_due or time.perf_counter() - due < self.threshold:
+                continue
+            # the loop is still blocked, only one stack is taken per stall
+            captured_due = due
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is not None:
+                self._stall = Stall(task=self._current_task(), stack=self._format_stack(frame))
+
+    def _current_task(self) -> str | None:
+        try:
+            task = asyncio.current_task(self._loop)
+        except RuntimeError:
+            return None
+        if task is None:
+            return None
+        return f"{task.get_name()} ({getattr(task.get_coro(), '__qualname__', '')})"
+
+    @staticmethod
+    def _format_stack(frame) -> list[str]:
+        """the innermost MAX_STACK_DEPTH frames, outermost first"""
+        return [f"{entry.filename}:{entry.lineno} in {entry.name}" + (f": {entry.line}" if entry.line else '')
+                for entry in traceback.extract_stack(frame, limit=MAX_STACK_DEPTH)]
+
+    def dict(self, limit: int) -> dict:
+        """lag percentiles and the latest limit stalls, latest first"""
+        return dict(interval=self.interval, threshold=self.threshold, max_lag=self.max_lag,
+                    lag_percentiles=self.sketches.percentiles(current_minute=int(time.time() // 60)),
+                    stalls=[stall.to_dict() for stall in list(self.stalls)[::-1][:limit]])
+
+
+_loop_lag_settings = config_instance().LOOP_LAG_SETTINGS
+_telemetry_settings = config_instance().TELEMETRY_SETTINGS
+loop_lag_monitor: LoopLagMonitor = LoopLagMonitor(interval=_loop_lag_settings.INTERVAL,
+                                                  threshold=_loop_lag_settings.THRESHOLD,
+                                                  max_stalls=_loop_lag_settings.MAX_STALLS,
+                                                  sketch_minutes=_telemetry_settings.SKETCH_MINUTES,
+                                                  relative_accuracy=_telemetry_settings.SKETCH_RELATIVE_ACCURACY)
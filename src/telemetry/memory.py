@@ -0,0 +1,175 @@
+"""
+    **memory**
+        size estimates of the long lived structures of the service, the data sink buffers, the telemetry series
+        and the requests cache, every structure registers a callback with memory_registry in the module which
+        owns it, large collections are estimated from the deep size of a sample of their items
+
+        AllocationSnapshots wraps tracemalloc, snapshots taken while tracing is on are kept by id and any two of
+        them are compared for the allocation sites which grew the most in between
+"""
+import itertools
+import resource
+import sys
+import time
+import tracemalloc
+import types
+from collections import OrderedDict, deque
+from typing import Callable, Collection
+
+from src.config import config_instance
+
+# an object graph is walked up to this many objects
+MAX_OBJECTS = 100_000
+# shared by every instance, never counted as part of a structure
+SKIPPED_TYPES = (type, types.ModuleType, types.FunctionType, types.MethodType, types.BuiltinFunctionType,
+                 types.CodeType, types.FrameType)
+KEY_TYPES = ('lineno', 'filename', 'traceback')
+
+sizeType = dict[str, int | bool]
+
+
+def deep_sizeof(obj, seen: set[int] | None = None) -> int:
+    """bytes held by obj and every object reachable from it through containers, __dict__ and __slots__"""
+    seen = set() if seen is None else seen
+    total = 0
+    stack = [obj]
+    while stack and len(seen) < MAX_OBJECTS:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, SKIPPED_TYPES):
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+            stack.extend(obj)
+        if hasattr(obj, '__dict__'):
+            stack.append(obj.__dict__)
+        for cls in type(obj).__mro__:
+            slots = cls.__dict__.get('__slots__', ())
+            for slot in (slots,) if isinstance(slots, str) else slots:
+                if slot not in ('__dict__', '__weakref__') and hasattr(obj, slot):
+                    stack.append(getattr(obj, slot))
+    return total
+
+
+def collection_size(collection: Collection, sample_size: int) -> sizeType:
+    """
+        **collection_size**
+            items in the collection and its estimated size in bytes, the deep size of the first sample_size
+            items, keys and values for a dict, extrapolated to the whole collection
+    :param collection:
+    :param sample_size:
+    :return:
+    """
+    total_items = len(collection)
+    sample = list(itertools.islice(collection, sample_size))
+    seen: set[int] = set()
+    if isinstance(collection, dict):
+        sampled_bytes = sum(deep_sizeof(key, seen) + deep_sizeof(collection[key], seen) for key in sample)
+    else:
+        sampled_bytes = sum(deep_sizeof(item, seen) for item in sample)
+    estimated_bytes = sys.getsizeof(collection) + (sampled_bytes * total_items // len(sample) if sample else 0)
+    return dict(items=total_items, bytes=estimated_bytes, estimated=len(sample) < total_items)
+
+
+class MemoryRegistry:
+    def __init__(self, sample_size: int):
+        self.sample_size: int = sample_size
+        self._structures: dict[str, Callable[[], sizeType]] = {}
+
+    def register(self, name: str, callback: Callable[[], sizeType]) -> None:
+        """callback returns the items and bytes held by the structure, collection_size for collections"""
+        if name in self._structures:
+            raise ValueError(f"Structure {name} is already registered")
+        self._structures[name] = callback
+
+    def collection(self, name: str, collection: Callable[[], Collection]) -> None:
+        """registers a collection which is estimated with collection_size"""
+        self.register(name, lambda: collection_size(collection(), sample_size=self.sample_size))
+
+    def report(self) -> dict[str, sizeType | dict[str, str]]:
+        """
+            **report**
+                the size of every registered structure, runs on the event loop so that the collections
+                are not modified while they are sampled
+        :return:
+        """
+        structures = {}
+        for name, callback in self._structures.items():
+            try:
+                structures[name] = callback()
+            except Exception as e:
+                structures[name] = dict(error=str(e))
+        return dict(max_rss_bytes=resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024, structures=structures)
+
+
+class AllocationSnapshots:
+    """
+    **AllocationSnapshots**
+        tracemalloc snapshots of the process, only the latest max_snapshots are kept because every snapshot
+        holds a copy of all the traced allocations
+    """
+
+    def __init__(self, max_snapshots: int):
+        self.max_snapshots: int = max_snapshots
+        self.snapshots: OrderedDict[int, tuple[float, tracemalloc.Snapshot]] = OrderedDict()
+        self._next_id: int = 1
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self, frames: int) -> None:
+        if not self.tracing:
+            tracemalloc.start(frames)
+
+    def stop(self) -> None:
+        """stops tracing and drops the snapshots"""
+        tracemalloc.stop()
+        self.snapshots.clear()
+
+    def status(self) -> dict:
+        current, peak = tracemalloc.get_traced_memory()
+        return dict(tracing=self.tracing, frames=tracemalloc.get_traceback_limit(), traced_bytes=current,
+                    peak_traced_bytes=peak, tracemalloc_bytes=tracemalloc.get_tracemalloc_memory(),
+                    snapshots=[dict(snapshot_id=snapshot_id, taken=taken)
+                               for snapshot_id, (taken, _) in self.snapshots.items()])
+
+    def take(self) -> int:
+        """takes a snapshot and returns its id"""
+        if not self.tracing:
+            raise RuntimeError("tracemalloc is not tracing, start it first")
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>')))
+        snapshot_id, self._next_id = self._next_id, self._next_id + 1
+        self.snapshots[snapshot_id] = (time.time(), snapshot)
+        while len(self.snapshots) > self.max_snapshots:
+            self.snapshots.popitem(last=False)
+        return snapshot_id
+
+    def compare(self, first_id: int, second_id: int, key_type: str, limit: int) -> list[dict]:
+        """
+            **compare**
+                allocation sites ordered by how much their allocations grew from the first snapshot to the second
+        :param first_id: the earlier snapshot
+        :param second_id: the later snapshot
+        :param key_type: lineno, filename or traceback
+        :param limit: sites returned
+        :return:
+        """
+        if key_type not in KEY_TYPES:
+            raise ValueError(f"key_type must be one of {', '.join(KEY_TYPES)}")
+        _, first = self.snapshots[first_id]
+        _, second = self.snapshots[second_id]
+        return [dict(traceback=[f"{frame.filename}:{frame.lineno}" for frame in stat.traceback],
+                     size_diff=stat.size_diff, size=stat.size, count_diff=stat.count_diff, count=stat.count)
+                for stat in second.compare_to(first, key_type=key_type)[:limit]]
+
+
+_memory_settings = config_instance().MEMORY_SETTINGS
+memory_registry: MemoryRegistry = MemoryRegistry(sample_size=_memory_settings.SAMPLE_SIZE)
+allocation_snapshots: AllocationSnapshots = AllocationSnapshots(max_snapshots=_memory_settings.MAX_SNAPSHOTS)
@@ -0,0 +1,217 @@
+"""
+    **MetricsRegistry**
+        preaggregated counters, histograms and gauges rendered in the OpenMetrics text format by /_admin/metrics
+
+        counters and histograms are updated in place as events happen, from the event loop and from worker
+        threads, every update takes the lock of its labelled child, gauges are read from a callback when the metrics
+        are rendered, so a scrape only formats numbers which are already aggregated
+"""
+import threading
+from bisect import bisect_left
+from typing import Callable
+
+CONTENT_TYPE = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+LOOP_LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+labelsType = tuple[tuple[str, str], ...]
+
+
+def escape_label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_labels(labels: labelsType) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{escape_label(value)}"' for name, value in labels) + '}'
+
+
+def format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class CounterChild:
+    """counter of one set of labels, hot paths keep a child instead of passing labels on every update"""
+    __slots__ = ('value', '_lock')
+
+    def __init__(self):
+        self.value: float = 0
+        self._lock: threading.Lock = threading.Lock()
+
+    def inc(self, amount: float = 1) -> None:
+        with self._lock:
+            self.value += amount
+
+
+class Counter:
+    metric_type = 'counter'
+
+    def __init__(self, name: str, documentation: str):
+        self.name: str = name
+        self.documentation: str = documentation
+        self.children: dict[labelsType, CounterChild] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+    def labels(self, **labels: str) -> CounterChild:
+        key = tuple(labels.items())
+        child = self.children.get(key)
+        if child is None:
+            with self._lock:
+                child = self.children.setdefault(key, CounterChild())
+        return child
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        self.labels(**labels).inc(amount)
+
+    def value(self, **labels: str) -> float:
+        return self.labels(**labels).value
+
+    def samples(self) -> list[str]:
+        return [f'{self.name}_total{format_labels(labels)} {format_value(child.value)}'
+                for labels, child in list(self.children.items())]
+
+
+class HistogramChild:
+    """observations in each bucket (not cumulative) and their sum for one set of labels"""
+    __slots__ = ('buckets', 'counts', 'total', '_lock')
+
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets: tuple[float, ...] = buckets
+        self.counts: list[int] = [0] * len(buckets)
+        self.total: float = 0.0
+        self._lock: threading.Lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.total += value
+
+    def snapshot(self) -> tuple[list[int], float]:
+        with self._lock:
+            return list(self.counts), self.total
+
+
+class Histogram:
+    metric_type = 'histogram'
+
+    def __init__(self, name: str, documentation: str, buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        self.name: str = name
+        self.documentation: str = documentation
+        self.buckets: tuple[float, ...] = tuple(buckets) + (float('inf'),)
+        self.children: dict[labelsType, HistogramChild] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+    def labels(self, **labels: str) -> HistogramChild:
+        key = tuple(labels.items())
+        child = self.children.get(key)
+        if child is None:
+            with self._lock:
+                child = self.children.setdefault(key, HistogramChild(buckets=self.buckets))
+        return child
+
+    def observe(self, value: float, **labels: str) -> None:
+        self.labels(**labels).observe(value)
+
+    def samples(self) -> list[str]:
+        samples: list[str] = []
+        for labels, child in list(self.children.items()):
+            counts, total = child.snapshot()
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                samples.append(f'{self.name}_bucket{format_labels(labels + (("le", format_value(bound)),))} '
+                               f'{cumulative}')
+            samples.append(f'{self.name}_count{format_labels(labels)} {cumulative}')
+            samples.append(f'{self.name}_sum{format_labels(labels)} {format_value(total)}')
+        return samples
+
+
+class Gauge:
+    metric_type = 'gauge'
+    suffix = ''
+
+    def __init__(self, name: str, documentation: str, callback: Callable[[], dict[labelsType, float]]):
+        self.name: str = name
+        self.documentation: str = documentation
+        self.callback: Callable[[], dict[labelsType, float]] = callback
+
+    def samples(self) -> list[str]:
+        return [f'{self.name}{self.suffix}{format_labels(labels)} {format_value(value)}'
+                for labels, value in self.callback().items()]
+
+
+class CounterFunction(Gauge):
+    """counter whose values are read from a callback, for totals which are already counted elsewhere"""
+    metric_type = 'counter'
+    suffix = '_total'
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: dict[str, Counter | Histogram | Gauge | CounterFunction] = {}
+
+    def _register(self, metric: Counter | Histogram | Gauge | CounterFunction):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str) -> Counter:
+        return self._register(Counter(name=name, documentation=documentation))
+
+    def histogram(self, name: str, documentation: str, buckets: tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name=name, documentation=documentation, buckets=buckets))
+
+    def gauge(self, name: str, documentation: str, callback: Callable[[], dict[labelsType, float]]) -> Gauge:
+        """callback returns the current value for every set of labels, () for a gauge without labels"""
+        return self._register(Gauge(name=name, documentation=documentation, callback=callback))
+
+    def counter_function(self, name: str, documentation: str,
+                         callback: Callable[[], dict[labelsType, float]]) -> CounterFunction:
+        return self._register(CounterFunction(name=name, documentation=documentation, callback=callback))
+
+    def render(self) -> str:
+        """
+            **render**
+                every registered metric in the OpenMetrics text format
+        :return:
+        """
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            try:
+                samples = metric.samples()
+            except Exception:
+                # a gauge whose source is unavailable is left out of this scrape
+                continue
+            lines.append(f'# TYPE {metric.name} {metric.metric_type}')
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.extend(samples)
+        lines.append('# EOF')
+        return '\n'.join(lines) + '\n'
+
+
+metrics_registry: MetricsRegistry = MetricsRegistry()
+
+method_errors = metrics_registry.counter('news_method_errors',
+                                         "Errors raised by methods decorated with capture_telemetry")
+method_latency = metrics_registry.histogram('news_method_latency_seconds',
+                                            "Latency of methods decorated with capture_telemetry")
+# every call is observed once by the latency histogram, calls are its counts
+method_calls = metrics_registry.counter_function(
+    'news_method_calls', "Calls of methods decorated with capture_telemetry",
+    callback=lambda: {labels: sum(child.counts) for labels, child in list(method_latency.children.items())})
+proxy_requests = metrics_registry.counter('news_proxy_requests',
+                                          "Requests made through the cloudflare proxy by route and outcome")
+articles_received = metrics_registry.counter('news_articles_scraped',
+                                             "Articles handed to the data sink by the scrapers")
+articles_deduplicated = metrics_registry.counter('news_articles_deduplicated',
+                                                 "Scraped articles dropped because they were already seen")
+articles_stored = metrics_registry.counter('news_articles_stored', "Articles committed to the database")
+loop_lag = metrics_registry.histogram('news_event_loop_lag_seconds',
+                                     "Delay between the time a sleeping task was due and the time the loop woke it",
+                                     buckets=LOOP_LAG_BUCKETS)
+loop_stalls = metrics_registry.counter('news_event_loop_stalls', "Event loop lags over the stall threshold")
@@ -0,0 +1,169 @@
+"""
+    **SamplingProfiler**
+        statistical profiler for the running process, a daemon thread wakes every interval and records the
+        stack of every other thread from sys._current_frames, the event loop thread and the executor threads
+        running database writes alike, profiled code is never instrumented so the cost is one stack walk per
+        thread per sample, a profile runs for a fixed duration or is armed to cover the next scrape cycle,
+        from the start of the scrape until the data sink has stored its articles
+
+        profiles are returned as collapsed stacks, one "thread;outer;...;inner count" line per distinct stack
+        as read by flamegraph.pl and speedscope, or as a pstats file for pstats, snakeviz and similar tools
+"""
+import marshal
+import sys
+import threading
+import time
+from collections import Counter
+
+MAX_DURATION = 600.0
+MIN_INTERVAL = 0.001
+MAX_STACK_DEPTH = 128
+
+frameType = tuple[str, int, str]
+
+
+class Profile:
+    """
+        samples of one profiling run, stacks run from the outermost frame to the innermost,
+        the sampler adds to stacks under the lock so a running profile is read from a copy
+    """
+
+    def __init__(self, interval: float):
+        self.interval: float = interval
+        self.started: float = time.time()
+        self.duration: float = 0.0
+        self.total_samples: int = 0
+        self.stacks: Counter[tuple[str, tuple[frameType, ...]]] = Counter()
+        self.lock: threading.Lock = threading.Lock()
+
+    def add_samples(self, stacks: list[tuple[str, tuple[frameType, ...]]]) -> None:
+        with self.lock:
+            self.stacks.update(stacks)
+            self.total_samples += 1
+
+    def copy_stacks(self) -> Counter[tuple[str, tuple[frameType, ...]]]:
+        with self.lock:
+            return self.stacks.copy()
+
+    def summary(self) -> dict:
+        return dict(started=self.started, duration=self.duration, interval=self.interval,
+                    total_samples=self.total_samples, distinct_stacks=len(self.stacks))
+
+    def collapsed(self) -> str:
+        lines = []
+        for (thread_name, stack), count in self.copy_stacks().most_common():
+            frames = ';'.join(f"{name} ({filename}:{line})" for filename, line, name in stack)
+            lines.append(f"{thread_name};{frames} {count}" if frames else f"{thread_name} {count}")
+        return '\n'.join(lines) + '\n'
+
+    def pstats(self) -> bytes:
+        """
+            **pstats**
+                the profile in the marshalled format pstats.Stats loads, every sample counts as one call
+                taking interval seconds, in its innermost function (own time) and in every caller (cumulative time)
+        :return:
+        """
+        own: Counter[frameType] = Counter()
+        cumulative: Counter[frameType] = Counter()
+        callers: dict[frameType, Counter[frameType]] = {}
+        for (_, stack), count in self.copy_stacks().items():
+            if not stack:
+                continue
+            own[stack[-1]] += count
+            for frame in set(stack):
+                cumulative[frame] += count
+            for caller, callee in set(zip(stack, stack[1:])):
+                callers.setdefault(callee, Counter())[caller] += count
+
+        stats = {}
+        for frame, total in cumulative.items():
+            stats[frame] = (total, total, own[frame] * self.interval, total * self.interval,
+                            {caller: (calls, calls, 0.0, calls * self.interval)
+                             for caller, calls in callers.get(frame, Counter()).items()})
+        return marshal.dumps(stats)
+
+
+class SamplingProfiler:
+    def __init__(self):
+        self.profile: Profile | None = None
+        # sampling interval of the profile armed for the next scrape cycle
+        self.armed_interval: float | None = None
+        self._cycle_profile: bool = False
+        self._thread: threading.Thread | None = None
+        self._stop: threading.Event = threading.Event()
+        self._frames: dict = {}
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, duration: float, interval: float) -> Profile:
+        """
+            **start**
+                samples every thread every interval seconds for duration seconds
+        :param duration: seconds, at most MAX_DURATION
+        :param interval: seconds between samples, at least MIN_INTERVAL
+        :return: the profile being recorded
+        """
+        if self.running:
+            raise RuntimeError("The profiler is already running")
+        self.profile = Profile(interval=max(interval, MIN_INTERVAL))
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(self.profile, min(duration, MAX_DURATION)),
+                                        name='sampling-profiler', daemon=True)
+        self._thread.start()
+        return self.profile
+
+    def stop(self) -> Profile | None:
+        """stops a running profile and waits for the sampler to finish"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.armed_interval = None
+        self._cycle_profile = False
+        return self.profile
+
+    def arm_cycle(self, interval: float) -> None:
+        """profiles the next scrape cycle, capped at MAX_DURATION"""
+        if self.running:
+            raise RuntimeError("The profiler is already running")
+        self.armed_interval = interval
+
+    def cycle_started(self) -> None:
+        if self.armed_interval is not None and not self.running:
+            self.start(duration=MAX_DURATION, interval=self.armed_interval)
+            self.armed_interval = None
+            self._cycle_profile = True
+
+    def cycle_finished(self) -> None:
+        if self._cycle_profile:
+            self.stop()
+
+    def _run(self, profile: Profile, duration: float) -> None:
+        own_id = threading.get_ident()
+        started = time.perf_counter()
+        deadline = started + duration
+        while not self._stop.wait(profile.interval):
+            thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+            profile.add_samples([(thread_names.get(thread_id, str(thread_id)), self._stack(frame))
+                                 for thread_id, frame in sys._current_frames().items() if thread_id != own_id])
+            if time.perf_counter() >= deadline:
+                break
+        profile.duration = time.perf_counter() - started
+        self._frames.clear()
+
+    def _stack(self, frame) -> tuple[frameType, ...]:
+        stack = []
+        while frame is not None and len(stack) < MAX_STACK_DEPTH:
+            code = frame.f_code
+            key = self._frames.get(code)
+            if key is None:
+                key = self._frames[code] = (code.co_filename, code.co_firstlineno, code.co_name)
+            stack.append(key)
+            frame = frame.f_back
+        stack.reverse()
+        return tuple(stack)
+
+
+sampling_profiler: SamplingProfiler = SamplingProfiler()
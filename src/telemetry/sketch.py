@@ -0,0 +1,124 @@
+"""
+    **DDSketch**
+        streaming quantile sketch with relative error guarantees, every value is counted in the bin
+        ceil(log(value) / log(gamma)), so a quantile read back from the bins is within relative_accuracy
+        of the true value, sketches with the same accuracy merge by adding their bins
+
+        LatencySketches keeps one sketch per minute for the last capacity minutes of a method,
+        percentiles over any window up to capacity minutes are read by merging the minutes in the window
+"""
+import math
+
+# latencies at or below this are counted as zero
+MIN_INDEXABLE_VALUE = 1e-9
+WINDOWS_MINUTES = (1, 5, 60)
+QUANTILES = (('p50', 0.5), ('p90', 0.9), ('p99', 0.99))
+
+
+class DDSketch:
+    __slots__ = ('relative_accuracy', 'max_bins', 'gamma', 'log_gamma', 'bins', 'zero_count', 'count', 'min', 'max')
+
+    def __init__(self, relative_accuracy: float = 0.01, max_bins: int = 2048):
+        self.relative_accuracy: float = relative_accuracy
+        self.max_bins: int = max_bins
+        self.gamma: float = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma: float = math.log(self.gamma)
+        self.bins: dict[int, int] = {}
+        self.zero_count: int = 0
+        self.count: int = 0
+        self.min: float = math.inf
+        self.max: float = 0.0
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        if value <= MIN_INDEXABLE_VALUE:
+            self.zero_count += 1
+            return
+        key = math.ceil(math.log(value) / self.log_gamma)
+        self.bins[key] = self.bins.get(key, 0) + 1
+        if len(self.bins) > self.max_bins:
+            self._collapse()
+
+    def merge(self, other: 'DDSketch') -> None:
+        if other.gamma != self.gamma:
+            raise ValueError("Only sketches with the same relative accuracy can be merged")
+        for key, count in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        while len(self.bins) > self.max_bins:
+            self._collapse()
+
+    def _collapse(self) -> None:
+        """folds the lowest bin into the next one, accuracy is only lost on the smallest values"""
+        lowest, second = sorted(self.bins)[:2]
+        self.bins[second] += self.bins.pop(lowest)
+
+    def quantile(self, q: float) -> float | None:
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        if rank < self.zero_count:
+            return 0.0
+
+        cumulative = self.zero_count
+        for key in sorted(self.bins):
+            cumulative += self.bins[key]
+            if cumulative > rank:
+                value = 2 * self.gamma ** key / (self.gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+
+class LatencySketches:
+    """
+    **LatencySketches**
+        per minute sketches of a single method, indexed by minute % capacity like MinuteSeries
+    """
+    __slots__ = ('capacity', 'relative_accuracy', 'minutes', 'sketches')
+
+    def __init__(self, capacity: int, relative_accuracy: float):
+        self.capacity: int = capacity
+        self.relative_accuracy: float = relative_accuracy
+        self.minutes: list[int] = [-1] * capacity
+        self.sketches: list[DDSketch | None] = [None] * capacity
+
+    def add(self, minute: int, latency: float) -> None:
+        slot = minute % self.capacity
+        if self.minutes[slot] != minute:
+            if self.minutes[slot] > minute:
+                return
+            self.minutes[slot] = minute
+            self.sketches[slot] = DDSketch(relative_accuracy=self.relative_accuracy)
+        self.sketches[slot].add(latency)
+
+    def window(self, current_minute: int, window_minutes: int) -> DDSketch:
+        """sketch of every latency recorded in the last window_minutes minutes"""
+        merged = DDSketch(relative_accuracy=self.relative_accuracy)
+        first_minute = current_minute - min(window_minutes, self.capacity)
+        for minute, sketch in zip(self.minutes, self.sketches):
+            if first_minute < minute <= current_minute:
+                merged.merge(sketch)
+        return merged
+
+    def percentiles(self, current_minute: int) -> dict[str, dict[str, int | float | None]]:
+        """
+            **percentiles**
+                p50, p90, p99 and max latency over each of WINDOWS_MINUTES that fits in capacity
+        :param current_minute:
+        :return:
+        """
+        percentiles = {}
+        for window_minutes in WINDOWS_MINUTES:
+            if window_minutes > self.capacity:
+                continue
+            sketch = self.window(current_minute=current_minute, window_minutes=window_minutes)
+            percentiles[f'{window_minutes}m'] = dict(count=sketch.count, max=sketch.max if sketch.count else None,
+                                                     **{name: sketch.quantile(q) for name, q in QUANTILES})
+        return percentiles
@@ -0,0 +1,185 @@
+"""
+    **Tracer**
+        lightweight tracing of scrape cycles, a trace is opened for every ticker and for every batch the
+        data sink stores, spans opened inside a trace nest under the span which is current in their context,
+        the current span is kept in a ContextVar so it follows asyncio tasks and asyncio.to_thread calls
+
+        outside of a trace spans cost a single ContextVar lookup, finished traces are kept for the running
+        cycle and appended to a rotating JSON lines file when the cycle ends
+"""
+import asyncio
+import functools
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from logging.handlers import RotatingFileHandler
+from typing import Iterator
+
+from src.config import config_instance
+from src.utils import create_id
+
+MAX_SPANS_PER_TRACE = 512
+
+
+class Span:
+    __slots__ = ('trace', 'span_id', 'parent_id', 'name', 'attributes', 'start_time', 'started', 'duration', 'error')
+
+    def __init__(self, trace: 'Trace', name: str, parent_id: str | None, attributes: dict):
+        self.trace: Trace = trace
+        self.span_id: str = create_id(size=8)
+        self.parent_id: str | None = parent_id
+        self.name: str = name
+        self.attributes: dict = attributes
+        self.start_time: float = time.time()
+        self.started: float = time.perf_counter()
+        self.duration: float | None = None
+        self.error: str | None = None
+
+    def finish(self, error: BaseException | None = None) -> None:
+        self.duration = time.perf_counter() - self.started
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+
+    def to_dict(self) -> dict:
+        return dict(span_id=self.span_id, parent_id=self.parent_id, name=self.name, attributes=self.attributes,
+                    start_time=self.start_time, offset=self.started - self.trace.root.started,
+                    duration=self.duration, error=self.error)
+
+
+class Trace:
+    __slots__ = ('trace_id', 'root', 'spans', 'dropped_spans')
+
+    def __init__(self, name: str, attributes: dict):
+        self.trace_id: str = create_id(size=16)
+        self.root: Span = Span(trace=self, name=name, parent_id=None, attributes=attributes)
+        self.spans: list[Span] = [self.root]
+        self.dropped_spans: int = 0
+
+    @property
+    def duration(self) -> float:
+        return self.root.duration if self.root.duration is not None else time.perf_counter() - self.root.started
+
+    def to_dict(self) -> dict:
+        return dict(trace_id=self.trace_id, name=self.root.name, attributes=self.root.attributes,
+                    start_time=self.root.start_time, duration=self.duration, error=self.root.error,
+                    dropped_spans=self.dropped_spans, spans=[span.to_dict() for span in self.spans])
+
+
+current_span: ContextVar[Span | None] = ContextVar('current_span', default=None)
+
+
+class Tracer:
+    """
+    **Tracer**
+        traces of the running cycle are kept in memory until the next cycle starts,
+        export appends the traces finished since the last export to the trace file
+    """
+
+    def __init__(self, filename: str, max_bytes: int, backup_count: int):
+        self.filename: str = filename
+        self.max_bytes: int = max_bytes
+        self.backup_count: int = backup_count
+        self.cycle_started: float | None = None
+        self.cycle_traces: list[Trace] = []
+        self._pending: list[Trace] = []
+        self._handler: RotatingFileHandler | None = None
+
+    def start_cycle(self) -> None:
+        self.cycle_started = time.time()
+        self.cycle_traces = []
+
+    @contextmanager
+    def trace(self, name: str, **attributes) -> Iterator[Span]:
+        """opens a new trace, spans opened inside it become its children"""
+        trace = Trace(name=name, attributes=attributes)
+        token = current_span.set(trace.root)
+        try:
+            yield trace.root
+        except BaseException as e:
+            trace.root.finish(error=e)
+            raise
+        finally:
+            current_span.reset(token)
+            if trace.root.duration is None:
+                trace.root.finish()
+            self.cycle_traces.append(trace)
+            self._pending.append(trace)
+
+    @contextmanager
+    def span(self, name: str, **attributes) -> Iterator[Span | None]:
+        """opens a span under the current span, does nothing outside of a trace"""
+        parent = current_span.get()
+        if parent is None:
+            yield None
+            return
+
+        trace = parent.trace
+        if len(trace.spans) >= MAX_SPANS_PER_TRACE:
+            trace.dropped_spans += 1
+            yield None
+            return
+
+        span = Span(trace=trace, name=name, parent_id=parent.span_id, attributes=attributes)
+        trace.spans.append(span)
+        token = current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.finish(error=e)
+            raise
+        finally:
+            current_span.reset(token)
+            if span.duration is None:
+                span.finish()
+
+    def slowest_traces(self, limit: int) -> list[dict]:
+        """slowest traces of the latest cycle, slowest first"""
+        traces = sorted(self.cycle_traces, key=lambda trace: trace.duration, reverse=True)
+        return [trace.to_dict() for trace in traces[:limit]]
+
+    async def export(self) -> int:
+        """appends the traces finished since the last export to the trace file, returns total traces written"""
+        pending, self._pending = self._pending, []
+        if pending:
+            await asyncio.to_thread(self._write, [trace.to_dict() for trace in pending])
+        return len(pending)
+
+    def _write(self, traces: list[dict]) -> None:
+        if self._handler is None:
+            os.makedirs(os.path.dirname(self.filename) or '.', exist_ok=True)
+            self._handler = RotatingFileHandler(self.filename, maxBytes=self.max_bytes,
+                                                backupCount=self.backup_count, encoding='utf-8')
+        for trace in traces:
+            self._handler.handle(logging.makeLogRecord(dict(msg=json.dumps(trace, separators=(',', ':')))))
+        self._handler.flush()
+
+    def close(self) -> None:
+        if self._handler is not None:
+            self._handler.close()
+            self._handler = None
+
+
+def traced(name: str):
+    """runs every call of the decorated function, coroutine or not, in a span named name"""
+    def decorator(func):
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                with tracer.span(name):
+                    return await func(*args, **kwargs)
+        else:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with tracer.span(name):
+                    return func(*args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+_tracing_settings = config_instance().TRACING_SETTINGS
+tracer: Tracer = Tracer(filename=_tracing_settings.FILENAME, max_bytes=_tracing_settings.MAX_BYTES,
+                        backup_count=_tracing_settings.BACKUP_COUNT)
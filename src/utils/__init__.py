@@ -1,6 +1,11 @@
+import base64
+import binascii
+import hashlib
 import string
 import random
 
+from src.exceptions import InputError
+
 _char_set = string.ascii_lowercase + string.ascii_uppercase + string.digits
 
 
@@ -17,6 +22,45 @@ def create_id(size: int = 16, chars: str = _char_set) -> str:
     return ''.join(random.choices(chars, k=size))
 
 
+def content_id(*parts: str, size: int = 16) -> str:
+    """
+        **content_id**
+            deterministic id derived from parts, the same parts always give the same id
+
+    :param parts: values identifying the record
+    :param size: digest size in bytes, the id is twice as many hex characters
+    :return: hex digest
+    """
+    return hashlib.blake2b('\x1f'.join(parts).encode('utf-8'), digest_size=size).hexdigest()
+
+
+def encode_cursor(publish_time: int, uuid: str) -> str:
+    """
+        **encode_cursor**
+            creates an opaque pagination cursor from the sort key of the last article on a page
+
+    :param publish_time: providerPublishTime of the last article
+    :param uuid: uuid of the last article
+    :return: url safe cursor
+    """
+    return base64.urlsafe_b64encode(f"{publish_time}:{uuid}".encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor: str) -> tuple[int, str]:
+    """
+        **decode_cursor**
+            returns the (providerPublishTime, uuid) sort key held in a pagination cursor
+
+    :param cursor: cursor created by encode_cursor
+    :return: publish_time, uuid
+    """
+    try:
+        publish_time, uuid = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8').split(':', 1)
+        return int(publish_time), uuid
+    except (binascii.Error, UnicodeError, ValueError):
+        raise InputError(description="Invalid cursor")
+
+
 def camel_to_snake(name: str) -> str:
     import re
     s1 = re.sub('(.)([A-Z][a-z]+)', r'\1_\2', name)
@@ -0,0 +1,44 @@
+"""
+    **compression**
+        compresses article bodies for storage, zstandard is used when it is installed and zlib otherwise,
+        the codec is stored with every body so either can be read back
+"""
+import zlib
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+CODEC_ZLIB = 'zlib'
+CODEC_ZSTD = 'zstd'
+ZLIB_LEVEL = 6
+ZSTD_LEVEL = 9
+
+
+def compress_text(text: str) -> tuple[str, bytes]:
+    """
+        **compress_text**
+    :param text:
+    :return: codec used and compressed utf-8 bytes
+    """
+    data = text.encode('utf-8')
+    if zstandard is not None:
+        return CODEC_ZSTD, zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return CODEC_ZLIB, zlib.compress(data, ZLIB_LEVEL)
+
+
+def decompress_text(codec: str, data: bytes) -> str:
+    """
+        **decompress_text**
+    :param codec: codec returned by compress_text
+    :param data:
+    :return: text
+    """
+    if codec == CODEC_ZLIB:
+        return zlib.decompress(data).decode('utf-8')
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read zstd compressed bodies")
+        return zstandard.ZstdDecompressor().decompress(data).decode('utf-8')
+    raise ValueError(f"Unknown compression codec : {codec}")
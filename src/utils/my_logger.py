@@ -1,22 +1,143 @@
+"""
+    **logging**
+        every logger hands its records to a shared queue, a single background listener formats them as
+        JSON lines and writes them to the log file or stdout, so a log call never waits on I/O
+
+        records are rate limited per call site, a call site logging more than RATE_LIMIT records in
+        RATE_INTERVAL seconds is suppressed for the rest of the interval and its next record carries the
+        number of records suppressed, messages longer than MAX_FIELD_LENGTH are truncated before they are queued
+"""
+import atexit
 import functools
+import json
 import logging
+import queue
 import socket
 import sys
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
 from src.config import config_instance
 
 
+class JsonFormatter(logging.Formatter):
+    """one JSON object per record, the fields the log stream route filters on come first"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = dict(time=datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec='milliseconds'),
+                     level=record.levelname, logger=record.name, message=record.getMessage())
+        suppressed = getattr(record, 'suppressed', 0)
+        if suppressed:
+            entry['suppressed'] = suppressed
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    **RateLimitFilter**
+        allows rate_limit records per call site (logger, file and line) every interval seconds,
+        warnings and errors are never suppressed
+    """
+
+    def __init__(self, rate_limit: int, interval: float):
+        super().__init__()
+        self.rate_limit: int = rate_limit
+        self.interval: float = interval
+        # call site -> [window start, records in window, records suppressed]
+        self._windows: dict[tuple[str, str, int], list] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+
+        key = (record.name, record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= self.interval:
+                suppressed = window[2] if window is not None else 0
+                self._windows[key] = [now, 1, 0]
+                if suppressed:
+                    record.suppressed = suppressed
+                return True
+            if window[1] < self.rate_limit:
+                window[1] += 1
+                return True
+            window[2] += 1
+            return False
+
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    **BoundedQueueHandler**
+        formats the message in the calling thread, truncates it and drops the record if the queue is full
+    """
+
+    def __init__(self, log_queue: queue.Queue, max_field_length: int):
+        super().__init__(log_queue)
+        self.max_field_length: int = max_field_length
+        self.dropped: int = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        message = record.getMessage()
+        if len(message) > self.max_field_length:
+            message = f"{message[:self.max_field_length]}... ({len(message) - self.max_field_length} more chars)"
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        # the record has to be picklable and must not keep the arguments alive
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg, record.args, record.exc_info = message, None, None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
 class AppLogger:
     logging_file = f'logs/{config_instance().LOGGING.filename}'
+    _handler: BoundedQueueHandler | None = None
+    _listener: QueueListener | None = None
+    _lock: threading.Lock = threading.Lock()
 
     def __init__(self, name: str, is_file_logger: bool = False, log_level: int = logging.INFO):
         logger_name = name if name else config_instance().APP_SETTINGS.APP_NAME
         self.logger = logging.getLogger(logger_name)
         self.logger.setLevel(level=log_level)
+        self.logger.addHandler(self.queue_handler(is_file_logger=is_file_logger))
+
+    @classmethod
+    def queue_handler(cls, is_file_logger: bool) -> BoundedQueueHandler:
+        """the handler shared by every logger, the listener writing its records starts with it"""
+        with cls._lock:
+            if cls._handler is None:
+                settings = config_instance().LOGGING
+                log_queue: queue.Queue = queue.Queue(maxsize=settings.QUEUE_SIZE)
+                handler = BoundedQueueHandler(log_queue, max_field_length=settings.MAX_FIELD_LENGTH)
+                handler.addFilter(RateLimitFilter(rate_limit=settings.RATE_LIMIT, interval=settings.RATE_INTERVAL))
+
+                output = logging.FileHandler(cls.logging_file) if is_file_logger else logging.StreamHandler(sys.stdout)
+                output.setFormatter(JsonFormatter())
+                cls._listener = QueueListener(log_queue, output, respect_handler_level=False)
+                cls._listener.start()
+                atexit.register(cls.stop)
+                cls._handler = handler
+            return cls._handler
 
-        handler = logging.FileHandler(self.logging_file) if is_file_logger else logging.StreamHandler(sys.stdout)
-        formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
-        handler.setFormatter(formatter)
-        self.logger.addHandler(handler)
+    @classmethod
+    def stop(cls) -> None:
+        """writes the records still queued and stops the listener"""
+        with cls._lock:
+            if cls._listener is not None:
+                cls._listener.stop()
+                cls._listener = None
 
 
 @functools.lru_cache
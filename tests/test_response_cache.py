@@ -0,0 +1,43 @@
+import asyncio
+
+from src.connector.response_cache import ResponseCache
+
+
+def test_concurrent_misses_share_one_load():
+    cache = ResponseCache(ttl=60, max_bytes=1024)
+    calls = []
+
+    async def loader() -> bytes:
+        calls.append(1)
+        # a query running on a worker thread, the loop serves the other requests meanwhile
+        await asyncio.to_thread(lambda: None)
+        return b'page'
+
+    async def requests():
+        return await asyncio.gather(*[cache.get_or_load(key='latest', tags={'latest'}, loader=loader)
+                                      for _ in range(2)])
+
+    assert asyncio.run(requests()) == [b'page', b'page']
+    assert len(calls) == 1
+    assert cache.coalesced == 1
+
+
+def test_waiters_load_again_when_the_leading_request_is_cancelled():
+    cache = ResponseCache(ttl=60, max_bytes=1024)
+    calls = []
+
+    async def loader() -> bytes:
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return b'page'
+
+    async def requests():
+        leader = asyncio.create_task(cache.get_or_load(key='latest', tags={'latest'}, loader=loader))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(cache.get_or_load(key='latest', tags={'latest'}, loader=loader))
+        await asyncio.sleep(0)
+        leader.cancel()
+        return await waiter
+
+    assert asyncio.run(requests()) == b'page'
+    assert len(calls) == 2